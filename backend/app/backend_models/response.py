@@ -89,6 +89,7 @@ class StructuredAnalysis(BaseModel):
     additional_information: AdditionalInformation = AdditionalInformation()
     error: Optional[str] = None
     raw_response: Optional[str] = None
+    cache_hit: Optional[bool] = None  # True when served from the LLM response cache
 
 
 class PDFAnalysisResponse(BaseModel):
@@ -0,0 +1,115 @@
+"""
+Response size and latency of GET /api/applications for a 1,000-application
+vacancy: full ApplicationRead rows versus the view=summary projection.
+
+Builds a throwaway SQLite database (or BENCH_DATABASE_URL) with realistic
+resume_parsed/matching_sections payloads and times query + serialization,
+as the endpoint does, for one page and for the whole vacancy.
+Run with: python -m app.benchmarks.application_list_projection
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, col, select
+
+from app.models.application import Application, ApplicationRead, ApplicationStatus, ApplicationSummary
+from app.models.vacancy import Vacancy
+from app.routers.applications import summary_load_options
+
+APPLICATIONS = int(os.getenv("BENCH_APPLICATIONS", "1000"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "5"))
+WORDS = (
+    "python fastapi postgresql docker kubernetes react typescript developed designed "
+    "implemented services pipeline team project data analytics api backend frontend"
+).split()
+
+
+def resume_text(rng: random.Random) -> str:
+    lines = [" ".join(rng.choices(WORDS, k=12)) for _ in range(rng.randint(60, 120))]
+    return "\n".join(lines)
+
+
+def application_row(vacancy_id: str, rng: random.Random) -> Application:
+    requirements = [
+        {
+            "vacancy_req": " ".join(rng.choices(WORDS, k=6)),
+            "user_req_data": " ".join(rng.choices(WORDS, k=25)),
+            "match_percent": rng.randint(0, 100),
+        }
+        for _ in range(rng.randint(6, 12))
+    ]
+    score = rng.randint(20, 95)
+    return Application(
+        vacancy_id=vacancy_id,
+        first_name="Aigerim",
+        last_name="Sarsenova",
+        email=f"applicant{rng.randint(0, 10**9)}@example.com",
+        resume_pdf="uploads/resumes/ab/cd/" + "ab" * 32 + ".pdf",
+        resume_parsed={
+            "raw_text": resume_text(rng),
+            "metadata": {"pages": 2, "sha256": "ab" * 32, "cache": "miss"},
+            "experience": {"total_years": 4.5, "entries": []},
+        },
+        matching_score=score,
+        matching_sections={"requirements": requirements, "FIT_SCORE": score, "stage": "llm"},
+        status=ApplicationStatus.COMPLETED,
+        skills={"programming_languages": ["Python", "TypeScript"], "frameworks": ["FastAPI", "React"]},
+    )
+
+
+async def list_page(sessionmaker, vacancy_id: str, view: str, limit: int) -> int:
+    """Query and serialize one page like GET /api/applications; returns the body size"""
+    async with sessionmaker() as session:
+        query = select(Application).where(Application.vacancy_id == vacancy_id)
+        if view == "summary":
+            query = query.options(summary_load_options())
+        query = query.limit(limit).order_by(col(Application.created_at).desc())
+        applications = (await session.execute(query)).scalars().all()
+        schema = ApplicationSummary if view == "summary" else ApplicationRead
+        body = "[" + ",".join(schema.model_validate(a).model_dump_json() for a in applications) + "]"
+        return len(body.encode("utf-8"))
+
+
+async def main():
+    tmpdir = tempfile.mkdtemp(prefix="hirevibe-bench-")
+    url = os.getenv("BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{tmpdir}/bench.db")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    rng = random.Random(42)
+    async with sessionmaker() as session:
+        vacancy = Vacancy(
+            title="Backend Developer",
+            description="Python, FastAPI, PostgreSQL",
+            company="HireVibe",
+            salary_min=400000,
+            salary_max=700000,
+        )
+        session.add(vacancy)
+        await session.commit()
+        session.add_all(application_row(vacancy.id, rng) for _ in range(APPLICATIONS))
+        await session.commit()
+        vacancy_id = vacancy.id
+
+    print(f"Database: {url}  applications: {APPLICATIONS}  repeat: {REPEAT}")
+    print(f"{'view':<8} {'limit':>6} {'bytes':>12} {'ms (median)':>12}")
+    for limit in (100, APPLICATIONS):
+        for view in ("full", "summary"):
+            timings = []
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                size = await list_page(sessionmaker, vacancy_id, view, limit)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(f"{view:<8} {limit:>6} {size:>12,} {timings[len(timings) // 2]:>12.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
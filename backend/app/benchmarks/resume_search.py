@@ -0,0 +1,160 @@
+"""
+Latency of resume keyword search over BENCH_RESUMES (default 100,000)
+synthetic resumes, against the old approach of loading every resume text
+and grepping it.
+
+Seeds a throwaway SQLite database with FTS5 (or BENCH_DATABASE_URL, e.g. a
+PostgreSQL database for the tsvector/GIN index) with one application per
+resume across a few vacancies, then times search_applications for broad,
+selective and vacancy-filtered queries.
+Run with: python -m app.benchmarks.resume_search
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.models.application import Application, ApplicationStatus, ResumeText
+from app.models.vacancy import Vacancy
+from app.routers.applications import summary_load_options
+from app.services.resume_search import create_search_index, index_resume_texts, search_applications, search_terms
+from app.services.resume_text import CODEC, compress_text, decompress_text, text_key
+
+RESUMES = int(os.getenv("BENCH_RESUMES", "100000"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "10"))
+BATCH = 2000
+VACANCIES = 20
+
+SKILLS = (
+    "Python FastAPI Django PostgreSQL Redis Docker Kubernetes Terraform AWS GCP React TypeScript "
+    "Go Java Spring Kafka Airflow Spark Pandas PyTorch Linux Nginx GraphQL Celery Elasticsearch"
+).split()
+CITIES = "Almaty Astana Shymkent Karaganda Aktobe Tashkent Bishkek Remote".split()
+FILLER = (
+    "developed designed implemented maintained services pipeline team project data analytics api "
+    "backend frontend migrated reduced latency improved reliability led mentored customers platform"
+).split()
+
+
+def synthetic_resume(rng: random.Random) -> str:
+    skills = rng.sample(SKILLS, rng.randint(4, 9))
+    lines = [f"Software Engineer, {rng.choice(CITIES)}", "Skills: " + ", ".join(skills)]
+    for _ in range(rng.randint(8, 16)):
+        words = rng.choices(FILLER, k=10) + [rng.choice(skills)]
+        rng.shuffle(words)
+        lines.append(" ".join(words))
+    return "\n".join(lines)
+
+
+async def seed(sessionmaker, rng: random.Random) -> list:
+    now = datetime.now(timezone.utc)
+    vacancies = [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Engineer {i}",
+            "description": "Backend engineering",
+            "company": "HireVibe",
+            "salary_min": 400000,
+            "salary_max": 700000,
+            "employment_type": "Full-time",
+            "full_scoring": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(VACANCIES)
+    ]
+    async with sessionmaker() as session:
+        await session.execute(insert(Vacancy), vacancies)
+        for offset in range(0, RESUMES, BATCH):
+            texts, applications = [], []
+            for i in range(offset, min(offset + BATCH, RESUMES)):
+                body = synthetic_resume(rng)
+                key = text_key(body)
+                texts.append({
+                    "sha256": key,
+                    "codec": CODEC,
+                    "content": compress_text(body),
+                    "size": len(body.encode("utf-8")),
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                applications.append({
+                    "id": str(uuid.uuid4()),
+                    "vacancy_id": vacancies[i % VACANCIES]["id"],
+                    "first_name": "Aigerim",
+                    "last_name": "Sarsenova",
+                    "email": f"applicant{i}@example.com",
+                    "resume_text_sha256": key,
+                    "matching_score": rng.randint(0, 100),
+                    "status": ApplicationStatus.COMPLETED,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            await session.execute(insert(ResumeText), texts)
+            await session.execute(insert(Application), applications)
+            await index_resume_texts(session, [(t["sha256"], decompress_text(t["content"])) for t in texts])
+            await session.commit()
+    return [v["id"] for v in vacancies]
+
+
+async def grep_all(sessionmaker, query: str) -> int:
+    """The old way: load every resume text and match it in Python"""
+    terms = search_terms(query)
+    async with sessionmaker() as session:
+        result = await session.execute(select(ResumeText.content, ResumeText.codec))
+        return sum(
+            all(term in decompress_text(content, codec).lower() for term in terms)
+            for content, codec in result.all()
+        )
+
+
+async def main():
+    tmpdir = tempfile.mkdtemp(prefix="hirevibe-bench-")
+    url = os.getenv("BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{tmpdir}/bench.db")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(create_search_index)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    started = time.perf_counter()
+    vacancy_ids = await seed(sessionmaker, random.Random(11))
+    print(f"Database: {url}  resumes: {RESUMES}  seeded in {time.perf_counter() - started:.1f}s")
+    if engine.dialect.name == "postgresql":
+        async with engine.begin() as conn:
+            await conn.execute(text(f"ANALYZE {ResumeText.__tablename__}"))
+            await conn.execute(text(f"ANALYZE {Application.__tablename__}"))
+
+    cases = [
+        ("python (broad)", "python", {}),
+        ("kubernetes almaty", "Kubernetes Almaty", {}),
+        ("kubernetes almaty, 1 vacancy", "Kubernetes Almaty", {"vacancy_ids": vacancy_ids[:1]}),
+        ("terraform kafka bishkek", "terraform kafka bishkek", {}),
+        ("no match", "cobol", {}),
+    ]
+    print(f"{'query':<30} {'rows':>5} {'ms (median)':>12} {'ms (max)':>9}")
+    for label, query, kwargs in cases:
+        timings = []
+        for _ in range(REPEAT):
+            async with sessionmaker() as session:
+                started = time.perf_counter()
+                hits = await search_applications(session, query, limit=20, options=[summary_load_options()], **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"{label:<30} {len(hits):>5} {timings[len(timings) // 2]:>12.2f} {timings[-1]:>9.2f}")
+
+    started = time.perf_counter()
+    matches = await grep_all(sessionmaker, "Kubernetes Almaty")
+    print(f"\nLoad and grep every resume ('kubernetes almaty'): {matches} matches in {(time.perf_counter() - started) * 1000:,.0f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
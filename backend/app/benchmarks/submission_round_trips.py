@@ -0,0 +1,159 @@
+"""
+Database round trips per application submission: the original submit
+endpoint, which parsed and matched the resume inline and committed three
+times, against the single-transaction insert plus the worker's result write.
+
+Counts every statement, BEGIN, COMMIT and ROLLBACK sent to the database for
+the API request and (for the new path) the worker, on a throwaway SQLite
+database (or BENCH_DATABASE_URL).
+
+On SQLite the new path makes 12 round trips per application against 15
+(5 in the request, 7 in the worker), but its wall time per application
+is higher: it opens two sessions and writes skill rows and statistics the
+original endpoint did not. What the request gains is latency, since the
+parse and match no longer run inside it.
+Run with: python -m app.benchmarks.submission_round_trips
+"""
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.models.application import Application, ApplicationStatus
+from app.models.vacancy import Vacancy
+from app.services.application_processing import insert_application, load_application, store_application_result
+from app.utils.resume_storage import add_reference, content_path
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "200"))
+RESUME_SHA256 = "ab" * 32
+
+SKILLS = {"programming_languages": ["Python", "SQL"], "frameworks": ["FastAPI"], "databases": ["PostgreSQL"]}
+RESULT = {
+    "resume_parsed": {"raw_text": "Python developer", "metadata": {"pages": 1}},
+    "skills": SKILLS,
+    "matching_score": 72.0,
+    "matching_sections": {"FIT_SCORE": 72, "requirements": []},
+    "status": ApplicationStatus.COMPLETED,
+    "processing_error": None,
+}
+
+
+def new_application(vacancy_id: str) -> Application:
+    return Application(
+        vacancy_id=vacancy_id,
+        first_name="Aigerim",
+        last_name="Sarsenova",
+        email="aigerim@example.com",
+        resume_pdf=str(content_path(RESUME_SHA256, ".pdf")),
+        status=ApplicationStatus.PROCESSING,
+    )
+
+
+async def submit_before(session: AsyncSession, vacancy_id: str) -> str:
+    """
+    Original submit_application: SELECT vacancy, INSERT + COMMIT + refresh,
+    then store the parsed text (COMMIT + refresh) and the match (COMMIT + refresh)
+    """
+    result = await session.execute(select(Vacancy).where(Vacancy.id == vacancy_id))
+    assert result.scalar_one_or_none()
+    application = new_application(vacancy_id)
+    session.add(application)
+    await session.commit()
+    await session.refresh(application)
+
+    application.resume_parsed = RESULT["resume_parsed"]
+    session.add(application)
+    await session.commit()
+    await session.refresh(application)
+
+    application.matching_score = RESULT["matching_score"]
+    application.matching_sections = RESULT["matching_sections"]
+    session.add(application)
+    await session.commit()
+    await session.refresh(application)
+    return application.id
+
+
+async def process_before(session: AsyncSession, application_id: str) -> None:
+    """The original endpoint had no worker step"""
+
+
+async def submit_after(session: AsyncSession, vacancy_id: str) -> str:
+    application = await insert_application(session, new_application(vacancy_id))
+    await add_reference(session, RESUME_SHA256, application.resume_pdf, 1024)
+    await session.commit()
+    return application.id
+
+
+async def process_after(session: AsyncSession, application_id: str) -> None:
+    application, _vacancy = await load_application(session, application_id)
+    await store_application_result(session, application_id, RESULT, skills=SKILLS, loaded=application)
+
+
+async def measure(sessionmaker, counter: Counter, vacancy_id: str, submit, process) -> dict:
+    submit_trips = process_trips = 0
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        counter.clear()
+        async with sessionmaker() as session:
+            application_id = await submit(session, vacancy_id)
+        submit_trips += sum(counter.values())
+
+        counter.clear()
+        async with sessionmaker() as session:
+            await process(session, application_id)
+        process_trips += sum(counter.values())
+    elapsed = time.perf_counter() - started
+    return {
+        "submit": submit_trips / ITERATIONS,
+        "process": process_trips / ITERATIONS,
+        "total": (submit_trips + process_trips) / ITERATIONS,
+        "ms": elapsed / ITERATIONS * 1000,
+    }
+
+
+async def main():
+    tmpdir = tempfile.mkdtemp(prefix="hirevibe-bench-")
+    url = os.getenv("BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{tmpdir}/bench.db")
+    engine = create_async_engine(url)
+    counter: Counter = Counter()
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _statement(conn, cursor, statement, parameters, context, executemany):
+        counter["statement"] += 1
+
+    for name in ("begin", "commit", "rollback"):
+        event.listen(engine.sync_engine, name, lambda conn, _name=name: counter.update([_name]))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessionmaker() as session:
+        vacancy = Vacancy(
+            title="Backend Developer",
+            description="Python, FastAPI, PostgreSQL",
+            company="HireVibe",
+            salary_min=400000,
+            salary_max=700000,
+        )
+        session.add(vacancy)
+        await session.commit()
+        vacancy_id = vacancy.id
+
+    before = await measure(sessionmaker, counter, vacancy_id, submit_before, process_before)
+    after = await measure(sessionmaker, counter, vacancy_id, submit_after, process_after)
+    await engine.dispose()
+
+    print(f"Database: {url}  iterations: {ITERATIONS}")
+    print(f"{'path':<8} {'submit trips':>13} {'worker trips':>13} {'total':>7} {'ms/app':>8}")
+    for label, row in (("before", before), ("after", after)):
+        print(f"{label:<8} {row['submit']:>13.1f} {row['process']:>13.1f} {row['total']:>7.1f} {row['ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Latency of the top-K ranking query for a vacancy with many applicants.
+
+Seeds BENCH_APPLICATIONS (default 100,000) scored applications for one
+vacancy (plus noise in other vacancies) in a throwaway SQLite database (or
+BENCH_DATABASE_URL) and times rank_applications on the database path, which
+is what serves requests without a Redis leaderboard.
+Run with: python -m app.benchmarks.vacancy_ranking
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.models.application import Application, ApplicationStatus
+from app.models.vacancy import Vacancy
+from app.routers.applications import summary_load_options
+from app.services.ranking import rank_applications
+
+APPLICATIONS = int(os.getenv("BENCH_APPLICATIONS", "100000"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+
+
+def new_vacancy(title: str) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid.uuid4()),
+        "title": title,
+        "description": "Python, FastAPI, PostgreSQL",
+        "company": "HireVibe",
+        "salary_min": 400000,
+        "salary_max": 700000,
+        "employment_type": "Full-time",
+        "full_scoring": False,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def main():
+    tmpdir = tempfile.mkdtemp(prefix="hirevibe-bench-")
+    url = os.getenv("BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{tmpdir}/bench.db")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    rng = random.Random(7)
+    vacancies = [new_vacancy("Backend Developer"), new_vacancy("Data Analyst")]
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    async with sessionmaker() as session:
+        await session.execute(insert(Vacancy), vacancies)
+        for offset in range(0, APPLICATIONS, 10000):
+            rows = []
+            for i in range(offset, min(offset + 10000, APPLICATIONS)):
+                created = start + timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "vacancy_id": vacancies[0]["id"] if i % 10 else vacancies[1]["id"],
+                    "first_name": "Aigerim",
+                    "last_name": "Sarsenova",
+                    "email": f"applicant{i}@example.com",
+                    "matching_score": rng.randint(0, 100) if i % 20 else None,
+                    "status": ApplicationStatus.COMPLETED,
+                    "created_at": created,
+                    "updated_at": created,
+                })
+            await session.execute(insert(Application), rows)
+        await session.commit()
+
+    vacancy_id = vacancies[0]["id"]
+    cases = [
+        ("top 20", {"limit": 20}),
+        ("top 100, min_score 80", {"limit": 100, "min_score": 80}),
+        ("top 20, last 30 days", {"limit": 20, "created_after": datetime.now(timezone.utc) - timedelta(days=30)}),
+    ]
+    print(f"Database: {url}  applications: {APPLICATIONS}  repeat: {REPEAT}")
+    print(f"{'query':<26} {'rows':>5} {'ms (median)':>12} {'ms (max)':>9}")
+    for label, kwargs in cases:
+        timings = []
+        for _ in range(REPEAT):
+            async with sessionmaker() as session:
+                started = time.perf_counter()
+                applications, _ = await rank_applications(
+                    session, vacancy_id, options=[summary_load_options()], **kwargs
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"{label:<26} {len(applications):>5} {timings[len(timings) // 2]:>12.2f} {timings[-1]:>9.2f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
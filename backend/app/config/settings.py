@@ -4,9 +4,15 @@ Configuration settings for HackNU25 Backend
 
 import os
 import logging
-from openai import OpenAI
+from datetime import date
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from app.core.llm_cassette import CassetteTransport
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,10 +36,20 @@ class Settings:
         # OpenAI configuration
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         logger.info(f"🔑 OpenAI API key {'configured' if self.openai_api_key else 'missing'}")
+        # Alternative OpenAI-compatible endpoint, e.g. fake_llm_server.py for load tests
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL") or None
+        # LLM HTTP record/replay: "off", "record" or "replay" (see app/core/llm_cassette.py)
+        self.llm_cassette_mode = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+        self.llm_cassette_dir = os.getenv("LLM_CASSETTE_DIR", "cassettes/llm")
         
-        # Initialize OpenAI client
-        self.openai_client = OpenAI(api_key=self.openai_api_key) if self.openai_api_key else None
-        logger.info(f"🤖 OpenAI client {'initialized' if self.openai_client else 'not available'}")
+        # Shared async OpenAI client: one pooled httpx client per process, created
+        # lazily and closed by the app lifespan (see close_clients)
+        self.openai_max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+        self.openai_max_keepalive_connections = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "50"))
+        self.openai_keepalive_expiry = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+        self.openai_timeout = float(os.getenv("OPENAI_TIMEOUT", "60"))
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._openai_client: Optional[AsyncOpenAI] = None
         
         # App configuration
         self.app_title = "HackNU25 Backend API"
@@ -50,6 +66,146 @@ class Settings:
         self.max_tokens = 2000
         self.temperature = 0.3
 
+        # PDF extraction executor configuration
+        self.pdf_executor_workers = int(os.getenv("PDF_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.pdf_executor_max_tasks_per_child = int(os.getenv("PDF_EXECUTOR_MAX_TASKS_PER_CHILD", "50"))
+        self.pdf_extraction_timeout = float(os.getenv("PDF_EXTRACTION_TIMEOUT", "30"))
+        # Documents with at least this many pages are split across workers (0 disables)
+        self.pdf_parallel_page_threshold = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "24"))
+        self.pdf_parallel_min_pages_per_chunk = int(os.getenv("PDF_PARALLEL_MIN_PAGES_PER_CHUNK", "6"))
+
+        # PDF extraction cache configuration
+        self.pdf_cache_dir = os.getenv("PDF_CACHE_DIR", "cache/pdf_text")
+        self.pdf_cache_memory_bytes = int(os.getenv("PDF_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+        self.pdf_cache_disk_bytes = int(os.getenv("PDF_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+
+        # Part of a resume put into LLM prompts (0 disables a limit); the stored text is complete
+        self.resume_text_max_chars = int(os.getenv("RESUME_TEXT_MAX_CHARS", "12000"))
+        self.resume_text_max_pages = int(os.getenv("RESUME_TEXT_MAX_PAGES", "10"))
+
+        # Default prompt token budget for models without an explicit entry in prompt_budget.py
+        self.prompt_token_budget = int(os.getenv("PROMPT_TOKEN_BUDGET", "8000"))
+
+        # Resume scoring: "llm", "local" (rule engine only), "local+llm" (LLM refines the local score)
+        # or "cascade" (LLM only when the local pre-score falls inside the uncertainty band)
+        self.matching_mode = os.getenv("MATCHING_MODE", "llm").lower()
+        self.cascade_band_low = float(os.getenv("CASCADE_BAND_LOW", "35"))
+        self.cascade_band_high = float(os.getenv("CASCADE_BAND_HIGH", "75"))
+        # sentence-transformers model for the pre-score (empty disables embeddings)
+        self.cascade_embedding_model = os.getenv("CASCADE_EMBEDDING_MODEL", "")
+        # "Current date" for experience durations (YYYY-MM-DD); empty means today
+        self.scoring_reference_date = os.getenv("SCORING_REFERENCE_DATE") or None
+
+        # LLM response cache: "sqlite", "redis" or "none"
+        self.llm_cache_backend = os.getenv("LLM_CACHE_BACKEND", "sqlite").lower()
+        self.llm_cache_path = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3")
+        self.llm_cache_ttl = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+        self.llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+        # Background task configuration
+        self.task_max_retries = int(os.getenv("TASK_MAX_RETRIES", "3"))
+        self.dead_letter_queue = os.getenv("DEAD_LETTER_QUEUE", "taskiq:dead_letter")
+
+        # Resume storage garbage collection (run by `taskiq scheduler app.tasks.jobs:scheduler`)
+        self.resume_gc_cron = os.getenv("RESUME_GC_CRON", "0 3 * * *")
+        # Unreferenced files younger than this are kept (their DB commit may still be in flight)
+        self.resume_gc_grace_hours = float(os.getenv("RESUME_GC_GRACE_HOURS", "24"))
+
+        # Applicants scoring below this are invited to the clarification chat
+        self.clarification_score_threshold = float(os.getenv("CLARIFICATION_SCORE_THRESHOLD", "80"))
+        # Recomputation of the incrementally maintained vacancy statistics
+        self.vacancy_stats_cron = os.getenv("VACANCY_STATS_CRON", "30 * * * *")
+
+        # PostgreSQL text search configuration for resume search ("simple": no stemming, any language)
+        self.search_text_config = os.getenv("SEARCH_TEXT_CONFIG", "simple")
+
+        # Top-K ranking: "none" (indexed DB query) or "redis" (sorted-set leaderboard per vacancy)
+        self.ranking_leaderboard = os.getenv("RANKING_LEADERBOARD", "none").lower()
+
+        # Resume blob storage: "local" (uploads/resumes) or "s3" (any S3-compatible service, e.g. MinIO)
+        self.storage_backend = os.getenv("STORAGE_BACKEND", "local").lower()
+        self.s3_bucket = os.getenv("S3_BUCKET", "resumes")
+        self.s3_endpoint_url = os.getenv("S3_ENDPOINT_URL") or None
+        self.s3_region = os.getenv("S3_REGION", "us-east-1")
+        self.s3_access_key_id = os.getenv("S3_ACCESS_KEY_ID") or None
+        self.s3_secret_access_key = os.getenv("S3_SECRET_ACCESS_KEY") or None
+        self.s3_prefix = os.getenv("S3_PREFIX", "")
+        # Redirect downloads to presigned URLs instead of streaming them through the API (S3 only)
+        self.storage_presigned_urls = os.getenv("STORAGE_PRESIGNED_URLS", "false").lower() in ("1", "true", "yes")
+        self.storage_presign_expires = int(os.getenv("STORAGE_PRESIGN_EXPIRES", "300"))
+
+        # LLM call scheduler (per-process rate limits, concurrency per priority class, retries)
+        self.llm_requests_per_minute = int(os.getenv("LLM_RPM", "500"))
+        self.llm_tokens_per_minute = int(os.getenv("LLM_TPM", "200000"))
+        self.llm_concurrency_interactive = int(os.getenv("LLM_CONCURRENCY_INTERACTIVE", "32"))
+        self.llm_concurrency_clarification = int(os.getenv("LLM_CONCURRENCY_CLARIFICATION", "16"))
+        self.llm_concurrency_analysis = int(os.getenv("LLM_CONCURRENCY_ANALYSIS", "8"))
+        self.llm_concurrency_background = int(os.getenv("LLM_CONCURRENCY_BACKGROUND", "8"))
+        self.llm_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "0"))  # all classes together, 0 = no cap
+        self.llm_max_retries = int(os.getenv("LLM_MAX_RETRIES", "5"))
+        self.llm_backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+        self.llm_backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+
+
+    def scoring_reference(self) -> date:
+        """Reference date used when computing experience durations"""
+        if self.scoring_reference_date:
+            return date.fromisoformat(self.scoring_reference_date)
+        return date.today()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled keep-alive HTTP client shared by every LLM call site"""
+        if self._http_client is None or self._http_client.is_closed:
+            transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=self.openai_max_connections,
+                    max_keepalive_connections=self.openai_max_keepalive_connections,
+                    keepalive_expiry=self.openai_keepalive_expiry,
+                ),
+            )
+            if self.llm_cassette_mode != "off":
+                transport = CassetteTransport(self.llm_cassette_mode, self.llm_cassette_dir, transport)
+                logger.info(f"📼 LLM cassette {self.llm_cassette_mode} mode - {self.llm_cassette_dir}")
+            self._http_client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(self.openai_timeout, connect=10.0),
+            )
+            logger.info(
+                f"🌐 LLM HTTP pool created - max {self.openai_max_connections} connections, "
+                f"{self.openai_max_keepalive_connections} keep-alive"
+                + (f", base URL {self.openai_base_url}" if self.openai_base_url else "")
+            )
+        return self._http_client
+
+    @property
+    def openai_client(self) -> Optional[AsyncOpenAI]:
+        """Shared AsyncOpenAI client, or None when no API key is configured"""
+        if not self.openai_api_key:
+            return None
+        if self._openai_client is None or self._http_client is None or self._http_client.is_closed:
+            # Retries are handled by app.services.llm_scheduler
+            self._openai_client = AsyncOpenAI(
+                api_key=self.openai_api_key,
+                base_url=self.openai_base_url,
+                http_client=self.http_client,
+                max_retries=0,
+            )
+            logger.info("🤖 OpenAI client initialized")
+        return self._openai_client
+
+    def open_clients(self) -> None:
+        """Create the shared HTTP pool and OpenAI client (called on application startup)"""
+        self.http_client
+        self.openai_client
+
+    async def close_clients(self) -> None:
+        """Close the shared HTTP pool (called on application shutdown)"""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._openai_client = None
+
 
 # Global settings instance
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Record/replay of LLM HTTP traffic.
+
+``CassetteTransport`` is an httpx transport installed on the shared LLM HTTP
+client (``settings.http_client``), so it covers ``settings.openai_client``,
+LangChain's ``ChatOpenAI``/``OpenAIEmbeddings`` and websocket_server alike.
+
+- ``record``: requests go to the real (or fake) endpoint and each response is
+  saved to the cassette directory.
+- ``replay``: responses are served from the cassette; a request with no
+  recording gets a 404 so tests fail loudly instead of calling the network.
+
+Recordings are keyed on method, path and the canonical JSON request body, so
+auth headers and key order do not matter. Only successful responses are
+recorded. Streaming responses are recorded whole and replayed as a single body.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping; length/encoding no longer apply to the decoded body
+_KEPT_HEADERS = ("content-type", "retry-after", "x-request-id", "openai-model", "openai-processing-ms")
+
+
+def request_key(request: httpx.Request) -> str:
+    """Stable key for a request: method, path and canonical body"""
+    body = request.content or b""
+    try:
+        canonical = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    except ValueError:
+        canonical = body
+    digest = hashlib.sha256(request.method.encode() + b" " + request.url.path.encode() + b"\n" + canonical)
+    return digest.hexdigest()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records responses to, or replays them from, a directory"""
+
+    def __init__(self, mode: str, directory: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown LLM cassette mode: {mode}")
+        self.mode = mode
+        self.directory = Path(directory)
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = request_key(request)
+        path = self._path(key)
+
+        if self.mode == "replay":
+            if not path.exists():
+                metrics.incr("llm_cassette.misses")
+                logger.warning(f"📼 No recording for {request.method} {request.url.path} ({key[:12]})")
+                return httpx.Response(
+                    404,
+                    json={"error": {
+                        "message": f"No cassette recording for {request.method} {request.url.path} ({key})",
+                        "type": "cassette_miss",
+                        "code": "cassette_miss",
+                    }},
+                    request=request,
+                )
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            metrics.incr("llm_cassette.replayed")
+            return httpx.Response(
+                entry["status"],
+                headers=entry["headers"],
+                content=entry["body"].encode("utf-8"),
+                request=request,
+            )
+
+        response = await self.transport.handle_async_request(request)
+        # Read through a throwaway Response so content-encoding is decoded once
+        recorded = httpx.Response(response.status_code, headers=response.headers, stream=response.stream, request=request)
+        body = await recorded.aread()
+        await recorded.aclose()
+        headers = {k: v for k, v in recorded.headers.items() if k.lower() in _KEPT_HEADERS}
+        if recorded.status_code >= 400:
+            # Transient failures (429/5xx) are passed through but never recorded
+            return httpx.Response(recorded.status_code, headers=headers, content=body, request=request)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({
+                "request": {"method": request.method, "path": request.url.path},
+                "status": recorded.status_code,
+                "headers": headers,
+                "body": body.decode("utf-8", errors="replace"),
+            }, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        metrics.incr("llm_cassette.recorded")
+        return httpx.Response(recorded.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
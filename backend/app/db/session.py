@@ -1,6 +1,11 @@
 from sqlmodel import SQLModel, create_engine
+from sqlalchemy import inspect, select, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.core.config import DATABASE_URL
+# Every table model, so init_db creates and migrates all tables whichever module imported this one
+from app.models import application, conversation, user, vacancy
+from app.models.application import ResumeFile
+from app.services.resume_search import create_search_index
 
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
@@ -8,6 +13,68 @@ if not DATABASE_URL:
 engine = create_async_engine(DATABASE_URL, echo=True, future=True)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+def dialect_insert(session: AsyncSession):
+    """The dialect's INSERT construct (with ON CONFLICT support), or None for other databases"""
+    dialect = session.bind.dialect.name if session.bind is not None else ""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+def _add_missing_columns(connection):
+    """
+    create_all skips existing tables, so add columns declared after a table was created:
+    nullable ones, and NOT NULL ones with a server default that fills existing rows
+    """
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    quote = connection.dialect.identifier_preparer.quote
+    ddl = connection.dialect.ddl_compiler(connection.dialect, None)
+    for table in SQLModel.metadata.tables.values():
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or column.primary_key:
+                continue
+            default = ddl.get_column_default_string(column)
+            if not column.nullable and default is None:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            definition = f"{quote(column.name)} {column_type}"
+            if default is not None:
+                definition += f" DEFAULT {default}"
+            if not column.nullable:
+                definition += " NOT NULL"
+            connection.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {definition}"))
+
+def _rekey_resume_files(connection):
+    """ResumeFile used to be keyed by sha256, which left no row for the same bytes under a second extension"""
+    table = ResumeFile.__table__
+    inspector = inspect(connection)
+    if table.name not in inspector.get_table_names():
+        return
+    if inspector.get_pk_constraint(table.name)["constrained_columns"] == ["path"]:
+        return
+    rows = [dict(row._mapping) for row in connection.execute(select(table))]
+    table.drop(connection)
+    table.create(connection)
+    if rows:
+        connection.execute(table.insert(), rows)
+
+def _create_missing_indexes(connection):
+    """create_all skips existing tables, so add indexes declared after a table was created"""
+    for table in SQLModel.metadata.tables.values():
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_rekey_resume_files)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+        await conn.run_sync(create_search_index)
@@ -1,11 +1,10 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from contextlib import asynccontextmanager
 from app.routers import chat
-from app.routers import vacancies, applications
+from app.routers import vacancies, applications, files
 from app.tasks.jobs import broker
 from app.db.session import init_db, engine
 from taskiq import TaskiqScheduler
@@ -16,13 +15,30 @@ import os
 from app.config.settings import settings
 from app.backend_models.response import PDFAnalysisResponse
 from app.services_pdf.pdf_request import PDFRequestService
+from app.pdf_utils.executor import extraction_executor
+from app.pdf_utils.cache import extraction_cache
+from app.core.metrics import metrics
+from app.services.llm_cache import llm_cache
+from app.services.llm_scheduler import llm_scheduler
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize database
     await init_db()
+    # Startup: PDF extraction process pool
+    extraction_executor.start()
+    # Startup: shared async OpenAI client and its connection pool
+    settings.open_clients()
+    # Startup: task queue client used to enqueue resume processing
+    if not broker.is_worker_process:
+        await broker.startup()
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: stop extraction workers and task queue client
+    if not broker.is_worker_process:
+        await broker.shutdown()
+    extraction_executor.shutdown()
+    await llm_cache.close()
+    await settings.close_clients()
 
 app = FastAPI(title="HackNU API", lifespan=lifespan)
 
@@ -39,15 +55,12 @@ app.add_middleware(
 app.include_router(chat.router)
 app.include_router(vacancies.router)
 app.include_router(applications.router)
+app.include_router(files.router)
 
 # Initialize PDF request service
 pdf_request_service = PDFRequestService()
 
-# Serve uploaded resumes statically under /files
-# Ensure directory exists before mounting
-uploads_dir = Path("uploads/resumes")
-uploads_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/files", StaticFiles(directory=str(uploads_dir)), name="files")
+# Uploaded resumes under /files are served from the blob storage by the files router
 
 @app.get("/")
 async def root():
@@ -58,6 +71,7 @@ async def root():
             "health": "/health",
             "analyze_pdf": "/api/v1/analyze-pdf (PDF → AI analysis)",
             "parse_pdf": "/api/v1/parse-pdf (PDF → text extraction only)",
+            "metrics": "/metrics",
             "docs": "/docs",
         }
     }
@@ -69,16 +83,26 @@ async def health():
     return {
         "status": "ok",
         "openai_status": openai_status,
-        "model": getattr(settings, 'openai_model', 'N/A')
+        "model": getattr(settings, 'openai_model', 'N/A'),
+        "pdf_extraction": extraction_executor.stats(),
+        "pdf_cache": extraction_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_scheduler": llm_scheduler.stats()
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters, gauges and timings"""
+    return metrics.snapshot()
+
 @app.post("/api/v1/analyze-pdf", response_model=PDFAnalysisResponse)
 async def analyze_pdf(
     file: UploadFile = File(...),
-    include_raw_text: bool = Form(False, description="Include extracted text in response")
+    include_raw_text: bool = Form(False, description="Include extracted text in response"),
+    use_cache: bool = Form(True, description="Serve a cached analysis for identical text when available")
 ):
     """Analyze PDF resume with comprehensive AI analysis using OpenAI GPT"""
-    return await pdf_request_service.process_analyze_request(file, include_raw_text)
+    return await pdf_request_service.process_analyze_request(file, include_raw_text, use_cache)
 
 @app.post("/api/v1/parse-pdf", response_model=PDFAnalysisResponse)
 async def parse_pdf(
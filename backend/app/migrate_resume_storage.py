@@ -0,0 +1,88 @@
+"""
+Script to move existing resumes into content-addressed storage
+(uploads/resumes/ab/cd/<sha256>.pdf, in the configured STORAGE_BACKEND),
+rewrite Application.resume_pdf and build the ResumeFile reference counts.
+Legacy files are read from the local uploads directory. Safe to run more
+than once.
+Run with: python -m app.migrate_resume_storage
+"""
+import asyncio
+import hashlib
+from pathlib import Path
+
+import aiofiles
+from sqlmodel import select
+
+from app.db.session import async_session, init_db
+from app.models.application import Application, ResumeFile
+from app.models.vacancy import Vacancy  # Application.vacancy_id references it; init_db needs the table
+from app.utils.blob_storage import get_blob_storage
+from app.utils.resume_storage import commit_file, is_content_addressed, recount_references, storage_key, temp_path
+
+
+def resolve_path(resume_pdf: str) -> Path:
+    file_path = Path(resume_pdf)
+    if not file_path.exists():
+        alt_path = Path.cwd() / resume_pdf
+        file_path = alt_path if alt_path.exists() else file_path
+    return file_path
+
+
+async def migrate_resume_storage():
+    """Copy legacy resume files to their content address and point applications at them"""
+    print("Initializing database...")
+    await init_db()
+
+    async with async_session() as session:
+        result = await session.execute(select(Application).where(Application.resume_pdf.is_not(None)))
+        applications = result.scalars().all()
+        stored = {row.path: row for row in (await session.execute(select(ResumeFile))).scalars().all()}
+        moved = set()
+        missing = 0
+        storage = get_blob_storage()
+
+        for application in applications:
+            if is_content_addressed(application.resume_pdf):
+                info = await storage.stat(storage_key(application.resume_pdf))
+                if application.resume_pdf not in stored and info is not None:
+                    stored[application.resume_pdf] = ResumeFile(
+                        sha256=Path(application.resume_pdf).stem, path=application.resume_pdf, size=info.size
+                    )
+                    session.add(stored[application.resume_pdf])
+                continue
+
+            source = resolve_path(application.resume_pdf)
+            if not source.exists():
+                print(f"  ❌ {application.id}: file not found: {application.resume_pdf}")
+                missing += 1
+                continue
+
+            async with aiofiles.open(source, 'rb') as f:
+                content = await f.read()
+            sha256 = hashlib.sha256(content).hexdigest()
+            ext = source.suffix.lower()
+            tmp = temp_path(ext)
+            async with aiofiles.open(tmp, 'wb') as f:
+                await f.write(content)
+            target = str(await commit_file(tmp, sha256, ext))
+
+            if target not in stored:
+                stored[target] = ResumeFile(sha256=sha256, path=target, size=len(content))
+                session.add(stored[target])
+            print(f"  ✅ {application.id}: {application.resume_pdf} -> {target}")
+            application.resume_pdf = target
+            moved.add(source)
+
+        await session.commit()
+        await recount_references(session)
+        await session.commit()
+
+    # Old files are removed only after the new paths are committed
+    for source in moved:
+        source.unlink(missing_ok=True)
+
+    print(f"\n✅ Migrated {len(moved)} files, {len(stored)} stored resumes, {missing} missing")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_resume_storage())
@@ -0,0 +1,142 @@
+"""
+Script to move extracted resume text out of Application.resume_parsed
+into the compressed ResumeText table (see app.services.resume_text) and
+report the table sizes before and after. Moved texts are added to the
+resume search index. Safe to run more than once.
+Pass --vacuum to compact the application table afterwards (VACUUM FULL on
+PostgreSQL, which locks the table; VACUUM on SQLite); until then PostgreSQL
+keeps the freed space inside the table and the "after" sizes barely move.
+Run with: python -m app.migrate_resume_text [--vacuum]
+"""
+import asyncio
+import sys
+from typing import Dict, Optional
+
+from sqlalchemy import String, cast, func, text
+from sqlmodel import select
+
+from app.db.session import async_session, engine, init_db
+from app.models.application import Application, ResumeText
+from app.models.vacancy import Vacancy  # Application.vacancy_id references it; init_db needs the table
+from app.services.resume_text import store_resume_text
+
+BATCH_SIZE = 500
+
+
+async def table_size(session, table: str) -> Optional[Dict[str, int]]:
+    """On-disk size of a table (bytes), split into heap, TOAST and indexes where the database tells"""
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        heap, table_total, indexes = (await session.execute(
+            text(
+                "SELECT pg_relation_size(to_regclass(:t)), pg_table_size(to_regclass(:t)),"
+                " pg_indexes_size(to_regclass(:t))"
+            ), {"t": table}
+        )).one()
+        return {"heap": heap, "toast": table_total - heap, "indexes": indexes, "total": table_total + indexes}
+    if dialect == "sqlite":
+        try:
+            heap, indexes = (await session.execute(text(
+                "SELECT"
+                " (SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = :t),"
+                " (SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN"
+                "  (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t))"
+            ), {"t": table})).one()
+        except Exception:
+            return None  # SQLite built without the dbstat table
+        return {"heap": heap, "indexes": indexes, "total": heap + indexes}
+    return None
+
+
+async def size_report(session) -> Dict[str, object]:
+    parsed_bytes = (await session.execute(
+        select(func.coalesce(func.sum(func.length(cast(Application.resume_parsed, String))), 0))
+    )).scalar_one()
+    texts, text_bytes, compressed = (await session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(ResumeText.size), 0),
+            func.coalesce(func.sum(func.length(ResumeText.content)), 0),
+        )
+    )).one()
+    return {
+        "application": await table_size(session, Application.__tablename__),
+        "resumetext": await table_size(session, ResumeText.__tablename__),
+        "resume_parsed_bytes": parsed_bytes,
+        "texts": texts,
+        "text_bytes": text_bytes,
+        "compressed_bytes": compressed,
+    }
+
+
+def print_report(title: str, report: Dict[str, object]) -> None:
+    print(f"\n{title}")
+    for table in ("application", "resumetext"):
+        sizes = report[table]
+        if sizes is None:
+            print(f"  {table:<12} size not available on this database")
+        else:
+            print(f"  {table:<12} " + ", ".join(f"{name} {value / 1024:,.0f} KiB" for name, value in sizes.items()))
+    print(f"  resume_parsed JSON in application rows: {report['resume_parsed_bytes'] / 1024:,.0f} KiB")
+    ratio = report["text_bytes"] / report["compressed_bytes"] if report["compressed_bytes"] else 0
+    print(
+        f"  resume texts: {report['texts']}, {report['text_bytes'] / 1024:,.0f} KiB of text"
+        f" in {report['compressed_bytes'] / 1024:,.0f} KiB compressed ({ratio:.1f}x)"
+    )
+
+
+async def vacuum() -> None:
+    statement = "VACUUM FULL application" if engine.dialect.name == "postgresql" else "VACUUM"
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(statement))
+
+
+async def migrate_resume_text(compact: bool = False):
+    """Store inline raw_text in ResumeText and point applications at it"""
+    print("Initializing database...")
+    await init_db()
+
+    async with async_session() as session:
+        print_report("Before:", await size_report(session))
+
+        moved = 0
+        last_id = ""
+        while True:
+            result = await session.execute(
+                select(Application)
+                .where(Application.resume_parsed.is_not(None), Application.id > last_id)
+                .order_by(Application.id)
+                .limit(BATCH_SIZE)
+            )
+            applications = result.scalars().all()
+            if not applications:
+                break
+            last_id = applications[-1].id
+            for application in applications:
+                parsed = application.resume_parsed
+                if not isinstance(parsed, dict) or "raw_text" not in parsed:
+                    continue
+                raw_text = parsed["raw_text"] or ""
+                if raw_text and not application.resume_text_sha256:
+                    metadata = parsed.get("metadata") or {}
+                    application.resume_text_sha256 = await store_resume_text(session, raw_text, metadata.get("sha256"))
+                # A new dict: the JSON column does not track in-place changes
+                application.resume_parsed = {key: value for key, value in parsed.items() if key != "raw_text"}
+                moved += 1
+            await session.commit()
+            session.expunge_all()
+            print(f"  ✅ {moved} applications migrated")
+
+    if compact:
+        print("\nCompacting...")
+        await vacuum()
+
+    async with async_session() as session:
+        print_report("After:", await size_report(session))
+
+    print(f"\n✅ Moved resume text of {moved} applications")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_resume_text(compact="--vacuum" in sys.argv[1:]))
@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import JSON, TIMESTAMP, ForeignKey
-from typing import Optional, Dict, Any
+from sqlalchemy import JSON, TIMESTAMP, ForeignKey, Index, LargeBinary
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 import uuid
 
@@ -8,8 +8,18 @@ def utc_now():
     """Return current UTC time as timezone-aware datetime"""
     return datetime.now(timezone.utc)
 
+class ApplicationStatus:
+    """Values of Application.status"""
+    PROCESSING = "processing"  # Accepted; parsing and matching queued in the worker
+    COMPLETED = "completed"    # Resume parsed and scored
+    FAILED = "failed"          # Pipeline gave up after all retries
+
 class Application(SQLModel, table=True):
     """Job application model"""
+    __table_args__ = (
+        # Keyset pagination of a vacancy's applications (see app.utils.pagination)
+        Index("ix_application_vacancy_created", "vacancy_id", "created_at", "id"),
+    )
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     # Explicitly create a Column with a ForeignKey that has ON DELETE CASCADE
     vacancy_id: Optional[str] = Field(
@@ -20,12 +30,63 @@ class Application(SQLModel, table=True):
     last_name: str
     email: str = Field(index=True)
     resume_pdf: Optional[str] = None  # Path to PDF file
-    resume_parsed: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))  # Parsed resume data
+    resume_parsed: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))  # Parser metadata and experience timeline
+    resume_text_sha256: Optional[str] = Field(default=None, index=True)  # ResumeText holding the extracted text
     matching_score: Optional[float] = None  # AI-calculated fit score (0-100)
     matching_sections: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))  # AI-extracted relevant sections
+    # See ApplicationStatus; rows from before the column existed were scored synchronously, hence the server default
+    status: str = Field(
+        default=ApplicationStatus.PROCESSING,
+        index=True,
+        sa_column_kwargs={"server_default": ApplicationStatus.COMPLETED},
+    )
+    processing_error: Optional[str] = None  # Last pipeline error when status is "failed"
+    skills: Optional[Dict[str, List[str]]] = Field(default=None, sa_column=Column(JSON))  # Canonical skills by TechnicalSkills category
+    created_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
+    updated_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
+
+# Top-K ranking and score-sorted pages of a vacancy (see app.services.ranking). Both
+# order by score DESC NULLS LAST: PostgreSQL needs that spelled out in the index (its
+# DESC default is NULLS FIRST); SQLite sorts NULLs last on DESC anyway and rejects it.
+Index(
+    "ix_application_vacancy_score_nulls_last",
+    Application.__table__.c.vacancy_id,
+    Application.__table__.c.matching_score.desc().nulls_last(),
+    Application.__table__.c.id.desc(),
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_application_vacancy_score_desc",
+    Application.__table__.c.vacancy_id,
+    Application.__table__.c.matching_score.desc(),
+    Application.__table__.c.id.desc(),
+).ddl_if(callable_=lambda ddl, target, bind, **kw: kw["dialect"].name != "postgresql")
+
+class ApplicationSkill(SQLModel, table=True):
+    """One extracted skill of an application (for filtering applications by skill)"""
+    application_id: str = Field(
+        sa_column=Column(ForeignKey("application.id", ondelete="CASCADE"), primary_key=True),
+    )
+    skill: str = Field(primary_key=True, index=True)  # Canonical name from the skill taxonomy
+    category: str  # TechnicalSkills field
+
+class ResumeFile(SQLModel, table=True):
+    """A stored resume file, shared by all applications that uploaded the same bytes with the same extension"""
+    path: str = Field(primary_key=True)  # Content-addressed path (hash and extension), see app.utils.resume_storage
+    sha256: str = Field(index=True)
+    size: int
+    ref_count: int = Field(default=0)  # Applications whose resume_pdf is this path
     created_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
     updated_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
 
+class ResumeText(SQLModel, table=True):
+    """Extracted text of a resume, compressed and stored once (see app.services.resume_text)"""
+    sha256: str = Field(primary_key=True)  # Of the resume PDF, or of the text when the PDF hash is unknown
+    codec: str = Field(default="zlib")
+    content: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    size: int  # Uncompressed UTF-8 length
+    created_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
+    updated_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))  # Last stored for an application
+
 class ApplicationCreate(SQLModel):
     """Schema for creating a new application"""
     vacancy_id: str
@@ -44,5 +105,39 @@ class ApplicationRead(SQLModel):
     resume_parsed: Optional[Dict[str, Any]]
     matching_score: Optional[float]
     matching_sections: Optional[Dict[str, Any]]
+    status: str
+    processing_error: Optional[str] = None
+    skills: Optional[Dict[str, List[str]]] = None
+    created_at: datetime
+    updated_at: datetime
+
+class ApplicationSummary(SQLModel):
+    """Schema for application lists: ApplicationRead without resume_parsed and matching_sections"""
+    id: str
+    vacancy_id: str
+    first_name: str
+    last_name: str
+    email: str
+    resume_pdf: Optional[str]
+    matching_score: Optional[float]
+    status: str
+    processing_error: Optional[str] = None
+    skills: Optional[Dict[str, List[str]]] = None
     created_at: datetime
     updated_at: datetime
+
+class ApplicationSearchHit(SQLModel):
+    """A resume search result"""
+    application: ApplicationSummary
+    rank: float  # Higher is a better match
+    snippet: str  # HTML-escaped resume text around the matches, matched words in <mark>
+
+class ApplicationPage(SQLModel):
+    """A cursor-paginated page of applications"""
+    items: List[ApplicationRead]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; null on the last page
+
+class ApplicationSummaryPage(SQLModel):
+    """A cursor-paginated page of application summaries"""
+    items: List[ApplicationSummary]
+    next_cursor: Optional[str] = None
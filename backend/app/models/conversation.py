@@ -1,7 +1,7 @@
 """Conversation and message models for chatbot functionality"""
 from sqlmodel import SQLModel, Field, Column, TIMESTAMP
-from sqlalchemy import JSON
-from typing import Optional
+from sqlalchemy import JSON, Index
+from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
 
@@ -26,6 +26,10 @@ class Conversation(SQLModel, table=True):
 
 class ConversationMessage(SQLModel, table=True):
     """Single message in a conversation"""
+    __table_args__ = (
+        # Keyset pagination of a conversation's history (see app.utils.pagination)
+        Index("ix_conversationmessage_conversation_created", "conversation_id", "created_at", "id"),
+    )
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     conversation_id: str = Field(foreign_key="conversation.id", index=True)
     role: str  # "user" or "assistant"
@@ -67,3 +71,9 @@ class MessageRead(SQLModel):
     role: str
     content: str
     created_at: datetime
+
+
+class MessagePage(SQLModel):
+    """A cursor-paginated page of messages, newest first"""
+    items: List[MessageRead]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for older messages; null on the last page
@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, Column, TIMESTAMP
-from sqlalchemy import JSON
-from typing import Optional, Dict, Any
+from sqlalchemy import JSON, ForeignKey, Index, false
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 import uuid
 
@@ -10,6 +10,10 @@ def utc_now():
 
 class Vacancy(SQLModel, table=True):
     """Job vacancy/position model"""
+    __table_args__ = (
+        # Keyset pagination (see app.utils.pagination)
+        Index("ix_vacancy_created", "created_at", "id"),
+    )
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     title: str = Field(index=True)
     description: str
@@ -18,9 +22,37 @@ class Vacancy(SQLModel, table=True):
     salary_max: int
     employment_type: str = Field(default="Full-time")  # Full-time, Part-time, Contract, Internship
     requirements: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    full_scoring: bool = Field(default=False, sa_column_kwargs={"server_default": false()})  # always use the LLM in cascade matching
     created_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
     updated_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
 
+class VacancyStats(SQLModel, table=True):
+    """
+    Application counters of a vacancy, maintained incrementally (see app.services.vacancy_stats)
+
+    Updated in the same transaction as every application insert and pipeline
+    result; a periodic job recomputes them from the applications.
+    """
+    vacancy_id: str = Field(
+        sa_column=Column(ForeignKey("vacancy.id", ondelete="CASCADE"), primary_key=True),
+    )
+    applications: int = Field(default=0)
+    processing: int = Field(default=0)
+    completed: int = Field(default=0)
+    failed: int = Field(default=0)
+    scored: int = Field(default=0)  # Applications with a matching_score
+    score_sum: float = Field(default=0)
+    pending_clarification: int = Field(default=0)  # Completed with a score below CLARIFICATION_SCORE_THRESHOLD
+    updated_at: datetime = Field(default_factory=utc_now, sa_column=Column(TIMESTAMP(timezone=True)))
+
+class VacancyScoreBucket(SQLModel, table=True):
+    """Number of a vacancy's applications per whole-point matching score (0-100)"""
+    vacancy_id: str = Field(
+        sa_column=Column(ForeignKey("vacancy.id", ondelete="CASCADE"), primary_key=True),
+    )
+    score: int = Field(primary_key=True)
+    count: int = Field(default=0)
+
 class VacancyCreate(SQLModel):
     """Schema for creating a new vacancy"""
     title: str
@@ -30,6 +62,7 @@ class VacancyCreate(SQLModel):
     salary_max: int
     employment_type: str = "Full-time"
     requirements: Optional[Dict[str, Any]] = None
+    full_scoring: bool = False
     
 
 class VacancyRead(SQLModel):
@@ -42,5 +75,25 @@ class VacancyRead(SQLModel):
     salary_max: int
     employment_type: str
     requirements: Optional[Dict[str, Any]] = None
+    full_scoring: bool = False
     created_at: datetime
     updated_at: datetime
+
+class VacancyPage(SQLModel):
+    """A cursor-paginated page of vacancies"""
+    items: List[VacancyRead]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; null on the last page
+
+class VacancyStatsRead(SQLModel):
+    """Schema for reading vacancy statistics"""
+    vacancy_id: str
+    applications: int
+    processing: int
+    completed: int
+    failed: int
+    scored: int
+    mean_score: Optional[float] = None
+    median_score: Optional[float] = None
+    histogram: List[int]  # Scored applications per 10-point bin: 0-9, 10-19, ..., 90-100
+    pending_clarification: int
+    updated_at: datetime
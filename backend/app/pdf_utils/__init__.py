@@ -3,10 +3,10 @@ PDF Utils Package
 Simple package for PDF parsing and analysis
 
 Usage:
-    from pdf_utils import extract_text_from_pdf, analyze_with_openai
+    from pdf_utils import extract_text_from_pdf, iter_pdf_pages, analyze_with_openai
 """
 
-from .parser import extract_text_from_pdf
+from .parser import extract_text_from_pdf, iter_pdf_pages
 from .analyzer import analyze_with_openai
 
-__all__ = ["extract_text_from_pdf", "analyze_with_openai"]
\ No newline at end of file
+__all__ = ["extract_text_from_pdf", "iter_pdf_pages", "analyze_with_openai"]
\ No newline at end of file
@@ -7,12 +7,21 @@ import json
 import logging
 from app.config.settings import settings
 from app.backend_models.response import StructuredAnalysis
+from app.services.llm_cache import llm_cache, make_cache_key
+from app.services.llm_scheduler import Priority, estimate_tokens, llm_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the analysis prompt changes; cached results are keyed on it
+ANALYZER_PROMPT_VERSION = "1"
 
-async def analyze_with_openai(text: str) -> StructuredAnalysis:
-    """Analyze resume text using OpenAI GPT and return structured JSON data"""
+
+async def analyze_with_openai(text: str, use_cache: bool = True) -> StructuredAnalysis:
+    """Analyze resume text using OpenAI GPT and return structured JSON data.
+
+    Results are cached by model, ANALYZER_PROMPT_VERSION and the text; pass
+    ``use_cache=False`` to force a fresh model call.
+    """
     start_time = time.time()
     logger.info(f"🤖 Starting OpenAI analysis - Text length: {len(text)} chars")
     
@@ -110,69 +119,89 @@ IMPORTANT: Return ONLY valid JSON. If any information is not found, use "Not spe
         prompt_time = time.time() - prompt_start
         logger.info(f"📝 Prompt prepared in {prompt_time:.2f}s - Length: {len(resume_analysis_prompt)} chars")
         
-        # Make API call
-        api_start = time.time()
-        logger.info("🌐 Making OpenAI API call...")
-        
-        response = settings.openai_client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
+        async def call_model() -> tuple[dict, int]:
+            # Make API call
+            api_start = time.time()
+            logger.info("🌐 Making OpenAI API call...")
+            
+            messages = [
                 {"role": "system", "content": "You are an expert HR professional and resume analyst. Return structured JSON data only. Ensure all JSON is valid and parseable."},
                 {"role": "user", "content": resume_analysis_prompt}
-            ],
-            max_tokens=settings.max_tokens,
-            temperature=settings.temperature
-        )
-        
-        api_time = time.time() - api_start
-        total_time = time.time() - start_time
-        
-        response_text = response.choices[0].message.content
-        
-        # Handle None response
-        if not response_text:
-            logger.error("❌ OpenAI returned empty response")
-            return StructuredAnalysis(
-                error="OpenAI returned empty response"
+            ]
+            estimated_tokens = estimate_tokens(messages, settings.max_tokens, settings.openai_model)
+            response = await llm_scheduler.run(
+                Priority.ANALYSIS,
+                lambda: settings.openai_client.chat.completions.create(
+                    model=settings.openai_model,
+                    messages=messages,
+                    max_tokens=settings.max_tokens,
+                    temperature=settings.temperature
+                ),
+                estimated_tokens=estimated_tokens,
+                name="analysis",
             )
-        
-        logger.info(f"✅ OpenAI API call completed in {api_time:.2f}s")
-        logger.info(f"📊 Response length: {len(response_text)} chars")
-        logger.info(f"🏁 Total OpenAI analysis time: {total_time:.2f}s")
-        
-        # Parse JSON response
-        try:
-            # Clean the response text (remove code blocks if present)
-            cleaned_response = response_text.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-            cleaned_response = cleaned_response.strip()
             
-            # Parse JSON
-            structured_data = json.loads(cleaned_response)
-            logger.info("✅ Successfully parsed JSON response")
+            api_time = time.time() - api_start
+            total_tokens = response.usage.total_tokens if response.usage else 0
+            llm_scheduler.record_usage(estimated_tokens, total_tokens if response.usage else None)
+            response_text = response.choices[0].message.content
             
-            # Convert to StructuredAnalysis Pydantic model
-            return StructuredAnalysis(**structured_data)
+            # Handle None response
+            if not response_text:
+                logger.error("❌ OpenAI returned empty response")
+                return {"error": "OpenAI returned empty response"}, total_tokens
             
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ Failed to parse JSON response: {str(e)}")
-            logger.error(f"Raw response: {response_text}")
+            logger.info(f"✅ OpenAI API call completed in {api_time:.2f}s")
+            logger.info(f"📊 Response length: {len(response_text)} chars")
             
-            # Return fallback structure with the raw text
-            return StructuredAnalysis(
-                error=f"Failed to parse structured response: {str(e)}",
-                raw_response=response_text
-            )
-        except Exception as e:
-            logger.error(f"❌ Failed to create StructuredAnalysis: {str(e)}")
-            # Return fallback structure
-            return StructuredAnalysis(
-                error=f"Failed to create structured response: {str(e)}",
-                raw_response=response_text
-            )
+            # Parse JSON response
+            try:
+                # Clean the response text (remove code blocks if present)
+                cleaned_response = response_text.strip()
+                if cleaned_response.startswith("```json"):
+                    cleaned_response = cleaned_response[7:]
+                if cleaned_response.endswith("```"):
+                    cleaned_response = cleaned_response[:-3]
+                cleaned_response = cleaned_response.strip()
+                
+                # Parse JSON
+                structured_data = json.loads(cleaned_response)
+                logger.info("✅ Successfully parsed JSON response")
+                # Validate before caching so only usable results are stored
+                StructuredAnalysis(**structured_data)
+                return {"data": structured_data}, total_tokens
+                
+            except json.JSONDecodeError as e:
+                logger.error(f"❌ Failed to parse JSON response: {str(e)}")
+                logger.error(f"Raw response: {response_text}")
+                
+                # Return fallback structure with the raw text
+                return {
+                    "error": f"Failed to parse structured response: {str(e)}",
+                    "raw_response": response_text
+                }, total_tokens
+            except Exception as e:
+                logger.error(f"❌ Failed to create StructuredAnalysis: {str(e)}")
+                # Return fallback structure
+                return {
+                    "error": f"Failed to create structured response: {str(e)}",
+                    "raw_response": response_text
+                }, total_tokens
+        
+        cache_key = make_cache_key(
+            "analysis", settings.openai_model, ANALYZER_PROMPT_VERSION, text,
+            temperature=settings.temperature, max_tokens=settings.max_tokens,
+        )
+        result, cache_hit = await llm_cache.get_or_call(
+            cache_key, call_model, bypass=not use_cache, should_store=lambda r: "data" in r
+        )
+        total_time = time.time() - start_time
+        logger.info(f"🏁 Total OpenAI analysis time: {total_time:.2f}s{' (cached)' if cache_hit else ''}")
+        
+        if "data" not in result:
+            return StructuredAnalysis(**result)
+        # Convert to StructuredAnalysis Pydantic model
+        return StructuredAnalysis(**{**result["data"], "cache_hit": cache_hit})
         
     except Exception as e:
         error_time = time.time() - start_time
@@ -0,0 +1,230 @@
+"""
+PDF Extraction Cache - content-addressed cache for extracted text and metadata
+
+Entries are keyed by the SHA-256 of the PDF bytes and stored in two tiers:
+an in-memory LRU and a persistent directory sharded by the first two hex
+characters of the hash. Both tiers are bounded in bytes. The directory is
+shared by the API and worker processes, so lookups and the size bound go to
+the directory itself rather than to per-process state. Every entry records
+the parser version, so a change to the extraction logic invalidates old entries.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, the bound is best effort
+    fcntl = None
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from app.pdf_utils.parser import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def pdf_sha256(pdf_content: bytes) -> str:
+    """Content hash used as the cache key"""
+    return hashlib.sha256(pdf_content).hexdigest()
+
+
+class ExtractionCache:
+    """Two-tier (memory LRU + disk) cache of ``(text, metadata)`` extraction results"""
+
+    def __init__(
+        self,
+        memory_max_bytes: Optional[int] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+        parser_version: str = PARSER_VERSION,
+    ):
+        self.memory_max_bytes = memory_max_bytes if memory_max_bytes is not None else settings.pdf_cache_memory_bytes
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else settings.pdf_cache_disk_bytes
+        self.disk_dir = Path(disk_dir or settings.pdf_cache_dir)
+        self.parser_version = parser_version
+
+        self._memory: "OrderedDict[str, tuple[int, str, dict]]" = OrderedDict()
+        self._memory_bytes = 0
+        # Directory occupancy as of the last eviction scan (for stats only)
+        self._disk_entries: Optional[int] = None
+        self._disk_bytes: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[tuple[str, dict, str]]:
+        """Return ``(text, metadata, tier)`` or ``None`` on a miss"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits["memory"] += 1
+            metrics.incr("pdf_cache.memory_hits")
+            return entry[1], entry[2], "memory"
+
+        if self.disk_max_bytes > 0:
+            async with self._lock:
+                loaded = await asyncio.to_thread(self._disk_get, key)
+            if loaded is not None:
+                text, metadata = loaded
+                self._memory_put(key, text, metadata)
+                self.hits["disk"] += 1
+                metrics.incr("pdf_cache.disk_hits")
+                return text, metadata, "disk"
+
+        self.misses += 1
+        metrics.incr("pdf_cache.misses")
+        return None
+
+    async def set(self, key: str, text: str, metadata: dict) -> None:
+        """Store an extraction result in both tiers"""
+        self._memory_put(key, text, metadata)
+        if self.disk_max_bytes > 0:
+            async with self._lock:
+                try:
+                    await asyncio.to_thread(self._disk_put, key, text, metadata)
+                except OSError as e:
+                    logger.warning(f"⚠️ Failed to persist extraction cache entry {key[:12]}: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier occupancy"""
+        lookups = self.hits["memory"] + self.hits["disk"] + self.misses
+        return {
+            "parser_version": self.parser_version,
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.misses,
+            "hit_ratio": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": self._disk_entries,
+            "disk_bytes": self._disk_bytes,
+        }
+
+    # Memory tier
+
+    def _memory_put(self, key: str, text: str, metadata: dict) -> None:
+        size = len(text.encode("utf-8")) + len(json.dumps(metadata, default=str))
+        if size > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[0]
+        self._memory[key] = (size, text, metadata)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _key, (evicted_size, _t, _m) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            metrics.incr("pdf_cache.memory_evictions")
+
+    # Disk tier (runs in a thread)
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    @contextmanager
+    def _directory_lock(self) -> Iterator[None]:
+        """Exclusive lock shared by every process using the cache directory"""
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.disk_dir / ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _disk_get(self, key: str) -> Optional[tuple[str, dict]]:
+        # Always read the directory: entries may have been written by another process
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._disk_remove(key)
+            return None
+
+        if entry.get("parser_version") != self.parser_version:
+            # Extracted by an older parser; drop it so it gets re-extracted.
+            self._disk_remove(key)
+            metrics.incr("pdf_cache.stale")
+            return None
+
+        try:
+            os.utime(path)  # the mtime is the LRU order every process shares
+        except OSError:
+            pass
+        return entry["text"], entry["metadata"]
+
+    def _disk_put(self, key: str, text: str, metadata: dict) -> None:
+        payload = json.dumps(
+            {"parser_version": self.parser_version, "text": text, "metadata": metadata},
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8")
+        if len(payload) > self.disk_max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name: threads or processes writing the same key must not share it
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{key}.", suffix=".tmp", delete=False) as f:
+            f.write(payload)
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used entries until the directory fits ``disk_max_bytes``.
+
+        The directory is scanned under the shared lock rather than tracked in
+        memory, so the bound holds across the API and worker processes.
+        """
+        with self._directory_lock():
+            files = []
+            for path in self.disk_dir.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path, stat.st_size))
+            files.sort()
+            total = sum(size for _mtime, _path, size in files)
+            evicted = 0
+            for _mtime, path, size in files:
+                if total <= self.disk_max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+                metrics.incr("pdf_cache.disk_evictions")
+            self._disk_entries = len(files) - evicted
+            self._disk_bytes = total
+
+    def _disk_remove(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+
+# Global cache instance used by PDFParserService
+extraction_cache = ExtractionCache()
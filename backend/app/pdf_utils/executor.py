@@ -0,0 +1,430 @@
+"""
+PDF Extraction Executor - runs pypdf work in a managed process pool
+
+Extraction is pure-CPU work; running it inline on the event loop stalls every
+other request on the worker. Jobs are submitted to a process pool whose workers
+are recycled after a fixed number of jobs to cap memory growth.
+
+Timeouts cover execution only: workers report when a job starts, and a job
+waiting for a free worker is never timed out, so a burst of uploads queues
+instead of failing. A job that overruns or kills its worker takes the pool down
+with it: the pool is replaced (once per pool generation, however many jobs
+notice) and its processes are terminated, so hung PDFs cannot tie up every
+worker. Jobs lost with a replaced pool are resubmitted once.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from app.pdf_utils.parser import (
+    assemble_pages,
+    build_metadata,
+    extract_page_range,
+    extract_text_or_count_pages,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PDFExtractionExecutor:
+    """Process pool for PDF extraction with per-job timeouts and queue metrics"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+        timeout: Optional[float] = None,
+        parallel_threshold: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or settings.pdf_executor_workers
+        self.max_tasks_per_child = max_tasks_per_child or settings.pdf_executor_max_tasks_per_child
+        self.timeout = timeout or settings.pdf_extraction_timeout
+        self.parallel_threshold = (
+            parallel_threshold if parallel_threshold is not None else settings.pdf_parallel_page_threshold
+        )
+        self.min_pages_per_chunk = settings.pdf_parallel_min_pages_per_chunk
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._generation = 0  # bumped each time the pool is replaced
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._job_ids = itertools.count()
+        self._starts: Dict[int, _JobStart] = {}
+        self._stop_watching = threading.Event()
+        self._orphans: set = set()
+        self._workers: Dict[int, Dict[int, Any]] = {}  # replaced pools' processes by generation
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        """Create the process pool (idempotent)"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # "spawn" is required for max_tasks_per_child and keeps the event loop's
+        # threads and sockets out of the workers.
+        context = multiprocessing.get_context("spawn")
+        # Workers report job starts on a lock-free pipe (each report is a single
+        # atomic write), so a worker killed mid-report cannot block the others.
+        reports, writer = context.Pipe(duplex=False)
+        self._stop_watching = threading.Event()
+        pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            max_tasks_per_child=self.max_tasks_per_child,
+            initializer=_init_worker,
+            initargs=(writer,),
+        )
+        threading.Thread(
+            target=self._watch_starts,
+            args=(reports, writer, self._stop_watching),
+            name="pdf-executor-starts",
+            daemon=True,
+        ).start()
+        metrics.set_gauge("pdf_executor.workers", self.max_workers)
+        logger.info(
+            f"🧵 PDF extraction pool started - workers: {self.max_workers}, "
+            f"recycle after {self.max_tasks_per_child} jobs, timeout {self.timeout}s"
+        )
+        return pool
+
+    def _watch_starts(self, reports: Any, writer: Any, stop: threading.Event) -> None:
+        """Forward start reports from the workers to the jobs awaiting them"""
+        while not stop.is_set():
+            try:
+                if not reports.poll(0.5):
+                    continue
+                job_id, pid = reports.recv()
+            except (OSError, EOFError):
+                return
+            with self._lock:
+                start = self._starts.get(job_id)
+            if start is not None:
+                start.mark(pid)
+        # The pool is gone; the parent's write end was only kept for new workers
+        writer.close()
+        reports.close()
+
+    def shutdown(self) -> None:
+        """Shut down the pool, cancelling jobs that have not started"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            stop = self._stop_watching
+        if pool is None:
+            return
+        pool.shutdown(wait=False, cancel_futures=True)
+        stop.set()
+        logger.info("🛑 PDF extraction pool stopped")
+
+    def _recycle(self, generation: int, reason: str) -> None:
+        """Replace the pool of ``generation`` with a fresh one and kill its workers.
+
+        Jobs that fail together all report the same generation; only the
+        first one replaces the pool.
+        """
+        with self._lock:
+            if generation != self._generation or self._pool is None:
+                return
+            pool, stop = self._pool, self._stop_watching
+            self._pool = self._new_pool()
+            self._generation += 1
+        metrics.incr("pdf_executor.recycled")
+        logger.error(f"❌ PDF extraction pool recycled ({reason})")
+        # Shutdown alone would wait for hung jobs; their workers have to be killed
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        self._workers[generation] = {process.pid: process for process in processes}
+        self._workers.pop(generation - 4, None)
+        pool.shutdown(wait=False, cancel_futures=True)
+        stop.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run ``fn(*args)`` in the pool and await the result.
+
+        Raises ``asyncio.TimeoutError`` when the job runs longer than its
+        timeout (time spent waiting for a worker does not count); the pool is
+        then recycled so the hung worker is killed. A job lost to a recycle or a
+        dead worker is resubmitted once.
+        """
+        # Scripts and taskiq workers have no lifespan; start on first use.
+        self.start()
+
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.timeout
+        queued_at = time.time()
+        self._in_flight += 1
+        self._update_gauges()
+        metrics.incr("pdf_executor.submitted")
+
+        resubmitted = False
+        try:
+            while True:
+                job_id = next(self._job_ids)
+                start = _JobStart(loop)
+                with self._lock:
+                    pool, generation = self._pool, self._generation
+                    self._starts[job_id] = start
+                try:
+                    try:
+                        future = pool.submit(_job, job_id, fn, *args)
+                    except BaseException:
+                        self._forget_job(job_id)
+                        raise
+                    job = asyncio.ensure_future(self._run_job(job_id, future, start, timeout, generation))
+                    try:
+                        started_at, result = await asyncio.shield(job)
+                    except asyncio.CancelledError:
+                        if not job.done() and not future.cancel():
+                            # Already handed to a worker: keep holding it to its
+                            # timeout after the caller has gone
+                            self._orphans.add(job)
+                            job.add_done_callback(self._orphan_done)
+                        raise
+                    metrics.observe("pdf_executor.queue_wait", max(0.0, started_at - queued_at))
+                    metrics.observe("pdf_executor.job_time", time.time() - queued_at)
+                    metrics.incr("pdf_executor.completed")
+                    return result
+                except BrokenProcessPool:
+                    if generation == self._generation:
+                        # A worker died (e.g. OOM on a hostile PDF); rebuild the pool
+                        # so subsequent jobs are not rejected.
+                        metrics.incr("pdf_executor.broken_pool")
+                        self._recycle(generation, "worker died")
+                    if not resubmitted and not await self._killed_its_worker(generation, start):
+                        # Lost with the pool another job broke (or recycled)
+                        resubmitted = True
+                        metrics.incr("pdf_executor.resubmitted")
+                        continue
+                    raise
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    raise
+                except Exception:
+                    metrics.incr("pdf_executor.failed")
+                    raise
+        finally:
+            self._in_flight -= 1
+            self._update_gauges()
+
+    async def _run_job(
+        self,
+        job_id: int,
+        future: Future,
+        start: "_JobStart",
+        timeout: float,
+        generation: int,
+    ) -> Any:
+        """Wait for a worker to pick the job up, then allow it ``timeout`` seconds"""
+        result = asyncio.wrap_future(future)
+        start_waiter = asyncio.ensure_future(start.event.wait())
+        try:
+            await asyncio.wait({result, start_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            return await asyncio.wait_for(result, timeout=timeout)
+        except asyncio.TimeoutError:
+            metrics.incr("pdf_executor.timeouts")
+            self._recycle(generation, "job timed out")
+            raise
+        finally:
+            start_waiter.cancel()
+            self._forget_job(job_id)
+
+    async def _killed_its_worker(self, generation: int, start: "_JobStart") -> bool:
+        """Whether the job's own worker died, rather than being terminated with its pool"""
+        if start.pid is None:
+            # The start report may still be in flight; a job that never started did not crash
+            try:
+                await asyncio.wait_for(start.event.wait(), timeout=0.5)
+            except asyncio.TimeoutError:
+                return False
+        process = self._workers.get(generation, {}).get(start.pid)
+        if process is None:
+            return False
+        # The pool notices a crash as soon as the worker's pipe closes, before it has exited
+        await asyncio.to_thread(process.join, 5)
+        return process.exitcode not in (None, -signal.SIGTERM)
+
+    def _forget_job(self, job_id: int) -> None:
+        with self._lock:
+            self._starts.pop(job_id, None)
+
+    def _orphan_done(self, job: asyncio.Future) -> None:
+        self._orphans.discard(job)
+        if not job.cancelled():
+            job.exception()  # retrieved: nobody is left to handle it
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free worker"""
+        return max(0, self._in_flight - self.max_workers)
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("pdf_executor.in_flight", self._in_flight)
+        metrics.set_gauge("pdf_executor.queue_depth", self.queue_depth)
+
+    async def extract_text(
+        self,
+        pdf_content: bytes,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> tuple[str, dict]:
+        """Extract text and metadata in the pool; failures use the parser's error shape.
+
+        Documents with at least ``PDF_PARALLEL_PAGE_THRESHOLD`` pages to extract are
+        split into contiguous page ranges that run on separate workers and are
+        reassembled in page order. Smaller files take the single-job fast path.
+        """
+        start_time = time.time()
+        try:
+            num_pages, result = await self.submit(
+                extract_text_or_count_pages, pdf_content, max_pages, max_chars,
+                self.parallel_threshold or None, timeout=timeout,
+            )
+            if result is not None:
+                return result
+            return await self._extract_parallel(pdf_content, num_pages, max_pages, max_chars, timeout)
+        except asyncio.TimeoutError:
+            error_time = time.time() - start_time
+            logger.error(f"❌ PDF extraction timed out after {error_time:.2f}s")
+            return "", {"error": f"PDF extraction timed out after {error_time:.0f}s", "failed_after": round(error_time, 2)}
+        except Exception as e:
+            error_time = time.time() - start_time
+            logger.error(f"❌ PDF extraction job failed after {error_time:.2f}s: {str(e)}")
+            return "", {"error": str(e), "failed_after": round(error_time, 2)}
+
+    async def _extract_parallel(
+        self,
+        pdf_content: bytes,
+        num_pages: int,
+        max_pages: Optional[int],
+        max_chars: Optional[int],
+        timeout: Optional[float],
+    ) -> tuple[str, dict]:
+        """Split the page range across workers and reassemble the text in page order.
+
+        The timeout covers the whole document. The first failing chunk cancels the
+        rest, and once the leading chunks meet ``max_chars`` the later ones are
+        dropped.
+        """
+        start_time = time.time()
+        pages_wanted = min(num_pages, max_pages) if max_pages else num_pages
+        chunk_size = max(self.min_pages_per_chunk, math.ceil(pages_wanted / self.max_workers))
+        ranges = [(start, min(start + chunk_size, pages_wanted)) for start in range(0, pages_wanted, chunk_size)]
+        logger.info(f"🔀 Extracting {pages_wanted} pages in {len(ranges)} parallel chunks")
+        metrics.incr("pdf_executor.parallel_documents")
+
+        loop = asyncio.get_running_loop()
+        budget = timeout or self.timeout
+        deadline = loop.time() + budget  # for the whole document, not per chunk
+        tasks = {
+            asyncio.ensure_future(self.submit(extract_page_range, pdf_content, start, stop, timeout=budget)): index
+            for index, (start, stop) in enumerate(ranges)
+        }
+        chunks: list = [None] * len(ranges)
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError
+                for task in done:
+                    chunks[tasks[task]] = task.result()
+                if max_chars is not None and _leading_chars(chunks) >= max_chars:
+                    # The budget is met by the first pages; later ranges are not needed
+                    metrics.incr("pdf_executor.chunks_dropped", len(pending))
+                    break
+        finally:
+            # On failure, timeout or an early stop: queued chunks are dropped, running
+            # ones are still held to their own timeout by submit
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        extraction_time = time.time() - start_time
+
+        chunks = [chunk for chunk in chunks if chunk is not None]
+        pages = [page for chunk_pages, _info in chunks for page in chunk_pages]
+        text, page_timings = assemble_pages(pages, max_chars=max_chars)
+        metadata = build_metadata(
+            len(pdf_content), num_pages, page_timings, text,
+            extraction_time, 0.0, chunks[0][1] if chunks else {}
+        )
+        metadata.update({"parallel": True, "chunks": len(ranges)})
+        logger.info(f"✅ Page-parallel extraction completed in {extraction_time:.2f}s - {len(text)} chars total")
+        return text, metadata
+
+    def stats(self) -> dict:
+        """Current pool configuration and queue depth"""
+        return {
+            "started": self.started,
+            "generation": self._generation,
+            "workers": self.max_workers,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "timeout": self.timeout,
+            "parallel_threshold": self.parallel_threshold,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+        }
+
+
+class _JobStart:
+    """Start report for one submitted job, filled in by the report thread"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.event = asyncio.Event()
+        self.pid: Optional[int] = None
+
+    def mark(self, pid: int) -> None:
+        self.pid = pid
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:  # the submitting loop has closed
+            pass
+
+
+_report_writer: Any = None
+
+
+def _init_worker(report_writer: Any) -> None:
+    global _report_writer
+    _report_writer = report_writer
+
+
+def _job(job_id: int, fn: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    """Worker-side wrapper reporting when (and in which process) the job started"""
+    if _report_writer is not None:
+        _report_writer.send((job_id, os.getpid()))
+    return time.time(), fn(*args)
+
+
+def _leading_chars(chunks: list) -> int:
+    """Characters in the chunks already finished from the first page on"""
+    total = 0
+    for chunk in chunks:
+        if chunk is None:
+            break
+        total += sum(len(page_text) for _page, page_text, _seconds in chunk[0])
+    return total
+
+
+# Global executor instance, started and stopped by the FastAPI lifespan
+extraction_executor = PDFExtractionExecutor()
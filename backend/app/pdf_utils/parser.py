@@ -6,12 +6,156 @@ import io
 import time
 import logging
 import pypdf
+from typing import Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction output changes; cached results from other versions are discarded
+PARSER_VERSION = "3"
 
-def extract_text_from_pdf(pdf_content: bytes) -> tuple[str, dict]:
-    """Extract text and metadata from PDF using PyPDF"""
+
+def iter_reader_pages(
+    reader: pypdf.PdfReader,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> Iterator[tuple[int, str]]:
+    """Yield ``(page_number, page_text)`` one page at a time, stopping at the budget.
+
+    Pages are parsed lazily, so once ``max_pages`` pages have been yielded or the
+    yielded text reaches ``max_chars`` characters the remaining pages are never
+    touched. Page numbers are 1-based.
+    """
+    total_chars = 0
+    for page_num, page in enumerate(reader.pages):
+        if max_pages is not None and page_num >= max_pages:
+            return
+        if max_chars is not None and total_chars >= max_chars:
+            return
+
+        page_start = time.time()
+        page_text = page.extract_text() or ""
+        page_time = time.time() - page_start
+
+        if page_text.strip():
+            logger.debug(f"📝 Page {page_num + 1} extracted in {page_time:.2f}s - {len(page_text)} chars")
+        else:
+            logger.warning(f"⚠️ Page {page_num + 1} has no extractable text")
+
+        total_chars += len(page_text)
+        yield page_num + 1, page_text
+
+
+def iter_pdf_pages(
+    pdf_content: bytes,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> Iterator[tuple[int, str]]:
+    """Yield ``(page_number, page_text)`` from PDF bytes within the given budget"""
+    reader = pypdf.PdfReader(io.BytesIO(pdf_content))
+    yield from iter_reader_pages(reader, max_pages=max_pages, max_chars=max_chars)
+
+
+def _pdf_info(reader: pypdf.PdfReader) -> dict:
+    """Document info fields reported in the metadata"""
+    if not reader.metadata:
+        return {}
+    pdf_info = reader.metadata
+    return {
+        "title": pdf_info.get("/Title", "Unknown"),
+        "author": pdf_info.get("/Author", "Unknown"),
+        "creator": pdf_info.get("/Creator", "Unknown")
+    }
+
+
+def assemble_pages(
+    pages: list[tuple[int, str, float]],
+    max_chars: Optional[int] = None,
+) -> tuple[str, list[dict]]:
+    """Join ``(page_number, page_text, seconds)`` results in page order.
+
+    Applies the character budget the same way ``iter_reader_pages`` does, so the
+    single-process and page-parallel paths produce identical text. Returns the
+    text and the per-page timings of the pages that were kept.
+    """
+    parts = []
+    timings = []
+    total_chars = 0
+    for page_number, page_text, seconds in sorted(pages, key=lambda p: p[0]):
+        if max_chars is not None and total_chars >= max_chars:
+            break
+        total_chars += len(page_text)
+        timings.append({"page": page_number, "chars": len(page_text), "seconds": round(seconds, 4)})
+        if page_text.strip():
+            parts.append(f"Page {page_number}:\n{page_text}\n\n")
+    return "".join(parts).strip(), timings
+
+
+def build_metadata(
+    pdf_size: int,
+    num_pages: int,
+    page_timings: list[dict],
+    text: str,
+    extraction_time: float,
+    parse_time: float,
+    pdf_info: dict,
+) -> dict:
+    """Metadata shared by the single-process and page-parallel paths"""
+    metadata = {
+        "num_pages": num_pages,
+        "pages_parsed": len(page_timings),
+        "truncated": len(page_timings) < num_pages,
+        "size_kb": round(pdf_size / 1024, 2),
+        "has_text": bool(text.strip()),
+        "extraction_time": round(extraction_time, 2),
+        "parse_time": round(parse_time, 2),
+        "page_timings": page_timings,
+    }
+    metadata.update(pdf_info)
+    return metadata
+
+
+def extract_page_range(pdf_content: bytes, start: int, stop: int) -> tuple[list[tuple[int, str, float]], dict]:
+    """Extract pages ``[start, stop)`` (0-based) for the page-parallel path.
+
+    Returns ``(page_number, page_text, seconds)`` per page plus the document info,
+    so any chunk can supply the metadata fields.
+    """
+    reader = pypdf.PdfReader(io.BytesIO(pdf_content))
+    pages = []
+    for page_num in range(start, min(stop, len(reader.pages))):
+        page_start = time.time()
+        page_text = reader.pages[page_num].extract_text() or ""
+        pages.append((page_num + 1, page_text, time.time() - page_start))
+    return pages, _pdf_info(reader)
+
+
+def extract_text_from_pdf(
+    pdf_content: bytes,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> tuple[str, dict]:
+    """Extract text and metadata from PDF using PyPDF.
+
+    Without a budget the whole document is extracted. With ``max_pages`` or
+    ``max_chars`` extraction stops early and the metadata is marked ``truncated``.
+    """
+    _num_pages, result = extract_text_or_count_pages(pdf_content, max_pages, max_chars)
+    return result
+
+
+def extract_text_or_count_pages(
+    pdf_content: bytes,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    parallel_threshold: Optional[int] = None,
+) -> tuple[int, Optional[tuple[str, dict]]]:
+    """Single-process extraction, or only a page count for large documents.
+
+    When ``parallel_threshold`` is set and the document has at least that many
+    pages to extract, returns ``(num_pages, None)`` without extracting anything so
+    the caller can split the pages across workers. Otherwise returns
+    ``(num_pages, (text, metadata))``.
+    """
     start_time = time.time()
     logger.info(f"📄 Starting PDF text extraction - Size: {len(pdf_content)} bytes")
     
@@ -21,43 +165,37 @@ def extract_text_from_pdf(pdf_content: bytes) -> tuple[str, dict]:
         pdf_stream = io.BytesIO(pdf_content)
         reader = pypdf.PdfReader(pdf_stream)
         pdf_parse_time = time.time() - pdf_parse_start
-        logger.info(f"📖 PDF parsed in {pdf_parse_time:.2f}s - Pages: {len(reader.pages)}")
+        num_pages = len(reader.pages)
+        logger.info(f"📖 PDF parsed in {pdf_parse_time:.2f}s - Pages: {num_pages}")
+
+        pages_wanted = min(num_pages, max_pages) if max_pages else num_pages
+        if parallel_threshold and pages_wanted >= parallel_threshold:
+            logger.info(f"🔀 {pages_wanted} pages >= {parallel_threshold}; handing off to page-parallel extraction")
+            return num_pages, None
         
-        # Extract text from all pages
+        # Extract text page by page within the budget
         text_extract_start = time.time()
-        text = ""
-        for page_num, page in enumerate(reader.pages):
+        pages = []
+        page_iter = iter_reader_pages(reader, max_pages=max_pages, max_chars=max_chars)
+        while True:
             page_start = time.time()
-            page_text = page.extract_text()
-            page_time = time.time() - page_start
-            
-            if page_text.strip():
-                text += f"Page {page_num + 1}:\n{page_text}\n\n"
-                logger.debug(f"📝 Page {page_num + 1} extracted in {page_time:.2f}s - {len(page_text)} chars")
-            else:
-                logger.warning(f"⚠️ Page {page_num + 1} has no extractable text")
+            item = next(page_iter, None)
+            if item is None:
+                break
+            pages.append((item[0], item[1], time.time() - page_start))
+        text, page_timings = assemble_pages(pages)
         
         text_extract_time = time.time() - text_extract_start
+        if len(page_timings) < num_pages:
+            logger.info(f"✂️ Stopped after {len(page_timings)}/{num_pages} pages (budget reached)")
         logger.info(f"📝 Text extraction completed in {text_extract_time:.2f}s - {len(text)} chars total")
         
         # Get metadata
         metadata_start = time.time()
-        metadata = {
-            "num_pages": len(reader.pages),
-            "size_kb": round(len(pdf_content) / 1024, 2),
-            "has_text": bool(text.strip()),
-            "extraction_time": round(text_extract_time, 2),
-            "parse_time": round(pdf_parse_time, 2)
-        }
-        
-        # Try to get PDF info
-        if reader.metadata:
-            pdf_info = reader.metadata
-            metadata.update({
-                "title": pdf_info.get("/Title", "Unknown"),
-                "author": pdf_info.get("/Author", "Unknown"),
-                "creator": pdf_info.get("/Creator", "Unknown")
-            })
+        metadata = build_metadata(
+            len(pdf_content), num_pages, page_timings, text,
+            text_extract_time, pdf_parse_time, _pdf_info(reader)
+        )
         
         metadata_time = time.time() - metadata_start
         total_time = time.time() - start_time
@@ -65,9 +203,9 @@ def extract_text_from_pdf(pdf_content: bytes) -> tuple[str, dict]:
         logger.info(f"📊 Metadata extracted in {metadata_time:.2f}s")
         logger.info(f"✅ PDF processing completed in {total_time:.2f}s total")
         
-        return text.strip(), metadata
+        return num_pages, (text, metadata)
         
     except Exception as e:
         error_time = time.time() - start_time
         logger.error(f"❌ PDF extraction failed after {error_time:.2f}s: {str(e)}")
-        return "", {"error": str(e), "failed_after": round(error_time, 2)}
\ No newline at end of file
+        return 0, ("", {"error": str(e), "failed_after": round(error_time, 2)})
@@ -0,0 +1,39 @@
+"""
+Script to add stored resume texts missing from the search index (texts
+stored before search existed, or moved by app.migrate_resume_text).
+Safe to run more than once.
+Run with: python -m app.reindex_resume_search
+"""
+import asyncio
+
+from app.db.session import async_session, init_db
+# Registers the tables init_db needs (application rows reference vacancy)
+from app.models import application, vacancy
+from app.services.resume_search import index_resume_texts, unindexed_texts
+from app.services.resume_text import decompress_text
+
+BATCH_SIZE = 500
+
+
+async def reindex_resume_search():
+    """Index every ResumeText row the search index does not cover yet"""
+    print("Initializing database...")
+    await init_db()
+
+    indexed = 0
+    async with async_session() as session:
+        while True:
+            texts = await unindexed_texts(session, BATCH_SIZE)
+            if not texts:
+                break
+            await index_resume_texts(session, [(t.sha256, decompress_text(t.content, t.codec)) for t in texts])
+            await session.commit()
+            session.expunge_all()
+            indexed += len(texts)
+            print(f"  ✅ {indexed} texts indexed")
+
+    print(f"\n✅ Indexed {indexed} resume texts")
+
+
+if __name__ == "__main__":
+    asyncio.run(reindex_resume_search())
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import FileResponse
-from sqlmodel import select, col
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks, Query, Request
+from sqlmodel import select, col, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from sqlalchemy.orm import load_only
+from typing import List, Literal, Optional, Union
 import logging
-import aiofiles
-from app.models.application import Application, ApplicationCreate, ApplicationRead
-from app.models.vacancy import Vacancy
+from app.models.application import Application, ApplicationCreate, ApplicationRead, ApplicationSkill, ApplicationStatus, ApplicationSummary, ApplicationPage, ApplicationSummaryPage, ApplicationSearchHit
 from app.db.session import async_session
 from app.utils.file_upload import save_uploaded_file
+from app.utils.resume_storage import add_reference, storage_key
+from app.routers.files import blob_response
 from pathlib import Path
-from app.services_pdf.pdf_parser import PDFParserService
-from app.services_pdf.resume_matcher import match_resume_to_requirements
+from app.services.application_processing import insert_application, process_application, mark_application_failed
+from app.services.resume_search import SearchUnavailable, search_applications
+from app.tasks.jobs import process_candidate
+from app.services_pdf.skill_extractor import canonical_skill
+from app.utils.pagination import keyset, page_rows
 
 logger = logging.getLogger(__name__)
 
@@ -22,27 +25,15 @@ async def get_session():
     async with async_session() as session:
         yield session
 
-async def send_chat_notification(
-    application_id: str,
-    email: str,
-    first_name: str,
-    vacancy_title: str
-):
-    """Send notification to applicant with chat link"""
+async def process_application_inline(application_id: str, sha256: Optional[str] = None, pdf_bytes: Optional[bytes] = None):
+    """Fallback when the task queue is unreachable: run the pipeline in-process on the uploaded bytes"""
     try:
-        chat_url = f"http://localhost:5173/chat/{application_id}"  # Update with your frontend URL
-        
-        logger.info(f"📧 Chat notification for {first_name} ({email})")
-        logger.info(f"🔗 Chat URL: {chat_url}")
-        logger.info(f"💼 Vacancy: {vacancy_title}")
-        
-        # TODO: Implement actual email sending here
-        # For now, just log the notification
-        
+        await process_application(application_id, sha256=sha256, pdf_bytes=pdf_bytes)
     except Exception as e:
-        logger.error(f"Failed to send chat notification: {e}")
+        logger.exception(f"Inline resume processing failed for {application_id}: {e}")
+        await mark_application_failed(application_id, str(e))
 
-@router.post("", response_model=ApplicationRead, status_code=201)
+@router.post("", response_model=ApplicationRead, status_code=202)
 async def submit_application(
     background_tasks: BackgroundTasks,
     vacancy_id: str = Form(...),
@@ -60,124 +51,58 @@ async def submit_application(
     - **last_name**: Applicant's last name
     - **email**: Applicant's email
     - **resume**: Resume file (PDF only)
-    """
-    # Verify vacancy exists
-    result = await session.execute(
-        select(Vacancy).where(Vacancy.id == vacancy_id)
-    )
-    vacancy = result.scalar_one_or_none()
-    
-    if not vacancy:
-        raise HTTPException(status_code=404, detail="Vacancy not found")
     
+    Returns 202 with `status="processing"`; poll `GET /api/applications/{id}`
+    until the status becomes `completed` or `failed`.
+    """
     # Save resume file
     try:
-        resume_path = await save_uploaded_file(resume)
+        upload = await save_uploaded_file(resume)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
     
-    # Create application
-    application = Application(
+    # Create application; parsing and matching happen in the taskiq worker.
+    # The vacancy check, insert and read-back are one INSERT ... RETURNING.
+    application = await insert_application(session, Application(
         vacancy_id=vacancy_id,
         first_name=first_name,
         last_name=last_name,
         email=email,
-        resume_pdf=resume_path
-    )
-    
-    session.add(application)
+        resume_pdf=upload.path,
+        status=ApplicationStatus.PROCESSING
+    ))
+    if not application:
+        # The stored file may be shared with other applications; the resume GC removes it if unreferenced
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Vacancy not found")
+    await add_reference(session, upload.sha256, upload.path, upload.size)
     await session.commit()
-    await session.refresh(application)
     
-    # Try to analyze resume vs job requirements (best-effort; non-blocking on errors)
     try:
-        # Build requirements text
-        reqs = vacancy.requirements
-        if reqs:
-            if isinstance(reqs, dict):
-                job_requirements_text = "\n".join(
-                    f"{k}: {v}" for k, v in reqs.items()
-                )
-            else:
-                job_requirements_text = str(reqs)
-        else:
-            job_requirements_text = vacancy.description or ""
-
-        # Read saved PDF bytes
-        file_path = Path(resume_path)
-        if not file_path.exists():
-            alt_path = Path.cwd() / resume_path
-            file_path = alt_path if alt_path.exists() else file_path
-
-        pdf_bytes: Optional[bytes] = None
-        if file_path.exists():
-            async with aiofiles.open(file_path, 'rb') as f:
-                pdf_bytes = await f.read()
-
-        if pdf_bytes:
-            parser = PDFParserService()
-            extracted_text, _meta = parser.extract_text_from_pdf(pdf_bytes)
-            if extracted_text:
-                # Store the parsed resume text
-                application.resume_parsed = {
-                    "raw_text": extracted_text,
-                    "metadata": _meta
-                }
-                session.add(application)
-                await session.commit()
-                await session.refresh(application)
-                logger.info(f"✅ Resume parsed and stored: {len(extracted_text)} chars")
-                
-                result = await match_resume_to_requirements(
-                    job_requirements=job_requirements_text,
-                    resume_text=extracted_text,
-                    model="gpt-4o-mini",
-                )
-                if isinstance(result, dict) and not result.get("error"):
-                    # Update application with analysis
-                    fit_raw = result.get("FIT_SCORE")
-                    score_val = None
-                    if isinstance(fit_raw, (int, float)):
-                        score_val = float(fit_raw)
-                    elif isinstance(fit_raw, str):
-                        try:
-                            score_val = float(fit_raw.strip())
-                        except Exception:
-                            score_val = None
-                    application.matching_score = score_val
-                    # Store the full result (with requirements array) in matching_sections
-                    application.matching_sections = result
-                    session.add(application)
-                    await session.commit()
-                    await session.refresh(application)
-                    logger.info(f"✅ Resume analyzed: FIT_SCORE={score_val}")
-                    
-                    # Send chat notification if score is below threshold
-                    if score_val and score_val < 80:
-                        background_tasks.add_task(
-                            send_chat_notification,
-                            str(application.id),
-                            email,
-                            first_name,
-                            vacancy.title
-                        )
-                        logger.info(f"🤖 Chat notification queued for application {application.id}")
-                else:
-                    logger.warning(f"Resume matching failed or invalid response: {result}")
-            else:
-                logger.warning("No text extracted from uploaded resume for matching")
-        else:
-            logger.warning("Saved resume file not found or empty; skipping matching")
+        await process_candidate.kiq(str(application.id), sha256=upload.sha256)
+        logger.info(f"📨 Queued resume processing for application {application.id}")
     except Exception as e:
-        logger.exception(f"Resume matching pipeline failed: {e}")
+        logger.error(f"Task queue unavailable ({e}); processing application {application.id} in-process")
+        background_tasks.add_task(process_application_inline, str(application.id), upload.sha256, upload.content)
 
     return application
 
-@router.get("", response_model=List[ApplicationRead])
+def summary_load_options():
+    """Load only the ApplicationSummary columns; touching any other column raises instead of querying"""
+    return load_only(*(getattr(Application, name) for name in ApplicationSummary.model_fields), raiseload=True)
+
+@router.get(
+    "",
+    response_model=Union[List[ApplicationRead], List[ApplicationSummary], ApplicationPage, ApplicationSummaryPage],
+)
 async def get_applications(
     vacancy_id: Optional[str] = None,
+    skill: Optional[List[str]] = Query(None),
+    view: Literal["full", "summary"] = "full",
+    sort: Literal["created_at", "matching_score"] = "created_at",
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
     session: AsyncSession = Depends(get_session)
@@ -186,20 +111,90 @@ async def get_applications(
     Get list of applications (admin/HR only - authentication to be added)
     
     - **vacancy_id**: Filter by vacancy ID
-    - **skip**: Number of records to skip (pagination)
+    - **skill**: Only applications with all of these skills (repeatable; aliases such as "k8s" accepted)
+    - **view**: `full` (default) or `summary`, which leaves out `resume_parsed` and
+      `matching_sections` (fetch them with `GET /api/applications/{id}`)
+    - **sort**: `created_at` (newest first, default) or `matching_score` (highest first, unscored last)
+    - **cursor**: Keyset pagination. Pass an empty value for the first page, then the returned
+      `next_cursor`; the response becomes `{"items": [...], "next_cursor": ...}` and `skip` is ignored
+    - **skip**: Number of records to skip (offset pagination)
     - **limit**: Maximum number of records to return
     """
     query = select(Application)
+    if view == "summary":
+        query = query.options(summary_load_options())
     
     if vacancy_id:
         query = query.where(Application.vacancy_id == vacancy_id)
+
+    if skill:
+        wanted = {canonical_skill(s) for s in skill}
+        matching = (
+            select(ApplicationSkill.application_id)
+            .where(col(ApplicationSkill.skill).in_(wanted))
+            .group_by(ApplicationSkill.application_id)
+            .having(func.count() == len(wanted))
+        )
+        query = query.where(col(Application.id).in_(matching))
+    
+    schema = ApplicationSummary if view == "summary" else ApplicationRead
+    query = keyset(
+        query,
+        sort,
+        col(getattr(Application, sort)),
+        col(Application.id),
+        cursor,
+        nullable=sort == "matching_score",
+        timestamp=sort == "created_at",
+    )
     
-    query = query.offset(skip).limit(limit).order_by(col(Application.created_at).desc())
+    if cursor is None:
+        result = await session.execute(query.offset(skip).limit(limit))
+        return [schema.model_validate(application) for application in result.scalars().all()]
     
-    result = await session.execute(query)
-    applications = result.scalars().all()
+    result = await session.execute(query.limit(limit + 1))
+    applications, next_cursor = page_rows(result.scalars().all(), limit, sort, sort)
+    page = ApplicationSummaryPage if view == "summary" else ApplicationPage
+    return page(items=[schema.model_validate(a) for a in applications], next_cursor=next_cursor)
+
+@router.get("/search", response_model=List[ApplicationSearchHit])
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=200),
+    vacancy_id: Optional[List[str]] = Query(None),
+    status: Optional[str] = None,
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Search applicants by keywords in their resume text (admin/HR only - authentication to be added)
     
-    return applications
+    - **q**: Keywords, e.g. `Kubernetes Almaty`; every word must appear in the resume
+    - **vacancy_id**: Only applications to these vacancies (repeatable)
+    - **status**: Only applications with this status
+    - **min_score**: Only applications scoring at least this much
+    - **skip** / **limit**: Offset pagination over the ranked results
+    
+    Results are ranked best match first, each with a highlighted snippet of the resume.
+    """
+    try:
+        hits = await search_applications(
+            session,
+            q,
+            vacancy_ids=vacancy_id,
+            status=status,
+            min_score=min_score,
+            limit=limit,
+            offset=skip,
+            options=[summary_load_options()],
+        )
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return [
+        ApplicationSearchHit(application=ApplicationSummary.model_validate(application), rank=rank, snippet=snippet)
+        for application, rank, snippet in hits
+    ]
 
 @router.get("/{application_id}", response_model=ApplicationRead)
 async def get_application(
@@ -224,10 +219,14 @@ async def get_application(
 @router.get("/{application_id}/resume")
 async def download_application_resume(
     application_id: str,
+    request: Request,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Download the resume PDF for a specific application.
+    
+    Streams from the configured blob storage with range and conditional GET
+    support, or redirects to a presigned URL when enabled.
     """
     result = await session.execute(
         select(Application).where(Application.id == application_id)
@@ -240,14 +239,11 @@ async def download_application_resume(
     if not application.resume_pdf:
         raise HTTPException(status_code=404, detail="No resume file associated with this application")
 
-    file_path = Path(application.resume_pdf)
-    if not file_path.exists() or not file_path.is_file():
-        # Try resolving relative to current working dir
-        alt_path = Path.cwd() / application.resume_pdf
-        if not alt_path.exists() or not alt_path.is_file():
-            raise HTTPException(status_code=404, detail="Resume file not found on server")
-        file_path = alt_path
-
-    return FileResponse(path=str(file_path), media_type="application/pdf", filename=file_path.name)
+    return await blob_response(
+        request,
+        storage_key(application.resume_pdf),
+        filename=Path(application.resume_pdf).name,
+        media_type="application/pdf",
+    )
 
 
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, WebSocket, HTTPException, Query
-from sqlmodel import select, desc
+from sqlmodel import select, desc, col
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from typing import Optional, List, Union
 from app.db.session import async_session
 from app.models.conversation import (
     Conversation, ConversationMessage, ConversationCreate, 
-    ConversationRead, MessageCreate, MessageRead
+    ConversationRead, MessageCreate, MessageRead, MessagePage
 )
+from app.utils.pagination import CURSOR_PAGE_SIZE, keyset, page_rows
 from app.services.chatbot_service import ChatbotService
+from app.services.resume_text import load_resume_data
 from app.models.application import Application
 from app.models.vacancy import Vacancy
 import json
@@ -43,17 +45,37 @@ async def get_conversations(session_id: str):
         return conversations
 
 
-@router.get("/conversations/{conversation_id}/messages", response_model=List[MessageRead])
-async def get_conversation_messages(conversation_id: str):
-    """Get all messages in a conversation"""
+@router.get("/conversations/{conversation_id}/messages", response_model=Union[List[MessageRead], MessagePage])
+async def get_conversation_messages(
+    conversation_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    Get messages in a conversation, newest first
+
+    Without `cursor` all messages are returned (or the newest `limit`). With
+    `cursor` (empty for the first page, then the returned `next_cursor`) the
+    response is `{"items": [...], "next_cursor": ...}` with `limit` messages
+    per page (default 50), each page older than the previous one.
+    """
     async with async_session() as session:
-        result = await session.execute(
-            select(ConversationMessage)
-            .where(ConversationMessage.conversation_id == conversation_id)
-            .order_by(desc(ConversationMessage.created_at))
+        query = keyset(
+            select(ConversationMessage).where(ConversationMessage.conversation_id == conversation_id),
+            "created_at",
+            col(ConversationMessage.created_at),
+            col(ConversationMessage.id),
+            cursor,
+            timestamp=True,
         )
-        messages = result.scalars().all()
-        return messages
+        if cursor is None:
+            result = await session.execute(query.limit(limit) if limit else query)
+            return result.scalars().all()
+
+        limit = limit or CURSOR_PAGE_SIZE
+        result = await session.execute(query.limit(limit + 1))
+        messages, next_cursor = page_rows(result.scalars().all(), limit, "created_at", "created_at")
+        return MessagePage(items=[MessageRead.model_validate(m) for m in messages], next_cursor=next_cursor)
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=MessageRead)
@@ -107,7 +129,7 @@ async def generate_interview_questions(
             )
             differences = analysis['differences']
         
-        questions = chatbot_service.generate_interview_questions(
+        questions = await chatbot_service.generate_interview_questions(
             resume_data, vacancy_data, differences if differences else []
         )
         return {
@@ -135,8 +157,8 @@ async def chat_message(
             
             if application_id:
                 application = await session.get(Application, application_id)
-                if application and application.resume_parsed:
-                    resume_data = application.resume_parsed
+                if application:
+                    resume_data = await load_resume_data(session, application)
             
             if vacancy_id:
                 vacancy = await session.get(Vacancy, vacancy_id)
@@ -163,7 +185,7 @@ async def chat_message(
                 ]
             
             # Generate response
-            response = chatbot_service.chat_with_context(
+            response = await chatbot_service.chat_with_context(
                 message, resume_data, vacancy_data, conversation_history
             )
             
@@ -196,7 +218,7 @@ async def chat_message(
 async def query_knowledge_base(query: str = Query(...)):
     """Query the vector database knowledge base"""
     try:
-        result = chatbot_service.query_knowledge_base(query)
+        result = await chatbot_service.query_knowledge_base(query)
         return result
     except Exception as e:
         logger.error(f"Error querying knowledge base: {str(e)}")
@@ -205,7 +227,13 @@ async def query_knowledge_base(query: str = Query(...)):
 
 @router.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    """WebSocket endpoint for real-time chat"""
+    """
+    WebSocket endpoint for real-time chat
+    
+    Send `"stream": true` (in the initial frame or per message) to receive the
+    reply as `delta` frames followed by a `message_complete` frame with the full
+    text; otherwise a single `message` frame is sent.
+    """
     await websocket.accept()
     conversation_id = None
     
@@ -213,6 +241,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         # Receive initial message to set up conversation
         initial_data = await websocket.receive_json()
         conversation_id = initial_data.get("conversation_id")
+        stream_default = bool(initial_data.get("stream", False))
         
         # Build welcome payload and log it so we can verify the deployed server
         welcome_payload = {
@@ -231,6 +260,8 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             user_message = data.get("message", "")
             application_id = data.get("application_id")
             vacancy_id = data.get("vacancy_id")
+            # Streaming can be enabled per connection (initial frame) or per message
+            stream = bool(data.get("stream", stream_default))
             
             if not user_message:
                 continue
@@ -245,9 +276,9 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                     application = await session.get(Application, application_id)
                     if application:
                         logger.info(f"Found application: {application.first_name} {application.last_name}")
-                        # Load resume data
-                        if application.resume_parsed:
-                            resume_data = application.resume_parsed
+                        # Load resume data (the extracted text comes from ResumeText)
+                        resume_data = await load_resume_data(session, application)
+                        if resume_data:
                             logger.info(f"Loaded resume data with keys: {list(resume_data.keys()) if resume_data else 'None'}")
                         
                         # Load vacancy data from application's vacancy_id
@@ -287,12 +318,25 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                         for msg in messages
                     ]
                 
-                # Generate response
-                response = chatbot_service.chat_with_context(
-                    user_message, resume_data, vacancy_data, conversation_history
-                )
+                # Generate response: streamed as delta frames when requested
+                if stream:
+                    parts = []
+                    async for delta in chatbot_service.astream_chat_with_context(
+                        user_message, resume_data, vacancy_data, conversation_history
+                    ):
+                        parts.append(delta)
+                        await websocket.send_json({
+                            "type": "delta",
+                            "role": "assistant",
+                            "content": delta
+                        })
+                    response = "".join(parts)
+                else:
+                    response = await chatbot_service.chat_with_context(
+                        user_message, resume_data, vacancy_data, conversation_history
+                    )
                 
-                # Save to DB
+                # Save to DB once the full text is known
                 if conversation_id:
                     user_msg = ConversationMessage(
                         conversation_id=conversation_id,
@@ -308,9 +352,9 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                     session.add(assistant_msg)
                     await session.commit()
                 
-                # Send response
+                # Send response (the complete text closes a stream)
                 await websocket.send_json({
-                    "type": "message",
+                    "type": "message_complete" if stream else "message",
                     "role": "assistant",
                     "content": response
                 })
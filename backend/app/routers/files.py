@@ -0,0 +1,117 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from app.config.settings import settings
+from app.utils.blob_storage import BlobInfo, attachment_disposition, get_blob_storage
+
+router = APIRouter(prefix="/files", tags=["Files"])
+
+def _etags(header: str) -> set:
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+def _not_modified(request: Request, info: BlobInfo) -> bool:
+    """Conditional GET: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or info.etag.removeprefix("W/") in _etags(if_none_match)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(info.last_modified.timestamp()) <= int(since.timestamp())
+    return False
+
+def _byte_range(request: Request, info: BlobInfo) -> Optional[Tuple[int, int]]:
+    """
+    Requested single byte range as inclusive (start, end), or None for the whole blob.
+
+    Multi-range requests and stale If-Range validators get the whole blob.
+    """
+    header = request.headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != info.etag and if_range.strip() != formatdate(info.last_modified.timestamp(), usegmt=True):
+        return None
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), info.size - 1) if end_text else info.size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(info.size - int(end_text), 0), info.size - 1
+    except ValueError:
+        return None
+    if start > end or start >= info.size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{info.size}"},
+        )
+    return start, end
+
+async def blob_response(
+    request: Request,
+    key: str,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+) -> Response:
+    """
+    Serve a blob from the configured storage.
+
+    Redirects to a presigned URL when STORAGE_PRESIGNED_URLS is enabled and the
+    backend supports it; otherwise streams the blob with ETag/Last-Modified
+    validators, 304 responses and single byte ranges (206).
+    """
+    storage = get_blob_storage()
+    if settings.storage_presigned_urls:
+        url = await storage.presigned_url(key, settings.storage_presign_expires, filename)
+        if url:
+            return RedirectResponse(url, status_code=307)
+
+    info = await storage.stat(key)
+    if info is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    headers = {
+        "ETag": info.etag,
+        "Last-Modified": formatdate(info.last_modified.timestamp(), usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if filename:
+        headers["Content-Disposition"] = attachment_disposition(filename)
+    if _not_modified(request, info):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = _byte_range(request, info)
+    status_code = 200
+    start, end = 0, info.size - 1
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    media_type = media_type or info.content_type
+    if request.method == "HEAD" or info.size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        storage.iter_range(key, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+    )
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"])
+async def get_file(key: str, request: Request):
+    """
+    Download a stored file by its storage key (e.g. `ab/cd/<sha256>.pdf`).
+
+    Supports `Range`, `If-None-Match` and `If-Modified-Since`.
+    """
+    return await blob_response(request, key)
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from sqlmodel import select, col
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from app.models.vacancy import Vacancy, VacancyCreate, VacancyRead
+from typing import List, Optional, Union
+from app.models.vacancy import Vacancy, VacancyCreate, VacancyRead, VacancyPage, VacancyStatsRead
+from app.utils.pagination import keyset, page_rows
+from app.models.application import ApplicationSummary
+from app.routers.applications import summary_load_options
+from app.services.ranking import forget_vacancy, rank_applications
+from app.services.vacancy_stats import read_stats, recompute
+from datetime import datetime
 from app.db.session import async_session
 
 router = APIRouter(prefix="/api/vacancies", tags=["Vacancies"])
@@ -12,31 +18,91 @@ async def get_session():
     async with async_session() as session:
         yield session
 
-@router.get("", response_model=List[VacancyRead])
+@router.get("", response_model=Union[List[VacancyRead], VacancyPage])
 async def get_vacancies(
     skip: int = 0,
     limit: int = 100,
     employment_type: Optional[str] = None,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_session)
 ):
     """
-    Get list of job vacancies with optional filters
+    Get list of job vacancies with optional filters, newest first
     
-    - **skip**: Number of records to skip (pagination)
+    - **skip**: Number of records to skip (offset pagination)
     - **limit**: Maximum number of records to return
     - **employment_type**: Filter by employment type (Full-time, Part-time, etc.)
+    - **cursor**: Keyset pagination. Pass an empty value for the first page, then the returned
+      `next_cursor`; the response becomes `{"items": [...], "next_cursor": ...}` and `skip` is ignored
     """
     query = select(Vacancy)
     
     if employment_type:
         query = query.where(Vacancy.employment_type == employment_type)
     
-    query = query.offset(skip).limit(limit)
+    query = keyset(query, "created_at", col(Vacancy.created_at), col(Vacancy.id), cursor, timestamp=True)
     
-    result = await session.execute(query)
-    vacancies = result.scalars().all()
+    if cursor is None:
+        result = await session.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
     
-    return vacancies
+    result = await session.execute(query.limit(limit + 1))
+    vacancies, next_cursor = page_rows(result.scalars().all(), limit, "created_at", "created_at")
+    return VacancyPage(items=[VacancyRead.model_validate(v) for v in vacancies], next_cursor=next_cursor)
+
+@router.get("/{vacancy_id}/ranking", response_model=List[ApplicationSummary])
+async def get_vacancy_ranking(
+    vacancy_id: str,
+    response: Response,
+    limit: int = Query(20, ge=1, le=500),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Best candidates for a vacancy: the top `limit` scored applications, highest score first
+    
+    - **limit**: Number of applications to return (K)
+    - **min_score**: Only applications scoring at least this much
+    - **created_after** / **created_before**: Only applications submitted in this window
+    
+    Unscored (still processing or failed) applications are not ranked. The
+    `X-Ranking-Source` header tells whether the Redis leaderboard or the
+    database index served the request.
+    """
+    applications, source = await rank_applications(
+        session,
+        vacancy_id,
+        limit,
+        min_score=min_score,
+        created_after=created_after,
+        created_before=created_before,
+        options=[summary_load_options()],
+    )
+    response.headers["X-Ranking-Source"] = source
+    return [ApplicationSummary.model_validate(application) for application in applications]
+
+@router.get("/{vacancy_id}/stats", response_model=VacancyStatsRead)
+async def get_vacancy_stats(
+    vacancy_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Application statistics of a vacancy: counts per status, mean and median
+    score, a 10-point score histogram and applicants pending clarification
+    
+    Served from counters kept up to date with every application write, so the
+    cost does not grow with the number of applications.
+    """
+    stats = await read_stats(session, vacancy_id)
+    if stats is None:
+        if await session.get(Vacancy, vacancy_id) is None:
+            raise HTTPException(status_code=404, detail="Vacancy not found")
+        # No application written since the counters were introduced; compute once
+        await recompute(session, vacancy_id)
+        stats = await read_stats(session, vacancy_id)
+    return stats
 
 @router.get("/{vacancy_id}", response_model=VacancyRead)
 async def get_vacancy(
@@ -129,5 +195,6 @@ async def delete_vacancy(
     # Hard delete
     await session.delete(vacancy)
     await session.commit()
+    await forget_vacancy(vacancy_id)
     
     return {"message": "Vacancy deleted successfully", "id": vacancy_id}
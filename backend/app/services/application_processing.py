@@ -0,0 +1,353 @@
+"""
+Application processing pipeline: resume parsing and matching.
+
+Runs in the taskiq worker (see app.tasks.jobs) so submit_application can
+return as soon as the application row and resume file are stored.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import async_session
+from app.models.application import Application, ApplicationSkill, ApplicationStatus
+from app.models.vacancy import Vacancy
+from app.services.ranking import record_score
+from app.services.resume_text import store_resume_text
+from app.services.vacancy_stats import apply_change
+from app.services_pdf.experience_timeline import get_timeline
+from app.services_pdf.local_scorer import score_resume_locally
+from app.services_pdf.pdf_parser import PDFParserService
+from app.services_pdf.prescore import prescore
+from app.services_pdf.skill_extractor import extract_skills
+from app.services_pdf.resume_matcher import match_resume_to_requirements
+from app.utils.blob_storage import get_blob_storage
+from app.utils.resume_storage import storage_key
+
+logger = logging.getLogger(__name__)
+
+
+class ApplicationProcessingError(Exception):
+    """Raised for failures worth retrying (missing file, LLM errors)"""
+
+
+def build_job_requirements_text(vacancy: Vacancy) -> str:
+    """Flatten vacancy requirements into the text given to the matcher"""
+    reqs = vacancy.requirements
+    if reqs:
+        if isinstance(reqs, dict):
+            return "\n".join(f"{k}: {v}" for k, v in reqs.items())
+        return str(reqs)
+    return vacancy.description or ""
+
+
+def parse_fit_score(fit_raw: Any) -> Optional[float]:
+    """Coerce the model's FIT_SCORE to a float"""
+    if isinstance(fit_raw, (int, float)):
+        return float(fit_raw)
+    if isinstance(fit_raw, str):
+        try:
+            return float(fit_raw.strip())
+        except ValueError:
+            return None
+    return None
+
+
+async def score_resume(vacancy: Vacancy, resume_text: str, resume_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Score a resume against the vacancy using the configured MATCHING_MODE.
+
+    The result records which engine produced the score in ``stage``. In
+    "local+llm" mode the LLM result replaces the rule-based one when it
+    succeeds; otherwise the local score is kept.
+    """
+    mode = settings.matching_mode
+    if mode == "cascade":
+        return await score_resume_cascade(vacancy, resume_text, resume_hash)
+    if mode == "llm":
+        result = await match_resume_to_requirements(
+            job_requirements=build_job_requirements_text(vacancy),
+            resume_text=resume_text,
+            model="gpt-4o-mini",
+        )
+        return {**result, "stage": "llm"} if not result.get("error") else result
+
+    local = score_resume_locally(vacancy.requirements or vacancy.description, resume_text, resume_hash=resume_hash)
+    if mode == "local":
+        return {**local, "stage": "local"}
+
+    refined = await match_resume_to_requirements(
+        job_requirements=build_job_requirements_text(vacancy),
+        resume_text=resume_text,
+        model="gpt-4o-mini",
+    )
+    if refined.get("error"):
+        logger.warning(f"LLM refinement failed, keeping local score: {refined['error']}")
+        return {**local, "stage": "local", "refinement_error": refined["error"]}
+    return {**refined, "stage": "llm", "local_fit_score": local["FIT_SCORE"]}
+
+
+async def score_resume_cascade(vacancy: Vacancy, resume_text: str, resume_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Score with the local pre-score and call the LLM only when it is uncertain.
+
+    The LLM runs when the pre-score lies inside [CASCADE_BAND_LOW,
+    CASCADE_BAND_HIGH] or the vacancy sets ``full_scoring``. The decision
+    and the pre-score components are stored under ``cascade``.
+    """
+    job_requirements = build_job_requirements_text(vacancy)
+    pre = await prescore(vacancy.requirements or vacancy.description, job_requirements, resume_text, resume_hash)
+    local_score = pre["FIT_SCORE"]
+    low, high = settings.cascade_band_low, settings.cascade_band_high
+    cascade = {"local_score": local_score, "band": [low, high], **pre["components"]}
+    metrics.observe("matching.cascade.local_score", local_score)
+
+    if vacancy.full_scoring:
+        reason = "full_scoring"
+    elif low <= local_score <= high:
+        reason = "uncertain"
+    else:
+        decision = "accept" if local_score > high else "reject"
+        metrics.incr(f"matching.cascade.local_{decision}")
+        return {
+            "requirements": pre["requirements"],
+            "FIT_SCORE": local_score,
+            "stage": "local",
+            "cascade": {**cascade, "reason": f"confident_{decision}"},
+        }
+
+    metrics.incr(f"matching.cascade.llm_{reason}")
+    result = await match_resume_to_requirements(
+        job_requirements=job_requirements,
+        resume_text=resume_text,
+        model="gpt-4o-mini",
+    )
+    if result.get("error"):
+        return result
+    llm_score = parse_fit_score(result.get("FIT_SCORE"))
+    if llm_score is not None:
+        # How far the pre-score was from the LLM inside the band; used to tune it
+        metrics.observe("matching.cascade.llm_delta", abs(llm_score - local_score))
+    return {**result, "stage": "llm", "cascade": {**cascade, "reason": reason}}
+
+
+async def insert_application(session: AsyncSession, application: Application) -> Optional[Application]:
+    """
+    Insert ``application`` if its vacancy exists, in a single round trip.
+
+    Runs ``INSERT INTO application ... SELECT ... FROM vacancy WHERE
+    vacancy.id = :vacancy_id RETURNING ...``, so the vacancy check, the insert
+    and reading back the stored row need no separate SELECT or refresh.
+    Returns the stored row, or None when the vacancy does not exist. The
+    vacancy's statistics are updated in the same transaction; the caller
+    commits.
+    """
+    table = Application.__table__
+    # Unset columns are left to the database (NULL) rather than bound as JSON "null"
+    columns = [c for c in table.columns if getattr(application, c.name) is not None]
+    values = select(*(literal(getattr(application, c.name), c.type) for c in columns)).where(
+        Vacancy.id == application.vacancy_id
+    )
+    result = await session.execute(
+        insert(table).from_select([c.name for c in columns], values).returning(*table.columns)
+    )
+    row = result.mappings().first()
+    if not row:
+        return None
+    stored = Application(**row)
+    await apply_change(session, stored.vacancy_id, None, (stored.status, stored.matching_score))
+    return stored
+
+
+async def load_application(session: AsyncSession, application_id: str):
+    """The application and its vacancy (or None) in one query; (None, None) if the application is gone"""
+    result = await session.execute(
+        select(Application, Vacancy)
+        .outerjoin(Vacancy, Vacancy.id == Application.vacancy_id)
+        .where(Application.id == application_id)
+    )
+    row = result.first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+async def store_application_result(
+    session: AsyncSession,
+    application_id: str,
+    values: Dict[str, Any],
+    skills: Optional[Dict[str, List[str]]] = None,
+    loaded: Optional[Application] = None,
+) -> None:
+    """
+    Write pipeline results as one UPDATE (plus the ApplicationSkill rows) and commit.
+
+    ``skills`` replaces the application's skill rows when given. The status
+    and score change is applied to the vacancy's statistics in the same
+    transaction.
+
+    ``loaded`` is the application as read earlier in this session
+    (load_application). The UPDATE is then made conditional on the row being
+    unchanged since, which saves re-reading it under a lock, and skill rows
+    are only deleted if it had skills. A row changed in the meantime takes
+    the locking path.
+    """
+    now = datetime.now(timezone.utc)
+    previous = None
+    had_skills = True
+    if loaded is not None:
+        result = await session.execute(
+            update(Application)
+            .where(
+                Application.id == application_id,
+                Application.updated_at == loaded.updated_at,
+                Application.status == loaded.status,
+                Application.matching_score.is_not_distinct_from(loaded.matching_score),
+            )
+            .values(**values, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            previous = (loaded.vacancy_id, loaded.status, loaded.matching_score)
+            # Skill rows are only written with Application.skills, which bumps updated_at
+            had_skills = loaded.skills is not None
+    if previous is None:
+        # Lock the row so concurrent writers apply their statistics deltas in turn
+        previous = (await session.execute(
+            select(Application.vacancy_id, Application.status, Application.matching_score)
+            .where(Application.id == application_id)
+            .with_for_update()
+        )).first()
+        if previous is None:
+            await session.rollback()
+            return
+        await session.execute(
+            update(Application)
+            .where(Application.id == application_id)
+            .values(**values, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    if skills is not None:
+        if had_skills:
+            await session.execute(delete(ApplicationSkill).where(ApplicationSkill.application_id == application_id))
+        rows = [
+            {"application_id": application_id, "skill": name, "category": category}
+            for category, names in skills.items()
+            for name in names
+        ]
+        if rows:
+            await session.execute(insert(ApplicationSkill), rows)
+    vacancy_id, status, score = previous
+    if vacancy_id is not None:
+        new_state = (values.get("status", status), values.get("matching_score", score))
+        await apply_change(session, vacancy_id, (status, score), new_state)
+    await session.commit()
+
+
+async def read_resume_file(resume_pdf: Optional[str]) -> bytes:
+    """Read a stored resume from blob storage for processing"""
+    if not resume_pdf:
+        raise ApplicationProcessingError("Application has no resume file")
+
+    pdf_bytes = await get_blob_storage().read(storage_key(resume_pdf))
+    if pdf_bytes is None:
+        raise ApplicationProcessingError(f"Resume file not found: {resume_pdf}")
+    if not pdf_bytes:
+        raise ApplicationProcessingError("Resume file is empty")
+    return pdf_bytes
+
+
+async def process_application(
+    application_id: str,
+    sha256: Optional[str] = None,
+    pdf_bytes: Optional[bytes] = None,
+) -> Dict[str, Any]:
+    """
+    Parse the application's resume, score it against the vacancy and store the result.
+
+    ``sha256`` and ``pdf_bytes`` come from the upload when known: with the
+    bytes (in-process fallback) the file is not read back from storage, and with
+    only the hash (queued job) a cached extraction is used before touching storage.
+
+    Returns a summary with the final status and score. Raises
+    ApplicationProcessingError for failures that should be retried.
+    """
+    async with async_session() as session:
+        application, vacancy = await load_application(session, application_id)
+        if not application:
+            # Deleted (e.g. vacancy cascade) before the worker picked it up
+            logger.warning(f"Application {application_id} not found; nothing to process")
+            return {"application_id": application_id, "status": "missing"}
+
+        if not vacancy:
+            raise ApplicationProcessingError(f"Vacancy {application.vacancy_id} not found")
+
+        parsed = None
+        if pdf_bytes is None and sha256:
+            parsed = await PDFParserService.cached_resume_text(sha256)
+        if parsed:
+            extracted_text, metadata = parsed
+        else:
+            if pdf_bytes is None:
+                pdf_bytes = await read_resume_file(application.resume_pdf)
+            extracted_text, metadata = await PDFParserService.extract_resume_text(pdf_bytes, sha256=sha256)
+        if not extracted_text:
+            # Image-only or corrupt PDFs will not improve on retry
+            logger.warning(f"No text extracted from resume of application {application_id}")
+            await store_application_result(session, application_id, {
+                "resume_parsed": {"metadata": metadata},
+                "resume_text_sha256": None,
+                "status": ApplicationStatus.COMPLETED,
+                "processing_error": metadata.get("error", "No text could be extracted from the PDF"),
+            }, loaded=application)
+            return {"application_id": application_id, "status": ApplicationStatus.COMPLETED, "score": None}
+
+        timeline = get_timeline(extracted_text, metadata.get("sha256"))
+        # The text goes to the compressed ResumeText table; the row keeps its key
+        resume_parsed = {
+            "metadata": metadata,
+            "experience": timeline.to_dict(),
+        }
+        logger.info(f"✅ Resume parsed: {len(extracted_text)} chars, {timeline.total_years} years of experience")
+
+        # Local skill extraction for gap analysis and filtering (replaced on retries)
+        skills = extract_skills(extracted_text)
+
+        result = await score_resume(vacancy, extracted_text, metadata.get("sha256"))
+        if not isinstance(result, dict) or result.get("error"):
+            raise ApplicationProcessingError(f"Resume matching failed: {result}")
+
+        score_val = parse_fit_score(result.get("FIT_SCORE"))
+        # Resume text, parsed resume, skills and score (with the requirements array) land in one transaction
+        text_sha256 = await store_resume_text(session, extracted_text, metadata.get("sha256"))
+        await store_application_result(session, application_id, {
+            "resume_parsed": resume_parsed,
+            "resume_text_sha256": text_sha256,
+            "skills": skills,
+            "matching_score": score_val,
+            "matching_sections": result,
+            "status": ApplicationStatus.COMPLETED,
+            "processing_error": None,
+        }, skills=skills, loaded=application)
+        await record_score(vacancy.id, application_id, score_val)
+        logger.info(f"✅ Resume analyzed: FIT_SCORE={score_val}")
+
+        return {
+            "application_id": application_id,
+            "status": ApplicationStatus.COMPLETED,
+            "score": score_val,
+            "email": application.email,
+            "first_name": application.first_name,
+            "vacancy_title": vacancy.title,
+        }
+
+
+async def mark_application_failed(application_id: str, error: str) -> None:
+    """Record a terminal pipeline failure on the application"""
+    async with async_session() as session:
+        await store_application_result(session, application_id, {
+            "status": ApplicationStatus.FAILED,
+            "processing_error": error[:2000],
+        })
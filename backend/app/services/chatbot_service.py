@@ -2,7 +2,8 @@
 Chatbot service that integrates resume-vacancy analysis and conversation management.
 """
 import json
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, AsyncIterator
 from pydantic import SecretStr
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
@@ -10,6 +11,10 @@ from langchain_community.vectorstores import Chroma
 from app.models.application import Application
 from app.models.vacancy import Vacancy
 from app.config.settings import settings
+from app.core.metrics import metrics
+from app.services.llm_scheduler import Priority, estimate_tokens, llm_scheduler
+from app.services_pdf.experience_timeline import get_timeline, required_years
+from app.services_pdf.skill_extractor import canonical_skill, extract_skills, flatten_skills
 import os
 
 
@@ -17,10 +22,96 @@ class ChatbotService:
     """Main chatbot service for handling AI conversations and analysis"""
     
     def __init__(self):
-        api_key = SecretStr(settings.openai_api_key) if settings.openai_api_key else None
-        self.model = ChatOpenAI(api_key=api_key)
-        self.embeddings = OpenAIEmbeddings(api_key=api_key)
         self.chroma_path = os.getenv("CHROMA_PATH", "chroma")
+        self._http_client = None
+        self._model: Optional[ChatOpenAI] = None
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+    
+    def _clients(self) -> None:
+        """(Re)build the LangChain clients when the app-wide HTTP pool is new (e.g. after a lifespan restart)"""
+        http_client = settings.http_client
+        if http_client is self._http_client:
+            return
+        api_key = SecretStr(settings.openai_api_key) if settings.openai_api_key else None
+        # Share the app-wide pooled HTTP client so LangChain calls reuse keep-alive connections;
+        # retries are handled by llm_scheduler
+        self._model = ChatOpenAI(
+            api_key=api_key,
+            base_url=settings.openai_base_url,
+            http_async_client=http_client,
+            max_retries=0,
+        )
+        self._embeddings = OpenAIEmbeddings(
+            api_key=api_key,
+            base_url=settings.openai_base_url,
+            http_async_client=http_client,
+            max_retries=0,
+        )
+        self._http_client = http_client
+    
+    @property
+    def model(self) -> ChatOpenAI:
+        self._clients()
+        return self._model
+    
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        self._clients()
+        return self._embeddings
+    
+    @staticmethod
+    def _estimate_tokens(prompt: Any) -> int:
+        """Token reservation for a chat call (a prompt string or a message list)"""
+        messages = prompt if isinstance(prompt, list) else [{"role": "user", "content": prompt}]
+        return estimate_tokens(messages, settings.max_tokens, settings.openai_model)
+    
+    @staticmethod
+    def _resume_skills(resume_data: Dict[str, Any]) -> List[str]:
+        """Canonical resume skills: a skills list, a TechnicalSkills-style dict, or extracted from raw text"""
+        skills = resume_data.get('skills')
+        if isinstance(skills, list):
+            return list(dict.fromkeys(canonical_skill(str(s)) for s in skills))
+        if isinstance(skills, dict):
+            return flatten_skills({k: v for k, v in skills.items() if isinstance(v, list)})
+        return flatten_skills(extract_skills(resume_data.get('raw_text')))
+    
+    @staticmethod
+    def _vacancy_skills(vacancy_data: Dict[str, Any]) -> List[str]:
+        """Canonical skills the vacancy asks for, from lists or extracted from its requirement text"""
+        listed = []
+        for field in ('required_skills', 'requirements'):
+            value = vacancy_data.get(field)
+            if isinstance(value, list):
+                listed.extend(canonical_skill(str(s)) for s in value)
+        requirements = vacancy_data.get('requirements')
+        if isinstance(requirements, dict):
+            text = "\n".join(str(v) for k, v in requirements.items() if k.lower() != 'location')
+            listed.extend(flatten_skills(extract_skills(text)))
+        elif isinstance(requirements, str):
+            listed.extend(flatten_skills(extract_skills(requirements)))
+        return list(dict.fromkeys(listed))
+    
+    @staticmethod
+    def _resume_experience_years(resume_data: Dict[str, Any]) -> Optional[float]:
+        """Years of experience: explicit field, stored timeline, or computed from raw text"""
+        if resume_data.get('experience_years') is not None:
+            return resume_data['experience_years']
+        experience = resume_data.get('experience')
+        if isinstance(experience, dict) and 'total_years' in experience:
+            return experience['total_years']
+        if resume_data.get('raw_text'):
+            metadata = resume_data.get('metadata') or {}
+            return get_timeline(resume_data['raw_text'], metadata.get('sha256')).total_years
+        return None
+    
+    @staticmethod
+    def _vacancy_required_years(vacancy_data: Dict[str, Any]) -> Optional[float]:
+        if vacancy_data.get('experience_years') is not None:
+            return required_years(f"{vacancy_data['experience_years']} years")
+        requirements = vacancy_data.get('requirements')
+        values = requirements.values() if isinstance(requirements, dict) else [requirements]
+        found = [y for y in (required_years(v) for v in values) if y is not None]
+        return max(found) if found else None
     
     def analyze_resume_vacancy_differences(
         self, 
@@ -55,23 +146,28 @@ class ChatbotService:
                         'description': f"Resume shows '{resume_value}' but vacancy requires '{vacancy_value}'"
                     })
         
-        # Check for missing skills
-        resume_skills = set(resume_data.get('skills', []) if isinstance(resume_data.get('skills'), list) else [])
-        vacancy_required_skills = set(
-            vacancy_data.get('required_skills', []) if isinstance(vacancy_data.get('required_skills'), list) else []
-        )
-        vacancy_requirements = set(
-            vacancy_data.get('requirements', []) if isinstance(vacancy_data.get('requirements'), list) else []
-        )
+        # Check years of experience against the local employment timeline
+        resume_years = self._resume_experience_years(resume_data)
+        required = self._vacancy_required_years(vacancy_data)
+        if required is not None and resume_years is not None and float(resume_years) < required:
+            differences.append({
+                'field': 'experience_years',
+                'resume_value': resume_years,
+                'vacancy_value': required,
+                'description': f"Resume shows about {resume_years} years of experience but vacancy requires {required:g}+"
+            })
         
-        all_vacancy_requirements = vacancy_required_skills | vacancy_requirements
-        missing_skills = all_vacancy_requirements - resume_skills
+        # Check for missing skills (canonical names from the local skill taxonomy, no LLM call)
+        resume_skills = self._resume_skills(resume_data)
+        all_vacancy_requirements = self._vacancy_skills(vacancy_data)
+        resume_skill_keys = {s.lower() for s in resume_skills}
+        missing_skills = [s for s in all_vacancy_requirements if s.lower() not in resume_skill_keys]
         
         if missing_skills:
             differences.append({
                 'field': 'missing_skills',
-                'resume_value': list(resume_skills),
-                'vacancy_value': list(all_vacancy_requirements),
+                'resume_value': resume_skills,
+                'vacancy_value': all_vacancy_requirements,
                 'description': f"Missing required skills: {', '.join(missing_skills)}"
             })
         
@@ -80,17 +176,17 @@ class ChatbotService:
             'missing_count': len(differences),
             'resume_summary': {
                 'name': resume_data.get('name'),
-                'experience_years': resume_data.get('experience_years'),
-                'skills': list(resume_skills)
+                'experience_years': resume_years,
+                'skills': resume_skills
             },
             'vacancy_summary': {
                 'title': vacancy_data.get('job_title'),
-                'requirements': list(all_vacancy_requirements),
-                'experience_required': vacancy_data.get('experience_years')
+                'requirements': all_vacancy_requirements,
+                'experience_required': required if required is not None else vacancy_data.get('experience_years')
             }
         }
     
-    def generate_interview_questions(
+    async def generate_interview_questions(
         self, 
         resume_data: Dict[str, Any], 
         vacancy_data: Dict[str, Any],
@@ -144,29 +240,23 @@ Your questions:
             differences=differences_text
         )
         
-        response = self.model.invoke(prompt)
+        response = await llm_scheduler.run(
+            Priority.INTERACTIVE,
+            lambda: self.model.ainvoke(prompt),
+            estimated_tokens=self._estimate_tokens(prompt),
+            name="interview_questions",
+        )
         content = response.content if hasattr(response, 'content') else str(response)
         return str(content) if isinstance(content, (list, dict)) else content
     
-    def chat_with_context(
+    def _build_chat_messages(
         self, 
         user_message: str, 
         resume_data: Optional[Dict[str, Any]] = None,
         vacancy_data: Optional[Dict[str, Any]] = None,
         conversation_history: Optional[List[Dict[str, str]]] = None
-    ) -> str:
-        """
-        Process a chat message with optional resume/vacancy context.
-        
-        Args:
-            user_message: The user's message
-            resume_data: Optional parsed resume data for context
-            vacancy_data: Optional parsed vacancy data for context
-            conversation_history: Optional previous messages for context
-            
-        Returns:
-            String containing the AI response
-        """
+    ) -> List[Dict[str, str]]:
+        """Build the system prompt with resume/vacancy context plus the conversation"""
         if conversation_history is None:
             conversation_history = []
         
@@ -198,17 +288,72 @@ Your questions:
         else:
             print(f"🤖 Chatbot has NO context: resume_data={bool(resume_data)}, vacancy_data={bool(vacancy_data)}")
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt}
         ] + conversation_history + [
             {"role": "user", "content": user_message}
         ]
+    
+    async def chat_with_context(
+        self, 
+        user_message: str, 
+        resume_data: Optional[Dict[str, Any]] = None,
+        vacancy_data: Optional[Dict[str, Any]] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """
+        Process a chat message with optional resume/vacancy context.
         
-        response = self.model.invoke(messages)
+        Args:
+            user_message: The user's message
+            resume_data: Optional parsed resume data for context
+            vacancy_data: Optional parsed vacancy data for context
+            conversation_history: Optional previous messages for context
+            
+        Returns:
+            String containing the AI response
+        """
+        messages = self._build_chat_messages(user_message, resume_data, vacancy_data, conversation_history)
+        response = await llm_scheduler.run(
+            Priority.INTERACTIVE,
+            lambda: self.model.ainvoke(messages),
+            estimated_tokens=self._estimate_tokens(messages),
+            name="chat",
+        )
         content = response.content if hasattr(response, 'content') else str(response)
         return str(content) if isinstance(content, (list, dict)) else content
     
-    def query_knowledge_base(self, query: str, k: int = 3) -> Dict[str, Any]:
+    async def astream_chat_with_context(
+        self, 
+        user_message: str, 
+        resume_data: Optional[Dict[str, Any]] = None,
+        vacancy_data: Optional[Dict[str, Any]] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the response to a chat message token by token.
+        
+        Same arguments as chat_with_context; yields text deltas as the model
+        produces them. Time-to-first-token is recorded as ``chat.ttft``.
+        """
+        messages = self._build_chat_messages(user_message, resume_data, vacancy_data, conversation_history)
+        start = time.perf_counter()
+        first_token = True
+        # Streams hold their slot until the last token; they are not retried mid-stream
+        async with llm_scheduler.slot(Priority.INTERACTIVE, self._estimate_tokens(messages)):
+            async for chunk in self.model.astream(messages):
+                content = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if not content:
+                    continue
+                if not isinstance(content, str):
+                    content = str(content)
+                if first_token:
+                    metrics.observe("chat.ttft", time.perf_counter() - start)
+                    first_token = False
+                yield content
+        metrics.observe("chat.stream_duration", time.perf_counter() - start)
+    
+    async def query_knowledge_base(self, query: str, k: int = 3) -> Dict[str, Any]:
         """
         Query the vector database for relevant information.
         
@@ -221,7 +366,12 @@ Your questions:
         """
         try:
             db = Chroma(persist_directory=self.chroma_path, embedding_function=self.embeddings)
-            results = db.similarity_search_with_relevance_scores(query, k=k)
+            results = await llm_scheduler.run(
+                Priority.INTERACTIVE,
+                lambda: db.asimilarity_search_with_relevance_scores(query, k=k),
+                estimated_tokens=self._estimate_tokens(query) - settings.max_tokens,
+                name="knowledge_base_embedding",
+            )
             
             if len(results) == 0 or results[0][1] < 0.7:
                 return {
@@ -240,7 +390,12 @@ CONTEXT:
 
 Please provide a helpful answer based on the context above."""
             
-            response = self.model.invoke(prompt)
+            response = await llm_scheduler.run(
+                Priority.INTERACTIVE,
+                lambda: self.model.ainvoke(prompt),
+                estimated_tokens=self._estimate_tokens(prompt),
+                name="knowledge_base",
+            )
             response_text = response.content if hasattr(response, 'content') else str(response)
             
             return {
@@ -0,0 +1,244 @@
+"""
+Persistent cache for LLM responses.
+
+Resume matching and structured analysis are (near-)deterministic for a given
+model, prompt template and input, so their parsed JSON results are cached under
+a key built from exactly those three things. Backends: SQLite (default, via
+aiosqlite) and Redis. Both honour a TTL and a maximum number of entries.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import aiosqlite
+from redis.asyncio import Redis
+
+from app.config.settings import settings
+from app.core.config import REDIS_URL
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_input(value: Any) -> str:
+    """Canonical text form of a prompt input (whitespace-insensitive)"""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return _WHITESPACE.sub(" ", value).strip()
+
+
+def make_cache_key(namespace: str, model: str, template_version: str, *inputs: Any, **params: Any) -> str:
+    """Key on model, prompt-template version, call parameters and a hash of the normalized inputs"""
+    inputs_hash = hashlib.sha256(
+        "\x1f".join(normalize_input(v) for v in inputs).encode("utf-8")
+    ).hexdigest()
+    params_part = ",".join(f"{k}={params[k]}" for k in sorted(params))
+    return f"{namespace}:{model}:{template_version}:{params_part}:{inputs_hash}"
+
+
+class SQLiteLLMCache:
+    """LLM cache stored in a local SQLite file, over one reused connection"""
+
+    PRUNE_EVERY = 50
+
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stale: Optional[aiosqlite.Connection] = None
+
+    async def _connection(self) -> aiosqlite.Connection:
+        """The shared connection, opened on first use; call with ``self._lock`` held"""
+        if self._stale is not None:
+            stale, self._stale = self._stale, None
+            try:
+                await stale.close()
+            except Exception:
+                pass
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = await aiosqlite.connect(self.path)
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            await conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+            await conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _locked(self) -> asyncio.Lock:
+        # The lock and connection belong to one event loop; scripts and tests
+        # that run several loops get a fresh pair per loop.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._stale = self._stale or self._conn
+            self._loop, self._lock, self._conn = loop, asyncio.Lock(), None
+        return self._lock
+
+    async def get(self, key: str) -> Optional[dict]:
+        async with self._locked():
+            conn = await self._connection()
+            now = time.time()
+            async with conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            await conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            await conn.commit()
+            return json.loads(row[0])
+
+    async def set(self, key: str, value: dict) -> None:
+        async with self._locked():
+            conn = await self._connection()
+            now = time.time()
+            await conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False, default=str), now + self.ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                await self._prune(conn, now)
+            await conn.commit()
+
+    async def close(self) -> None:
+        if self._conn is not None and self._loop is asyncio.get_running_loop():
+            async with self._lock:
+                conn, self._conn = self._conn, None
+                if conn is not None:
+                    await conn.close()
+
+    async def _prune(self, conn: aiosqlite.Connection, now: float) -> None:
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        await conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        await conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+class RedisLLMCache:
+    """LLM cache stored in Redis; a sorted set tracks insertion order for size eviction"""
+
+    def __init__(self, url: str, ttl: int, max_entries: int, prefix: str = "llm_cache"):
+        self.redis = Redis.from_url(url)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.index_key = f"{prefix}:index"
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.redis.get(f"{self.prefix}:{key}")
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict) -> None:
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"{self.prefix}:{key}", json.dumps(value, ensure_ascii=False, default=str), ex=self.ttl)
+            pipe.zadd(self.index_key, {key: now})
+            # Entries older than the TTL have already expired on their own
+            pipe.zremrangebyscore(self.index_key, "-inf", now - self.ttl)
+            pipe.zcard(self.index_key)
+            results = await pipe.execute()
+
+        overflow = results[-1] - self.max_entries
+        if overflow > 0:
+            oldest = await self.redis.zpopmin(self.index_key, overflow)
+            if oldest:
+                await self.redis.delete(*(f"{self.prefix}:{k.decode() if isinstance(k, bytes) else k}" for k, _ in oldest))
+
+
+class LLMCache:
+    """Front for the configured backend with hit/miss accounting"""
+
+    def __init__(self, backend: Optional[Any]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def close(self) -> None:
+        """Release the backend's connection (lifespan / worker shutdown)"""
+        close = getattr(self.backend, "close", None)
+        if close is not None:
+            await close()
+
+    async def get_or_call(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[Tuple[Any, int]]],
+        bypass: bool = False,
+        should_store: Callable[[Any], bool] = lambda value: value is not None,
+    ) -> Tuple[Any, bool]:
+        """
+        Return ``(value, cache_hit)``.
+
+        ``call`` returns ``(value, total_tokens)``; the value is stored only when
+        ``should_store(value)`` is true (errors are never cached). With ``bypass``
+        the cache is neither read nor written.
+        """
+        namespace = key.split(":", 1)[0]
+        if self.enabled and not bypass:
+            try:
+                cached = await self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"⚠️ LLM cache read failed: {e}")
+                cached = None
+            if cached is not None:
+                self.hits += 1
+                metrics.incr(f"llm_cache.{namespace}.hits")
+                metrics.incr("llm_cache.tokens_saved", cached.get("total_tokens", 0))
+                return cached["value"], True
+            self.misses += 1
+            metrics.incr(f"llm_cache.{namespace}.misses")
+
+        value, total_tokens = await call()
+        if self.enabled and not bypass and should_store(value):
+            try:
+                await self.backend.set(key, {"value": value, "total_tokens": total_tokens})
+            except Exception as e:
+                logger.warning(f"⚠️ LLM cache write failed: {e}")
+        return value, False
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "tokens_saved": metrics.counter("llm_cache.tokens_saved"),
+        }
+
+
+def _create_backend():
+    backend = settings.llm_cache_backend
+    if backend == "redis":
+        if not REDIS_URL:
+            raise ValueError("LLM_CACHE_BACKEND=redis requires REDIS_URL")
+        return RedisLLMCache(REDIS_URL, settings.llm_cache_ttl, settings.llm_cache_max_entries)
+    if backend == "sqlite":
+        return SQLiteLLMCache(settings.llm_cache_path, settings.llm_cache_ttl, settings.llm_cache_max_entries)
+    return None
+
+
+# Global cache instance
+llm_cache = LLMCache(_create_backend())
@@ -0,0 +1,272 @@
+"""
+Rate-limit-aware scheduler for LLM calls.
+
+Every OpenAI/LangChain call goes through ``llm_scheduler`` so that:
+- requests/min and tokens/min stay under the provider limits (token buckets),
+- interactive chat is admitted before background matching (priority classes),
+- each class has its own concurrency cap (and LLM_MAX_CONCURRENCY caps the total),
+- 429 and 5xx responses are retried with jittered exponential backoff, and a
+  429 pauses admission for everyone until the suggested retry time.
+
+Limits apply per process; size LLM_RPM/LLM_TPM for the share of the account
+quota each API/worker process should get.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import openai
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Admission order; lower values are served first"""
+    INTERACTIVE = 0     # chat replies a user is waiting for
+    CLARIFICATION = 1   # clarification questions in websocket_server
+    ANALYSIS = 2        # on-demand structured resume analysis
+    BACKGROUND = 3      # resume matching in the worker, bulk re-scoring
+
+
+def estimate_tokens(messages: List[dict], max_tokens: int, model: Optional[str] = None) -> int:
+    """Tokens a chat call may consume: prompt plus the completion allowance"""
+    # Imported here: app.services_pdf imports the PDF analyzer, which imports this module
+    from app.services_pdf.prompt_budget import count_message_tokens
+
+    return count_message_tokens(messages, model) + max_tokens
+
+
+class TokenBucket:
+    """Continuous-refill token bucket"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 when available now)"""
+        self._refill()
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Correct a reservation once actual usage is known (may go negative)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class LLMScheduler:
+    """Priority admission control with RPM/TPM buckets, class caps and retries"""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        class_concurrency: Optional[Dict[Priority, int]] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute or settings.llm_requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute or settings.llm_tokens_per_minute)
+        self.class_concurrency = class_concurrency or {
+            Priority.INTERACTIVE: settings.llm_concurrency_interactive,
+            Priority.CLARIFICATION: settings.llm_concurrency_clarification,
+            Priority.ANALYSIS: settings.llm_concurrency_analysis,
+            Priority.BACKGROUND: settings.llm_concurrency_background,
+        }
+        # Calls in flight across all classes; 0 = only the class caps apply
+        self.max_concurrency = max_concurrency if max_concurrency is not None else settings.llm_max_concurrency
+        self.max_retries = max_retries if max_retries is not None else settings.llm_max_retries
+        self.backoff_base = backoff_base if backoff_base is not None else settings.llm_backoff_base
+        self.backoff_max = backoff_max if backoff_max is not None else settings.llm_backoff_max
+
+        self._waiters: list = []  # heap of (priority, seq, tokens)
+        self._seq = itertools.count()
+        self._active: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._paused_until = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _cond(self) -> asyncio.Condition:
+        # Created lazily so the scheduler binds to the running loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _next_eligible(self) -> Optional[tuple]:
+        """Highest-priority waiter whose class still has a free slot"""
+        if self.max_concurrency and sum(self._active.values()) >= self.max_concurrency:
+            return None
+        for entry in sorted(self._waiters):
+            priority = Priority(entry[0])
+            if self._active[priority] < self.class_concurrency[priority]:
+                return entry
+        return None
+
+    def _update_gauges(self) -> None:
+        for priority in Priority:
+            name = priority.name.lower()
+            metrics.set_gauge(f"llm_scheduler.{name}.queued", sum(1 for w in self._waiters if w[0] == priority))
+            metrics.set_gauge(f"llm_scheduler.{name}.active", self._active[priority])
+
+    async def _acquire(self, priority: Priority, tokens: int) -> None:
+        cond = self._cond()
+        entry = (int(priority), next(self._seq), tokens)
+        queued_at = time.perf_counter()
+        async with cond:
+            heapq.heappush(self._waiters, entry)
+            self._update_gauges()
+            try:
+                while True:
+                    wait = max(0.0, self._paused_until - time.monotonic())
+                    if wait == 0.0 and self._next_eligible() == entry:
+                        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                        if wait == 0.0:
+                            break
+                    # Woken early by releases/new arrivals; otherwise re-check after refill
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=wait or None)
+                    except asyncio.TimeoutError:
+                        pass
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._active[priority] += 1
+                self._update_gauges()
+            finally:
+                if entry in self._waiters:  # cancelled while queued
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._update_gauges()
+                cond.notify_all()
+        metrics.observe(f"llm_scheduler.{priority.name.lower()}.queue_wait", time.perf_counter() - queued_at)
+
+    async def _release(self, priority: Priority) -> None:
+        cond = self._cond()
+        async with cond:
+            self._active[priority] -= 1
+            self._update_gauges()
+            cond.notify_all()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Return over-reserved tokens to the TPM bucket (or charge the shortfall)"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    async def _pause(self, seconds: float) -> None:
+        cond = self._cond()
+        async with cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, estimated_tokens: int = 0) -> AsyncIterator[None]:
+        """Hold one admission slot (for streaming calls, which are not retried)"""
+        await self._acquire(priority, estimated_tokens)
+        try:
+            yield
+        finally:
+            await self._release(priority)
+
+    async def run(
+        self,
+        priority: Priority,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        name: str = "llm",
+    ) -> T:
+        """Run ``call`` under the limits, retrying 429/5xx with jittered exponential backoff"""
+        label = priority.name.lower()
+        attempt = 0
+        while True:
+            async with self.slot(priority, estimated_tokens):
+                try:
+                    result = await call()
+                    metrics.incr(f"llm_scheduler.{label}.completed")
+                    return result
+                except Exception as exc:
+                    if not _is_retryable(exc) or attempt >= self.max_retries:
+                        metrics.incr(f"llm_scheduler.{label}.failed")
+                        raise
+                    error = exc
+
+            attempt += 1
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+            delay *= random.uniform(0.5, 1.5)
+            retry_after = _retry_after(error)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            status = getattr(error, "status_code", None)
+            if isinstance(error, openai.RateLimitError) or status == 429:
+                metrics.incr("llm_scheduler.rate_limited")
+                await self._pause(delay)
+            metrics.incr(f"llm_scheduler.{label}.retries")
+            logger.warning(f"⏳ {name} failed ({error.__class__.__name__}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency or None,
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens),
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "classes": {
+                p.name.lower(): {
+                    "queued": sum(1 for w in self._waiters if w[0] == p),
+                    "active": self._active[p],
+                    "limit": self.class_concurrency[p],
+                }
+                for p in Priority
+            },
+        }
+
+
+# Global scheduler instance
+llm_scheduler = LLMScheduler()
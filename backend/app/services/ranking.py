@@ -0,0 +1,233 @@
+"""
+Top-K candidate ranking per vacancy.
+
+``rank_applications`` returns a vacancy's applications by ``matching_score``
+(highest first, ties by id) from the ``(vacancy_id, matching_score DESC NULLS
+LAST, id DESC)`` index, so a top-K read touches K index entries however many
+applicants the vacancy has.
+
+With RANKING_LEADERBOARD=redis, a sorted set per vacancy mirrors the scores.
+It is built from the DB on first use (one rebuild per vacancy at a time across
+processes, under a Redis lock), updated whenever the pipeline writes a score
+and dropped with the vacancy. Every built set holds a sentinel member scored
+-inf, so a vacancy without scored applications still has a set. Score-only queries are answered from
+the set plus a primary-key fetch; date-filtered queries and vacancies whose
+set is not built yet go to the DB.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence, Set, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from app.config.settings import settings
+from app.core.config import REDIS_URL
+from app.core.metrics import metrics
+from app.db.session import async_session
+from app.models.application import Application
+
+logger = logging.getLogger(__name__)
+
+# Update a member only when the set exists; a partial set would rank wrongly
+_RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    if ARGV[2] == '' then
+        return redis.call('ZREM', KEYS[1], ARGV[1])
+    end
+    return redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+end
+return 0
+"""
+
+# Delete the rebuild lock only if this rebuild still holds it
+_UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Member marking a built set; its -inf score keeps it out of every range read
+BUILT_MARKER = "__built__"
+REBUILD_LOCK_SECONDS = 300
+
+
+class RedisLeaderboard:
+    """Sorted set of application ids scored by matching_score, one per vacancy"""
+
+    def __init__(self, url: str, prefix: str = "leaderboard"):
+        self.redis = Redis.from_url(url)
+        self.prefix = prefix
+        self._record = self.redis.register_script(_RECORD_SCRIPT)
+        self._unlock = self.redis.register_script(_UNLOCK_SCRIPT)
+        self._rebuilding: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def key(self, vacancy_id: str) -> str:
+        return f"{self.prefix}:vacancy:{vacancy_id}"
+
+    async def record(self, vacancy_id: str, application_id: str, score: Optional[float]) -> None:
+        """Mirror a written score (None removes the application)"""
+        value = "" if score is None else repr(float(score))
+        await self._record(keys=[self.key(vacancy_id)], args=[application_id, value])
+
+    async def remove_vacancy(self, vacancy_id: str) -> None:
+        await self.redis.delete(self.key(vacancy_id))
+
+    async def top(self, vacancy_id: str, limit: int, min_score: Optional[float]) -> Optional[List[str]]:
+        """Application ids of the top ``limit``, or None when the set is not built"""
+        key = self.key(vacancy_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(key)
+            pipe.zrevrangebyscore(key, "+inf", "(-inf" if min_score is None else min_score, start=0, num=limit)
+            exists, members = await pipe.execute()
+        if not exists:
+            self.schedule_rebuild(vacancy_id)
+            return None
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+
+    async def discard(self, vacancy_id: str, application_ids: Sequence[str]) -> None:
+        if application_ids:
+            await self.redis.zrem(self.key(vacancy_id), *application_ids)
+
+    def schedule_rebuild(self, vacancy_id: str) -> None:
+        if vacancy_id in self._rebuilding:
+            return
+        self._rebuilding.add(vacancy_id)
+        task = asyncio.create_task(self.rebuild(vacancy_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def rebuild(self, vacancy_id: str, batch_size: int = 1000) -> Optional[int]:
+        """
+        Load every scored application of the vacancy into a fresh set and swap it in.
+
+        Returns the number of applications loaded, or None when another
+        process holds the vacancy's rebuild lock.
+        """
+        key = self.key(vacancy_id)
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        tmp_key = f"{key}:rebuild:{token}"
+        started = datetime.now(timezone.utc)
+        scored = select(Application.id, Application.matching_score).where(
+            Application.vacancy_id == vacancy_id,
+            col(Application.matching_score).is_not(None),
+        )
+        count = 0
+        try:
+            if not await self.redis.set(lock_key, token, nx=True, ex=REBUILD_LOCK_SECONDS):
+                metrics.incr("ranking.leaderboard.rebuild_skipped")
+                return None
+            try:
+                async with async_session() as session:
+                    result = await session.stream(scored)
+                    # Expires with the lock if this process dies mid-copy
+                    await self.redis.zadd(tmp_key, {BUILT_MARKER: float("-inf")})
+                    await self.redis.expire(tmp_key, REBUILD_LOCK_SECONDS)
+                    async for rows in result.partitions(batch_size):
+                        await self.redis.zadd(tmp_key, {row.id: row.matching_score for row in rows})
+                        count += len(rows)
+                    await self.redis.persist(tmp_key)
+                    await self.redis.rename(tmp_key, key)
+                    # Scores written while the snapshot was being copied
+                    recent = await session.execute(scored.where(col(Application.updated_at) >= started))
+                    for row in recent:
+                        await self.redis.zadd(key, {row.id: row.matching_score})
+            finally:
+                await self.redis.delete(tmp_key)
+                await self._unlock(keys=[lock_key], args=[token])
+            logger.info(f"🏆 Leaderboard for vacancy {vacancy_id} rebuilt with {count} applications")
+            metrics.incr("ranking.leaderboard.rebuilds")
+        except Exception as e:
+            logger.warning(f"⚠️ Leaderboard rebuild for vacancy {vacancy_id} failed: {e}")
+        finally:
+            self._rebuilding.discard(vacancy_id)
+        return count
+
+
+def _create_leaderboard() -> Optional[RedisLeaderboard]:
+    if settings.ranking_leaderboard == "redis":
+        if not REDIS_URL:
+            raise ValueError("RANKING_LEADERBOARD=redis requires REDIS_URL")
+        return RedisLeaderboard(REDIS_URL)
+    return None
+
+
+# Global leaderboard (None when RANKING_LEADERBOARD=none)
+leaderboard = _create_leaderboard()
+
+
+async def record_score(vacancy_id: str, application_id: str, score: Optional[float]) -> None:
+    """Mirror a score written to the DB into the leaderboard; failures only log"""
+    if leaderboard is None:
+        return
+    try:
+        await leaderboard.record(vacancy_id, application_id, score)
+    except Exception as e:
+        logger.warning(f"⚠️ Leaderboard update for application {application_id} failed: {e}")
+
+
+async def forget_vacancy(vacancy_id: str) -> None:
+    if leaderboard is None:
+        return
+    try:
+        await leaderboard.remove_vacancy(vacancy_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Leaderboard removal for vacancy {vacancy_id} failed: {e}")
+
+
+async def rank_applications(
+    session: AsyncSession,
+    vacancy_id: str,
+    limit: int,
+    min_score: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    options: Sequence[Any] = (),
+) -> Tuple[List[Application], str]:
+    """
+    Top ``limit`` scored applications of a vacancy, highest score first.
+
+    Returns the applications and the source that ranked them ("redis" or "db").
+    ``options`` are loader options for the fetched rows (e.g. load_only).
+    """
+    if leaderboard is not None and created_after is None and created_before is None:
+        try:
+            ids = await leaderboard.top(vacancy_id, limit, min_score)
+        except Exception as e:
+            logger.warning(f"⚠️ Leaderboard read for vacancy {vacancy_id} failed: {e}")
+            ids = None
+        if ids is not None:
+            result = await session.execute(
+                select(Application).options(*options).where(col(Application.id).in_(ids))
+            )
+            by_id = {application.id: application for application in result.scalars().all()}
+            missing = [i for i in ids if i not in by_id]
+            if not missing:
+                metrics.incr("ranking.redis")
+                return [by_id[i] for i in ids], "redis"
+            # Applications deleted with a cascade; drop them and rank from the DB this time
+            await leaderboard.discard(vacancy_id, missing)
+
+    query = (
+        select(Application)
+        .options(*options)
+        .where(Application.vacancy_id == vacancy_id, col(Application.matching_score).is_not(None))
+    )
+    if min_score is not None:
+        query = query.where(col(Application.matching_score) >= min_score)
+    if created_after is not None:
+        query = query.where(col(Application.created_at) >= created_after)
+    if created_before is not None:
+        query = query.where(col(Application.created_at) < created_before)
+    # Same order as keyset pagination, so both read the score index
+    query = query.order_by(col(Application.matching_score).desc().nulls_last(), col(Application.id).desc()).limit(limit)
+
+    result = await session.execute(query)
+    metrics.incr("ranking.db")
+    return list(result.scalars().all()), "db"
@@ -0,0 +1,246 @@
+"""
+Keyword search over extracted resume text.
+
+The index covers ``ResumeText`` (one document per distinct resume) and is
+kept next to it:
+
+- PostgreSQL: a ``search_vector tsvector`` column on ``resumetext`` with a
+  GIN index, built with the SEARCH_TEXT_CONFIG text search configuration
+  ("simple" by default: no stemming, which suits mixed English, Russian and
+  Kazakh resumes). It is removed with its row.
+- SQLite: an FTS5 table ``resumetext_fts(sha256, body)`` using the
+  unicode61 tokenizer; ``prune_index`` drops entries of deleted texts.
+
+Both are created by init_db (``create_search_index``) and filled when a text
+is stored or replaced (``index_resume_text``). ``python -m app.reindex_resume_search``
+indexes texts stored before search existed. ``search_applications`` joins
+hits to applications (with vacancy, status and score filters) and ranks them
+with ``ts_rank_cd`` or bm25. Snippets are cut from the decompressed text
+of the returned page only.
+"""
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, cast, column, delete, func, select, table, text, update
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from app.models.application import Application, ResumeText
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "resumetext_fts"
+SNIPPET_FRAGMENTS = 2
+SNIPPET_CONTEXT = 60  # Characters of context on each side of a match
+MAX_TERMS = 16
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Columns outside the SQLModel metadata, so SQLite never sees a tsvector type
+_pg_text = table(ResumeText.__tablename__, column("sha256"), column("search_vector", TSVECTOR))
+_fts = table(FTS_TABLE, column("sha256"), column("body"), column("rank"))
+
+
+class SearchUnavailable(Exception):
+    """Raised when the database has no search index (unsupported dialect or SQLite without FTS5)"""
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name if bind is not None else ""
+
+
+def create_search_index(connection) -> None:
+    """Create the dialect's search structures if missing (run by init_db)"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text(f"ALTER TABLE {ResumeText.__tablename__} ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_resumetext_search_vector "
+            f"ON {ResumeText.__tablename__} USING GIN (search_vector)"
+        ))
+    elif dialect == "sqlite":
+        try:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5(sha256 UNINDEXED, body, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+        except Exception as e:
+            logger.warning(f"⚠️ SQLite FTS5 unavailable ({e}); resume search disabled")
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search query, lower-cased; every word must match"""
+    return list(dict.fromkeys(word.lower() for word in _WORD.findall(query or "")))[:MAX_TERMS]
+
+
+async def index_resume_text(session: AsyncSession, sha256: str, body: str, replace: bool = False) -> None:
+    """Add a stored text to the search index, in the caller's transaction.
+
+    ``replace`` drops the text's existing entry first (its content changed).
+    """
+    await index_resume_texts(session, [(sha256, body)], replace=replace)
+
+
+async def index_resume_texts(
+    session: AsyncSession, documents: Sequence[Tuple[str, str]], replace: bool = False
+) -> None:
+    """Index (sha256, text) pairs in one statement; the caller commits"""
+    if not documents:
+        return
+    dialect = _dialect(session.bind)
+    if dialect == "postgresql":
+        config = cast(settings.search_text_config, REGCONFIG)
+        await session.execute(
+            update(_pg_text)
+            .where(_pg_text.c.sha256 == bindparam("key"))
+            .values(search_vector=func.to_tsvector(config, bindparam("body"))),
+            [{"key": key, "body": body} for key, body in documents],
+        )
+    elif dialect == "sqlite":
+        try:
+            if replace:
+                await session.execute(
+                    delete(_fts).where(_fts.c.sha256.in_([key for key, _body in documents]))
+                )
+            await session.execute(
+                text(f"INSERT INTO {FTS_TABLE} (sha256, body) VALUES (:key, :body)"),
+                [{"key": key, "body": body} for key, body in documents],
+            )
+        except OperationalError as e:
+            # SQLite built without FTS5 (see create_search_index); the rest of the transaction is unaffected
+            logger.warning(f"⚠️ Resume text not indexed for search: {e}")
+
+
+async def unindexed_texts(session: AsyncSession, limit: int) -> List[ResumeText]:
+    """Stored texts missing from the search index"""
+    dialect = _dialect(session.bind)
+    if dialect == "postgresql":
+        missing = select(_pg_text.c.sha256).where(_pg_text.c.search_vector.is_(None))
+    elif dialect == "sqlite":
+        missing = select(ResumeText.sha256).where(ResumeText.sha256.not_in(select(_fts.c.sha256)))
+    else:
+        return []
+    result = await session.execute(select(ResumeText).where(ResumeText.sha256.in_(missing)).limit(limit))
+    return list(result.scalars().all())
+
+
+async def prune_index(session: AsyncSession) -> int:
+    """Drop SQLite FTS entries of deleted texts (PostgreSQL vectors go with their row); the caller commits"""
+    if _dialect(session.bind) != "sqlite":
+        return 0
+    try:
+        result = await session.execute(
+            delete(_fts).where(_fts.c.sha256.not_in(select(ResumeText.sha256)))
+        )
+    except OperationalError:
+        return 0  # no FTS5 table
+    return result.rowcount or 0
+
+
+def highlight(body: str, terms: Sequence[str]) -> str:
+    """
+    Up to SNIPPET_FRAGMENTS fragments of ``body`` around the first matches,
+    HTML-escaped, with matched words wrapped in ``<mark>``.
+    """
+    if not terms:
+        return html.escape(body[:2 * SNIPPET_CONTEXT])
+    pattern = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(t) for t in terms) + r")(?!\w)", re.IGNORECASE)
+    fragments: List[Tuple[int, int]] = []
+    for match in pattern.finditer(body):
+        if fragments and match.start() - SNIPPET_CONTEXT <= fragments[-1][1]:
+            fragments[-1] = (fragments[-1][0], min(len(body), match.end() + SNIPPET_CONTEXT))
+            continue
+        if len(fragments) == SNIPPET_FRAGMENTS:
+            break
+        fragments.append((max(0, match.start() - SNIPPET_CONTEXT), min(len(body), match.end() + SNIPPET_CONTEXT)))
+    if not fragments:
+        fragments = [(0, min(len(body), 2 * SNIPPET_CONTEXT))]
+
+    parts = []
+    for start, end in fragments:
+        piece = body[start:end]
+        marked = []
+        last = 0
+        for match in pattern.finditer(piece):
+            marked.append(html.escape(piece[last:match.start()]))
+            marked.append(f"<mark>{html.escape(match.group(0))}</mark>")
+            last = match.end()
+        marked.append(html.escape(piece[last:]))
+        snippet = " ".join("".join(marked).split())
+        parts.append(("…" if start > 0 else "") + snippet + ("…" if end < len(body) else ""))
+    return " ".join(parts)
+
+
+async def search_applications(
+    session: AsyncSession,
+    query: str,
+    vacancy_ids: Optional[Sequence[str]] = None,
+    status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    limit: int = 20,
+    offset: int = 0,
+    options: Sequence[Any] = (),
+) -> List[Tuple[Application, float, str]]:
+    """
+    Applications whose resume text contains every word of ``query``, best match first.
+
+    Returns (application, rank, snippet) tuples; rank is ``ts_rank_cd`` on
+    PostgreSQL and the negated bm25 score on SQLite (higher is better on both).
+    Raises SearchUnavailable when the database has no search index.
+    """
+    from app.services.resume_text import decompress_text
+
+    terms = search_terms(query)
+    if not terms:
+        return []
+    dialect = _dialect(session.bind)
+    if dialect == "postgresql":
+        tsquery = func.plainto_tsquery(cast(settings.search_text_config, REGCONFIG), " ".join(terms))
+        rank = func.ts_rank_cd(_pg_text.c.search_vector, tsquery).label("rank")
+        stmt = (
+            select(Application, Application.resume_text_sha256, rank)
+            .join(_pg_text, _pg_text.c.sha256 == Application.resume_text_sha256)
+            .where(_pg_text.c.search_vector.op("@@")(tsquery))
+        )
+    elif dialect == "sqlite":
+        # Quoted terms: FTS5 query syntax in the input is matched literally
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        rank = (-_fts.c.rank).label("rank")  # FTS5 rank is bm25, lower is better
+        stmt = (
+            select(Application, Application.resume_text_sha256, rank)
+            .join(_fts, _fts.c.sha256 == Application.resume_text_sha256)
+            .where(text(f"{FTS_TABLE} MATCH :match").bindparams(match=match))
+        )
+    else:
+        raise SearchUnavailable(f"Resume search is not supported on {dialect or 'this database'}")
+
+    if vacancy_ids:
+        stmt = stmt.where(Application.vacancy_id.in_(vacancy_ids))
+    if status:
+        stmt = stmt.where(Application.status == status)
+    if min_score is not None:
+        stmt = stmt.where(Application.matching_score >= min_score)
+    stmt = stmt.options(*options).order_by(rank.desc(), Application.id).offset(offset).limit(limit)
+
+    try:
+        with metrics.timer(f"search.{dialect}"):
+            rows = (await session.execute(stmt)).all()
+    except OperationalError as e:
+        if dialect == "sqlite" and "no such table" in str(e):
+            raise SearchUnavailable("SQLite FTS5 is not available") from e
+        raise
+
+    keys = {key for _, key, _ in rows}
+    bodies: Dict[str, str] = {}
+    if keys:
+        for key, codec, content in (await session.execute(
+            select(ResumeText.sha256, ResumeText.codec, ResumeText.content).where(ResumeText.sha256.in_(keys))
+        )).all():
+            bodies[key] = decompress_text(content, codec)
+    # The key is selected separately: ``options`` may leave it unloaded on the application
+    return [(application, float(score or 0), highlight(bodies.get(key, ""), terms)) for application, key, score in rows]
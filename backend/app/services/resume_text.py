@@ -0,0 +1,132 @@
+"""
+Compressed, content-addressed storage of extracted resume text.
+
+The text extracted from a resume lives in ``ResumeText``, zlib-compressed
+and stored once per resume (keyed by the PDF's SHA-256), instead of inline
+in ``Application.resume_parsed``. The application keeps the key in
+``resume_text_sha256``; ``resume_parsed`` keeps only the parser metadata and
+the experience timeline, so listing or loading applications never pulls the
+text. The chat context loaders (``load_resume_data``) and
+app.update_resume_data are its only readers.
+"""
+import hashlib
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import dialect_insert
+from app.models.application import Application, ResumeText
+from app.services.resume_search import index_resume_text, prune_index
+
+CODEC = "zlib"
+COMPRESSION_LEVEL = 6
+
+
+def text_key(text: str, sha256: Optional[str] = None) -> str:
+    """Key of a resume's text: the PDF hash when known, else the hash of the text"""
+    return sha256 or hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(content: bytes, codec: str = CODEC) -> str:
+    if codec != CODEC:
+        raise ValueError(f"Unsupported resume text codec: {codec}")
+    return zlib.decompress(content).decode("utf-8")
+
+
+async def store_resume_text(session: AsyncSession, text: str, sha256: Optional[str] = None) -> str:
+    """
+    Store a resume's extracted text and return its key.
+
+    Runs in the caller's transaction, which sets
+    ``Application.resume_text_sha256`` to the returned key. The key is the PDF
+    hash, so re-processing a resume after a parser or page/char budget change
+    yields a different text under the same key: the stored text is then
+    replaced and re-indexed (app.services.resume_search). Storing an identical
+    text only refreshes ``updated_at`` so the resume GC keeps it.
+    """
+    key = text_key(text, sha256)
+    now = datetime.now(timezone.utc)
+    content = compress_text(text)
+    size = len(text.encode("utf-8"))
+    insert = dialect_insert(session)
+    if insert is not None:
+        existed = (await session.execute(
+            select(ResumeText.sha256).where(ResumeText.sha256 == key)
+        )).first() is not None
+        statement = insert(ResumeText).values(
+            sha256=key, codec=CODEC, content=content, size=size, created_at=now, updated_at=now
+        )
+        result = await session.execute(statement.on_conflict_do_update(
+            index_elements=[ResumeText.sha256],
+            set_={"codec": CODEC, "content": content, "size": size, "updated_at": now},
+            where=ResumeText.content != statement.excluded.content,
+        ))
+        if result.rowcount:
+            await index_resume_text(session, key, text, replace=existed)
+        else:
+            await session.execute(
+                update(ResumeText)
+                .where(ResumeText.sha256 == key)
+                .values(updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        return key
+
+    stored = await session.get(ResumeText, key)
+    if stored is None:
+        session.add(ResumeText(sha256=key, codec=CODEC, content=content, size=size))
+        await session.flush()
+        await index_resume_text(session, key, text)
+    elif stored.content != content:
+        stored.codec, stored.content, stored.size, stored.updated_at = CODEC, content, size, now
+        await session.flush()
+        await index_resume_text(session, key, text, replace=True)
+    else:
+        stored.updated_at = now
+        await session.flush()
+    return key
+
+
+async def load_resume_text(session: AsyncSession, key: Optional[str]) -> Optional[str]:
+    """Decompressed text stored under ``key`` (None when missing)"""
+    if not key:
+        return None
+    row = (await session.execute(
+        select(ResumeText.codec, ResumeText.content).where(ResumeText.sha256 == key)
+    )).first()
+    return decompress_text(row.content, row.codec) if row else None
+
+
+async def load_resume_data(session: AsyncSession, application: Application) -> Optional[Dict[str, Any]]:
+    """
+    ``resume_parsed`` with the extracted text under ``raw_text``, as the chatbot expects.
+
+    Rows not migrated yet still carry ``raw_text`` inline and are returned as is.
+    """
+    resume_data = application.resume_parsed
+    if application.resume_text_sha256:
+        text = await load_resume_text(session, application.resume_text_sha256)
+        if text is not None:
+            resume_data = {**(resume_data or {}), "raw_text": text}
+    return resume_data or None
+
+
+async def delete_unreferenced_texts(session: AsyncSession, cutoff: datetime) -> int:
+    """Delete texts no application references that were last stored before ``cutoff``; the caller commits"""
+    result = await session.execute(
+        delete(ResumeText)
+        .where(
+            ResumeText.updated_at < cutoff,
+            ~exists().where(Application.resume_text_sha256 == ResumeText.sha256),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await prune_index(session)
+    return result.rowcount or 0
@@ -0,0 +1,278 @@
+"""
+Per-vacancy application statistics maintained incrementally.
+
+``VacancyStats`` holds the counters (applications per status, scored count,
+score sum, pending clarification) and ``VacancyScoreBucket`` the number of
+applications per whole-point score. Every application insert and pipeline
+result applies its delta in the same transaction as the application write
+(``apply_change``), so reading a vacancy's statistics costs two primary-key
+lookups, never a scan of its applications and their JSON columns. Mean and
+median are derived from the sum and the 101 score buckets.
+
+``reconcile_all`` (the ``reconcile_vacancy_stats`` periodic job) recomputes
+every vacancy from its applications. It repairs drift, backfills vacancies whose
+applications predate the counters and applies a changed
+CLARIFICATION_SCORE_THRESHOLD.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Integer, case, cast, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from app.db.session import dialect_insert
+from app.models.application import Application, ApplicationStatus
+from app.models.vacancy import Vacancy, VacancyScoreBucket, VacancyStats, VacancyStatsRead
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("applications", "processing", "completed", "failed", "scored", "score_sum", "pending_clarification")
+HISTOGRAM_BIN_WIDTH = 10
+
+# (status, matching_score) of an application as the counters see it
+ApplicationState = Tuple[str, Optional[float]]
+
+
+def score_bucket(score: float) -> int:
+    """Whole-point bucket (0-100) of a matching score"""
+    return min(100, max(0, int(score)))
+
+
+def counters(status: str, score: Optional[float]) -> Dict[str, float]:
+    """What one application in this state contributes to each counter"""
+    return {
+        "applications": 1,
+        "processing": int(status == ApplicationStatus.PROCESSING),
+        "completed": int(status == ApplicationStatus.COMPLETED),
+        "failed": int(status == ApplicationStatus.FAILED),
+        "scored": int(score is not None),
+        "score_sum": score or 0.0,
+        "pending_clarification": int(
+            status == ApplicationStatus.COMPLETED
+            and score is not None
+            and score < settings.clarification_score_threshold
+        ),
+    }
+
+
+async def apply_change(
+    session: AsyncSession,
+    vacancy_id: str,
+    old: Optional[ApplicationState],
+    new: Optional[ApplicationState],
+) -> None:
+    """
+    Apply an application's state change to its vacancy's statistics.
+
+    ``old`` is None for a new application, ``new`` None for a removed one.
+    Runs in the caller's transaction so the counters commit (or roll back)
+    with the application write.
+    """
+    delta = {name: 0.0 for name in COUNTERS}
+    for state, sign in ((old, -1), (new, 1)):
+        if state is not None:
+            for name, value in counters(*state).items():
+                delta[name] += sign * value
+    buckets: Dict[int, int] = {}
+    for state, sign in ((old, -1), (new, 1)):
+        if state is not None and state[1] is not None:
+            bucket = score_bucket(state[1])
+            buckets[bucket] = buckets.get(bucket, 0) + sign
+    buckets = {score: count for score, count in buckets.items() if count}
+    if not any(delta.values()) and not buckets:
+        return
+
+    now = datetime.now(timezone.utc)
+    delta = {name: value if name == "score_sum" else int(value) for name, value in delta.items()}
+    insert_ = dialect_insert(session)
+    if insert_ is not None:
+        stmt = insert_(VacancyStats).values(vacancy_id=vacancy_id, **delta, updated_at=now)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[VacancyStats.vacancy_id],
+            set_={
+                **{name: getattr(VacancyStats, name) + stmt.excluded[name] for name in COUNTERS},
+                "updated_at": now,
+            },
+        ))
+        if buckets:
+            stmt = insert_(VacancyScoreBucket).values([
+                {"vacancy_id": vacancy_id, "score": score, "count": count} for score, count in buckets.items()
+            ])
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=[VacancyScoreBucket.vacancy_id, VacancyScoreBucket.score],
+                set_={"count": VacancyScoreBucket.count + stmt.excluded.count},
+            ))
+        return
+
+    stats = await session.get(VacancyStats, vacancy_id)
+    if stats is None:
+        session.add(VacancyStats(vacancy_id=vacancy_id, **delta, updated_at=now))
+    else:
+        for name, value in delta.items():
+            setattr(stats, name, getattr(stats, name) + value)
+        stats.updated_at = now
+    for score, count in buckets.items():
+        bucket = await session.get(VacancyScoreBucket, (vacancy_id, score))
+        if bucket is None:
+            session.add(VacancyScoreBucket(vacancy_id=vacancy_id, score=score, count=count))
+        else:
+            bucket.count += count
+    await session.flush()
+
+
+def median_from_buckets(buckets: Iterable[Tuple[int, int]], total: int) -> Optional[float]:
+    """Median of ``total`` scores given (score, count) pairs"""
+    if total <= 0:
+        return None
+    middle = ((total - 1) // 2, total // 2)
+    values: List[int] = []
+    seen = 0
+    for score, count in sorted(buckets):
+        while len(values) < 2 and seen + count > middle[len(values)]:
+            values.append(score)
+        seen += count
+        if len(values) == 2:
+            break
+    return sum(values) / len(values) if values else None
+
+
+def histogram_from_buckets(buckets: Iterable[Tuple[int, int]]) -> List[int]:
+    """Counts per HISTOGRAM_BIN_WIDTH-point bin; 100 falls in the last bin"""
+    bins = [0] * (100 // HISTOGRAM_BIN_WIDTH)
+    for score, count in buckets:
+        bins[min(score // HISTOGRAM_BIN_WIDTH, len(bins) - 1)] += count
+    return bins
+
+
+async def read_stats(session: AsyncSession, vacancy_id: str) -> Optional[VacancyStatsRead]:
+    """Statistics of a vacancy from its counters, or None when it has none yet"""
+    stats = await session.get(VacancyStats, vacancy_id)
+    if stats is None:
+        return None
+    buckets = (await session.execute(
+        select(VacancyScoreBucket.score, VacancyScoreBucket.count).where(
+            VacancyScoreBucket.vacancy_id == vacancy_id, VacancyScoreBucket.count > 0
+        )
+    )).all()
+    return VacancyStatsRead(
+        vacancy_id=vacancy_id,
+        applications=stats.applications,
+        processing=stats.processing,
+        completed=stats.completed,
+        failed=stats.failed,
+        scored=stats.scored,
+        mean_score=round(stats.score_sum / stats.scored, 1) if stats.scored else None,
+        median_score=median_from_buckets(buckets, stats.scored),
+        histogram=histogram_from_buckets(buckets),
+        pending_clarification=stats.pending_clarification,
+        updated_at=stats.updated_at,
+    )
+
+
+async def recompute(session: AsyncSession, vacancy_id: str) -> bool:
+    """
+    Recompute a vacancy's statistics from its applications and commit.
+
+    The counters row is locked first, so application writes racing with the
+    recomputation either land before it (and are counted) or apply their
+    delta after it. Returns True when the stored values had drifted.
+    """
+    stats = (await session.execute(
+        select(VacancyStats).where(VacancyStats.vacancy_id == vacancy_id).with_for_update()
+    )).scalar_one_or_none()
+
+    threshold = settings.clarification_score_threshold
+    rows = (await session.execute(
+        select(
+            Application.status,
+            func.count(),
+            func.count(Application.matching_score),
+            func.coalesce(func.sum(Application.matching_score), 0.0),
+            func.sum(case(
+                (
+                    (Application.status == ApplicationStatus.COMPLETED)
+                    & (Application.matching_score < threshold),
+                    1,
+                ),
+                else_=0,
+            )),
+        )
+        .where(Application.vacancy_id == vacancy_id)
+        .group_by(Application.status)
+    )).all()
+    values = {name: 0 for name in COUNTERS}
+    values["score_sum"] = 0.0
+    for status, count, scored, score_sum, pending in rows:
+        values["applications"] += count
+        if status in (ApplicationStatus.PROCESSING, ApplicationStatus.COMPLETED, ApplicationStatus.FAILED):
+            values[status] += count
+        values["scored"] += scored
+        values["score_sum"] += float(score_sum)
+        values["pending_clarification"] += int(pending or 0)
+
+    # Buckets truncate like score_bucket; PostgreSQL rounds when casting to integer, and
+    # SQLite only has floor() when built with its math functions (its cast truncates)
+    if session.bind is not None and session.bind.dialect.name == "sqlite":
+        score = cast(Application.matching_score, Integer)
+    else:
+        score = func.floor(Application.matching_score)
+    buckets: Dict[int, int] = {}
+    for value, count in (await session.execute(
+        select(score, func.count())
+        .where(Application.vacancy_id == vacancy_id, Application.matching_score.is_not(None))
+        .group_by(score)
+    )).all():
+        bucket = score_bucket(value)
+        buckets[bucket] = buckets.get(bucket, 0) + count
+
+    stored = (await session.execute(
+        select(VacancyScoreBucket.score, VacancyScoreBucket.count).where(
+            VacancyScoreBucket.vacancy_id == vacancy_id, VacancyScoreBucket.count != 0
+        )
+    )).all()
+    drifted = (
+        stats is None
+        or any(getattr(stats, name) != values[name] for name in COUNTERS if name != "score_sum")
+        or abs(stats.score_sum - values["score_sum"]) > 1e-6
+        or dict(stored) != buckets
+    )
+
+    now = datetime.now(timezone.utc)
+    if stats is None:
+        session.add(VacancyStats(vacancy_id=vacancy_id, **values, updated_at=now))
+    elif drifted:
+        await session.execute(
+            update(VacancyStats)
+            .where(VacancyStats.vacancy_id == vacancy_id)
+            .values(**values, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    if drifted:
+        await session.execute(delete(VacancyScoreBucket).where(VacancyScoreBucket.vacancy_id == vacancy_id))
+        if buckets:
+            await session.execute(insert(VacancyScoreBucket), [
+                {"vacancy_id": vacancy_id, "score": score, "count": count} for score, count in buckets.items()
+            ])
+    await session.commit()
+    return drifted and stats is not None
+
+
+async def reconcile_all(session: AsyncSession) -> Dict[str, int]:
+    """Recompute every vacancy's statistics, one transaction per vacancy"""
+    vacancy_ids = (await session.execute(select(Vacancy.id))).scalars().all()
+    stats = {"vacancies": len(vacancy_ids), "drifted": 0}
+    for vacancy_id in vacancy_ids:
+        try:
+            if await recompute(session, vacancy_id):
+                stats["drifted"] += 1
+        except Exception as e:
+            # e.g. the first application's insert created the row concurrently; retried next run
+            await session.rollback()
+            logger.error(f"Failed to recompute stats of vacancy {vacancy_id}: {e}")
+    if stats["drifted"]:
+        logger.warning(f"📊 Vacancy stats drifted for {stats['drifted']} vacancies; recomputed")
+    metrics.incr("vacancy_stats.drifted", stats["drifted"])
+    return stats
@@ -0,0 +1,264 @@
+"""
+Employment timeline extraction for years-of-experience computation.
+
+Finds dated entries in resume text ("Jan 2020 – Present", "2023–2024",
+"03.2019 - 11.2021", "сентябрь 2021 – н.в.", "қаңтар 2020 – қазір"), merges
+overlapping ranges and computes total and per-skill experience as of a
+reference date (SCORING_REFERENCE_DATE, default today). Timelines are cached
+per resume hash and reference month so the scorer and chatbot share them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services_pdf.prompt_budget import split_resume_sections
+from app.services_pdf.skill_extractor import extract_skills, flatten_skills
+
+# Sections whose dates are not work experience
+NON_WORK_SECTIONS = {"education", "certifications", "languages", "interests"}
+
+# Month names (English, Russian, Kazakh) -> month number. Each form must match the
+# whole word, so "Junior" or "Marketing" are not read as June or March; Russian
+# forms cover the nominative, genitive and prepositional endings.
+_MONTH_NAMES = {
+    1: ["january", "jan", "январ[ьяе]", "янв", "қаңтар\\w*"],
+    2: ["february", "feb", "феврал[ьяе]", "фев", "ақпан\\w*"],
+    3: ["march", "mar", "март[ае]?", "мар", "наурыз\\w*"],
+    4: ["april", "apr", "апрел[ьяе]", "апр", "сәуір\\w*"],
+    5: ["may", "ма[йяе]", "мамыр\\w*"],
+    6: ["june", "jun", "июн[ьяе]?", "маусым\\w*"],
+    7: ["july", "jul", "июл[ьяе]?", "шілде\\w*"],
+    8: ["august", "aug", "август[ае]?", "авг", "тамыз\\w*"],
+    9: ["september", "sept", "sep", "сентябр[ьяе]", "сент?", "қыркүйек\\w*"],
+    10: ["october", "oct", "октябр[ьяе]", "окт", "қазан\\w*"],
+    11: ["november", "nov", "ноябр[ьяе]", "нояб?", "қараша\\w*"],
+    12: ["december", "dec", "декабр[ьяе]", "дек", "желтоқсан\\w*"],
+}
+_MONTH_LOOKUP = [
+    (re.compile(form, re.IGNORECASE), number)
+    for number, forms in _MONTH_NAMES.items()
+    for form in forms
+]
+_MONTH_WORD = r"[A-Za-zА-Яа-яЁёӘәҒғҚқҢңӨөҰұҮүҺһІі]{3,10}\.?"
+_YEAR_SUFFIX = r"(?:\s*(?:г\.?|года?|ж\.?|жыл[ы]?))?"
+_PRESENT = (
+    r"present|current|now|today|till now|to date|настоящее время|по настоящее время|"
+    r"н\.\s?в\.?|сейчас|текущее время|қазір|қазіргі уақыт(?:қа дейін)?|осы уақытқа дейін"
+)
+
+
+_REQUIRED_YEARS = re.compile(r"(\d+(?:[.,]\d+)?)\s*\+?\s*(?:years?|yrs?|лет|года|год|жыл)", re.IGNORECASE)
+
+
+def required_years(text: Any) -> Optional[float]:
+    """Years asked for in a requirement such as "5+ years of experience" (None if not stated)"""
+    match = _REQUIRED_YEARS.search(str(text or ""))
+    return float(match.group(1).replace(",", ".")) if match else None
+
+
+def _date(suffix: str) -> str:
+    return (
+        rf"(?:(?P<month{suffix}>{_MONTH_WORD})\s+|(?P<num{suffix}>0?[1-9]|1[0-2])\s*[./]\s*)?"
+        rf"(?P<year{suffix}>(?:19|20)\d{{2}}){_YEAR_SUFFIX}"
+    )
+
+
+_DATE_RANGE = re.compile(
+    _date("1") + r"\s*(?:-|–|—|−|to|until|till|по|до|дейін)\s*"
+    r"(?:" + _date("2") + r"|(?P<present>" + _PRESENT + r"))",
+    re.IGNORECASE,
+)
+
+
+def _month_number(word: Optional[str], numeric: Optional[str]) -> Optional[int]:
+    if numeric:
+        return int(numeric)
+    if not word:
+        return None
+    word = word.rstrip(".")
+    for pattern, number in _MONTH_LOOKUP:
+        if pattern.fullmatch(word):
+            return number
+    return None
+
+
+def month_index(value: date) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def _format_month(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+@dataclass
+class ExperienceEntry:
+    start: int  # month index (year * 12 + month - 1), inclusive
+    end: int  # month index, exclusive
+    text: str
+    ongoing: bool = False
+    skills: List[str] = field(default_factory=list)
+
+    @property
+    def months(self) -> int:
+        return self.end - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": _format_month(self.start),
+            "end": "present" if self.ongoing else _format_month(self.end - 1),
+            "months": self.months,
+            "title": self.text.splitlines()[0][:200],
+            "skills": self.skills,
+        }
+
+
+def merged_months(ranges: Iterable[Tuple[int, int]]) -> int:
+    """Months covered by [start, end) ranges, counting overlaps once"""
+    total = 0
+    current: Optional[List[int]] = None
+    for start, end in sorted(ranges):
+        if current and start <= current[1]:
+            current[1] = max(current[1], end)
+            continue
+        if current:
+            total += current[1] - current[0]
+        current = [start, end]
+    if current:
+        total += current[1] - current[0]
+    return total
+
+
+@dataclass
+class ExperienceTimeline:
+    reference: date
+    entries: List[ExperienceEntry]
+
+    @property
+    def total_months(self) -> int:
+        return merged_months((e.start, e.end) for e in self.entries)
+
+    @property
+    def total_years(self) -> float:
+        return round(self.total_months / 12, 1)
+
+    def skill_years(self) -> Dict[str, float]:
+        """Merged years of experience per skill mentioned in dated entries"""
+        ranges: Dict[str, List[Tuple[int, int]]] = {}
+        for entry in self.entries:
+            for skill in entry.skills:
+                ranges.setdefault(skill, []).append((entry.start, entry.end))
+        return {skill: round(merged_months(r) / 12, 1) for skill, r in ranges.items()}
+
+    def matching(self, predicate) -> List[ExperienceEntry]:
+        return [e for e in self.entries if predicate(e)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reference_date": self.reference.isoformat(),
+            "total_months": self.total_months,
+            "total_years": self.total_years,
+            "skills": self.skill_years(),
+            "entries": [e.to_dict() for e in self.entries],
+        }
+
+
+def _parse_range(match: re.Match, reference_month: int) -> Optional[Tuple[int, int, bool]]:
+    start_month = _month_number(match["month1"], match["num1"])
+    start = int(match["year1"]) * 12 + (start_month or 1) - 1
+    if match["present"]:
+        return start, reference_month + 1, True
+
+    end_month = _month_number(match["month2"], match["num2"])
+    end_year = int(match["year2"])
+    if end_month is not None:
+        end = end_year * 12 + end_month  # exclusive: the end month counts
+    elif start_month is None and end_year == int(match["year1"]):
+        end = start + 6  # "2021–2021": assume half a year
+    else:
+        end = (end_year + 1) * 12  # bare end year: through December of that year
+    end = min(end, reference_month + 1)
+    if end <= start:
+        return None
+    return start, end, False
+
+
+def extract_timeline(resume_text: str, reference: Optional[date] = None) -> ExperienceTimeline:
+    """Dated work entries (outside education-like sections) with the skills each mentions"""
+    reference = reference or settings.scoring_reference()
+    reference_month = month_index(reference)
+    entries: List[ExperienceEntry] = []
+    entry_section = None
+
+    for section in split_resume_sections(resume_text or ""):
+        for raw_line in section.lines:
+            line = raw_line.strip()
+            if not line:
+                continue
+            match = _DATE_RANGE.search(line) if section.name not in NON_WORK_SECTIONS else None
+            parsed = _parse_range(match, reference_month) if match else None
+            if parsed:
+                start, end, ongoing = parsed
+                entries.append(ExperienceEntry(start, end, line, ongoing))
+                entry_section = section.name
+            elif entries and section.name == entry_section:
+                # Lines following a dated entry describe it until the section changes
+                entries[-1].text += f"\n{line}"
+
+    for entry in entries:
+        entry.skills = flatten_skills(extract_skills(entry.text))
+    return ExperienceTimeline(reference, entries)
+
+
+class _TimelineCache:
+    """Small in-process LRU of timelines keyed by resume hash and reference month"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, ExperienceTimeline]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ExperienceTimeline]:
+        with self._lock:
+            timeline = self._items.get(key)
+            if timeline is not None:
+                self._items.move_to_end(key)
+            return timeline
+
+    def set(self, key: str, timeline: ExperienceTimeline) -> None:
+        with self._lock:
+            self._items[key] = timeline
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+timeline_cache = _TimelineCache()
+
+
+def get_timeline(
+    resume_text: str,
+    resume_hash: Optional[str] = None,
+    reference: Optional[date] = None,
+) -> ExperienceTimeline:
+    """
+    Cached ``extract_timeline``.
+
+    ``resume_hash`` is the PDF SHA-256 from the parser metadata; without it the
+    text itself is hashed.
+    """
+    reference = reference or settings.scoring_reference()
+    digest = resume_hash or hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+    key = f"{digest}:{_format_month(month_index(reference))}"
+    timeline = timeline_cache.get(key)
+    if timeline is None:
+        timeline = extract_timeline(resume_text, reference)
+        timeline_cache.set(key, timeline)
+    return timeline
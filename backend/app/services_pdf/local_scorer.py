@@ -0,0 +1,418 @@
+"""
+Deterministic resume scoring that applies the matcher's PART B rules in Python.
+
+Takes the vacancy ``requirements`` dict and the extracted resume text and
+returns the same ``{"requirements": [...], "FIT_SCORE": ...}`` shape as
+``match_resume_to_requirements``, without an LLM round trip:
+
+- experience: relevant duration as of the reference date, proportional to the
+  required years; no dates means 0. Positions are relevant when they mention a
+  technology the requirement names; a generic requirement ("5+ years in
+  software development") counts every engineering role
+- location: exact city 100, same country 60, another country 20
+- skills/tools: used in experience or projects 100, only listed 70, vague 40
+- education: exact field 100, related field 70, other degree 30
+- soft skills: 100 only with explicit evidence
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services_pdf.experience_timeline import ExperienceTimeline, get_timeline, merged_months
+from app.services_pdf.prompt_budget import split_resume_sections
+from app.services_pdf.skill_extractor import canonical_skill, extract_skills, flatten_skills, get_matcher
+
+logger = logging.getLogger(__name__)
+
+# Sections where a skill mention counts as professional use
+_USAGE_SECTIONS = {"experience", "projects"}
+
+_EXPERIENCE_KEY = re.compile(r"experience|опыт|тәжірибе|стаж", re.IGNORECASE)
+_EDUCATION_KEY = re.compile(
+    r"education|degree|bachelor|master|phd|diploma|certif|образование|степень|бакалавр|магистр|білім",
+    re.IGNORECASE,
+)
+_LOCATION_KEY = re.compile(r"^(?:location|city|country|region|локация|город|место)", re.IGNORECASE)
+_SOFT_KEY = re.compile(
+    r"soft skills|communication|teamwork|leadership|collaborat|mentor|коммуникаб|команд|лидер",
+    re.IGNORECASE,
+)
+_YEARS = re.compile(r"(\d+(?:[.,]\d+)?)\s*\+?\s*(?:years?|yrs?|лет|года|год|жыл)", re.IGNORECASE)
+
+_USAGE_VERBS = re.compile(
+    r"\b(?:developed|built|implemented|designed|created|used|using|wrote|deployed|migrated|maintained|"
+    r"integrated|optimi[sz]ed|automated|led|architected|worked with|разработ|внедр|создал|использ|"
+    r"әзірле|жаса)",
+    re.IGNORECASE,
+)
+_VAGUE = re.compile(
+    r"familiar with|basic knowledge|basics of|exposure to|some experience|learning|"
+    r"знаком|базов|начальн|основы",
+    re.IGNORECASE,
+)
+_SOFT_EVIDENCE = re.compile(
+    r"\b(?:led|lead|managed|mentored|coached|collaborated|coordinated|presented|negotiated|"
+    r"руководил|наставни|координир|презентов|басқар)",
+    re.IGNORECASE,
+)
+
+# Small gazetteer for the region the product serves; unknown places score as missing
+_CITY_COUNTRY = {
+    "almaty": "kazakhstan", "алматы": "kazakhstan",
+    "astana": "kazakhstan", "астана": "kazakhstan", "nur-sultan": "kazakhstan", "нур-султан": "kazakhstan",
+    "shymkent": "kazakhstan", "шымкент": "kazakhstan",
+    "karaganda": "kazakhstan", "караганда": "kazakhstan", "қарағанды": "kazakhstan",
+    "aktobe": "kazakhstan", "актобе": "kazakhstan", "aktau": "kazakhstan", "актау": "kazakhstan",
+    "atyrau": "kazakhstan", "атырау": "kazakhstan", "pavlodar": "kazakhstan", "павлодар": "kazakhstan",
+    "oskemen": "kazakhstan", "ust-kamenogorsk": "kazakhstan", "усть-каменогорск": "kazakhstan",
+    "kostanay": "kazakhstan", "костанай": "kazakhstan", "taraz": "kazakhstan", "тараз": "kazakhstan",
+    "moscow": "russia", "москва": "russia", "saint petersburg": "russia", "санкт-петербург": "russia",
+    "novosibirsk": "russia", "новосибирск": "russia",
+    "tashkent": "uzbekistan", "ташкент": "uzbekistan",
+    "bishkek": "kyrgyzstan", "бишкек": "kyrgyzstan",
+    "london": "united kingdom", "berlin": "germany", "warsaw": "poland", "dubai": "united arab emirates",
+    "istanbul": "turkey", "стамбул": "turkey",
+}
+_COUNTRY_ALIASES = {
+    "kazakhstan": "kazakhstan", "казахстан": "kazakhstan", "қазақстан": "kazakhstan", "kz": "kazakhstan",
+    "russia": "russia", "россия": "russia", "uzbekistan": "uzbekistan", "узбекистан": "uzbekistan",
+    "kyrgyzstan": "kyrgyzstan", "кыргызстан": "kyrgyzstan", "germany": "germany", "poland": "poland",
+    "turkey": "turkey", "united kingdom": "united kingdom", "uk": "united kingdom",
+    "united arab emirates": "united arab emirates", "uae": "united arab emirates", "usa": "united states",
+    "united states": "united states",
+}
+
+# Degree fields considered related to each other (≤ 70%)
+_FIELD_FAMILIES = [
+    {"computer science", "software engineering", "information systems", "information technology",
+     "computer engineering", "applied mathematics", "mathematics", "data science", "информатика",
+     "информационные системы", "программная инженерия", "вычислительная техника", "математика"},
+    {"finance", "economics", "accounting", "business administration", "management", "финансы",
+     "экономика", "менеджмент", "бухгалтерский учет"},
+    {"electrical engineering", "electronics", "telecommunications", "radio engineering", "электроника",
+     "телекоммуникации"},
+]
+_DEGREE_WORDS = re.compile(
+    r"bachelor|master|phd|b\.?sc|m\.?sc|mba|degree|diploma|university|бакалавр|магистр|диплом|университет",
+    re.IGNORECASE,
+)
+
+# Job titles that count toward generic software/engineering experience
+_TECH_ROLE = re.compile(
+    r"engineer|developer|programmer|software|devops|\bsre\b|architect|data scientist|analyst|"
+    r"machine learning|\bml\b|\bqa\b|tester|administrator|tech lead|\bcto\b|"
+    r"разработчик|инженер|программист|аналитик|архитектор|тестировщик|администратор|"
+    r"әзірлеуші|бағдарламашы",
+    re.IGNORECASE,
+)
+# Topic words of a requirement that name no particular domain ("software development")
+_GENERIC_TOPIC = {
+    "software", "development", "engineering", "programming", "coding", "developer", "engineer",
+    "commercial", "professional", "industry", "relevant", "technical", "related", "field",
+    "разработка", "разработки", "программирование", "программирования", "коммерческой",
+    "коммерческая", "разработчиком", "инженером",
+}
+
+_PARENTHESES = re.compile(r"\(([^()]*)\)")
+_HELD = re.compile(r"\ue000(\d+)\ue000")  # placeholder for a held-back enumeration
+_SKILL_SPLIT = re.compile(r"\s*(?:,|;|/|\||\band\b|\bor\b|\bи\b|\bили\b|\n)\s*", re.IGNORECASE)
+_FILLER = re.compile(
+    r"\b(?:experience|knowledge|proficiency|proficient|strong|good|solid|with|in|of|the|skills?|"
+    r"understanding|ability|to|work|working|required|preferred|years?|yrs?|at least|minimum|"
+    r"опыт|знание|навыки|работы|с|в)\b|(?<![\w.])\d+(?:[.,]\d+)?\s*\+?(?!\w)|[>:<]",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class _ResumeLine:
+    text: str
+    section: str
+    skills: Dict[str, int]  # canonical skill -> offset of its first mention
+
+
+def _resume_lines(resume_text: str) -> List[_ResumeLine]:
+    matcher = get_matcher()
+    lines = []
+    for section in split_resume_sections(resume_text):
+        for line in section.lines:
+            text = line.strip()
+            if text:
+                skills: Dict[str, int] = {}
+                for start, _, canonical, _ in matcher.find(text):
+                    skills.setdefault(canonical, start)
+                lines.append(_ResumeLine(text, section.name, skills))
+    return lines
+
+
+def _find(haystack: str, needle: str) -> Optional[re.Match]:
+    """Case-insensitive whole-term search (handles terms like C++ and .NET)"""
+    pattern = r"(?<![\w+#.])" + re.escape(needle) + r"(?![\w+#])"
+    return re.search(pattern, haystack, re.IGNORECASE)
+
+
+def _contains(haystack: str, needle: str) -> bool:
+    return _find(haystack, needle) is not None
+
+
+def _known_skill(term: str) -> Optional[str]:
+    """Canonical taxonomy name of a term ("k8s" -> "Kubernetes"), None when it is not a known skill"""
+    canonical = canonical_skill(term)
+    return canonical if canonical in get_matcher().categories else None
+
+
+def _term_position(line: _ResumeLine, term: str) -> Optional[int]:
+    """Offset of ``term`` in the line, found literally or through any alias of its canonical skill"""
+    canonical = _known_skill(term)
+    if canonical is not None and canonical in line.skills:
+        return line.skills[canonical]
+    match = _find(line.text, term)
+    return match.start() if match else None
+
+
+def _clean_term(text: str) -> str:
+    return " ".join(_FILLER.sub(" ", text).split()).strip(" .()")
+
+
+def _topic_groups(text: str) -> List[List[str]]:
+    """
+    Terms named in a requirement value, as groups of alternatives.
+
+    An enumeration in parentheses belongs to the term before it:
+    "Cloud platforms (AWS, GCP, Azure)" is one group, ["Cloud platforms", "AWS", "GCP", "Azure"].
+    """
+    enumerations: List[str] = []
+
+    def hold(match: re.Match) -> str:
+        enumerations.append(match.group(1))
+        return f"\ue000{len(enumerations) - 1}\ue000"
+
+    groups = []
+    for piece in _SKILL_SPLIT.split(_PARENTHESES.sub(hold, text)):
+        head = _clean_term(_HELD.sub(" ", piece))
+        terms = [head] if len(head) > 1 else []
+        for index in _HELD.findall(piece):
+            terms += [t for group in _topic_groups(enumerations[int(index)]) for t in group]
+        if terms:
+            groups.append(list(dict.fromkeys(terms)))
+    return groups
+
+
+def _topic_terms(text: str) -> List[str]:
+    """Skill/topic terms named in a requirement value"""
+    return [term for group in _topic_groups(text) for term in group]
+
+
+def _classify(key: str, value: str) -> str:
+    if _LOCATION_KEY.match(key.strip()):
+        return "location"
+    combined = f"{key} {value}"
+    if _YEARS.search(value) or _EXPERIENCE_KEY.search(key):
+        return "experience"
+    if _EDUCATION_KEY.search(combined):
+        return "education"
+    if _SOFT_KEY.search(combined):
+        return "soft"
+    return "skills"
+
+
+def _score_experience(key: str, value: str, timeline: ExperienceTimeline) -> Tuple[int, str]:
+    years_match = _YEARS.search(value) or _YEARS.search(key)
+    required = float(years_match.group(1).replace(",", ".")) if years_match else 1.0
+    technologies = set(flatten_skills(extract_skills(value)))
+    topic = [w for t in _topic_terms(value) for w in t.split() if len(w) > 2]
+    if technologies:
+        # Positions using a named technology ("3+ years with React or Vue.js")
+        relevant = timeline.matching(lambda e: bool(technologies.intersection(e.skills)))
+    elif topic and not all(w.lower() in _GENERIC_TOPIC for w in topic):
+        # A domain without a technology ("3+ years of DevOps experience"): any topic word
+        relevant = timeline.matching(lambda e: any(_contains(e.text, t) for t in topic))
+    else:
+        # Generic ("5+ years in software development"): every engineering role, judged by
+        # its title line; all positions when no title is recognisable
+        relevant = timeline.matching(lambda e: bool(_TECH_ROLE.search(e.text.splitlines()[0])))
+        relevant = relevant or timeline.entries
+    if not relevant:
+        return 0, ""
+    years = merged_months((e.start, e.end) for e in relevant) / 12
+    evidence = "; ".join(e.text.splitlines()[0] for e in relevant)
+    if required <= 0 or years >= required:
+        return 100, f"{evidence} (~{years:.1f} years)"
+    return round(100 * years / required), f"{evidence} (~{years:.1f} years)"
+
+
+def _places(text: str) -> Tuple[List[str], List[str]]:
+    lowered = text.lower()
+    cities = [c for c in _CITY_COUNTRY if _contains(lowered, c)]
+    countries = {_COUNTRY_ALIASES[c] for c in _COUNTRY_ALIASES if _contains(lowered, c)}
+    countries.update(_CITY_COUNTRY[c] for c in cities)
+    return cities, sorted(countries)
+
+
+def _score_location(value: str, lines: List[_ResumeLine]) -> Tuple[int, str]:
+    wanted_cities, wanted_countries = _places(value)
+    wanted_cities = [_canonical_city(c) for c in wanted_cities]
+    # Candidates usually state where they live near the top; fall back to the whole resume
+    header = [l.text for l in lines if l.section in ("header", "summary")] or [l.text for l in lines]
+    for scope in (header, [l.text for l in lines]):
+        for text in scope:
+            cities, countries = _places(text)
+            if not cities and not countries:
+                continue
+            if wanted_cities and {_canonical_city(c) for c in cities} & set(wanted_cities):
+                return 100, text
+            if not wanted_cities and set(countries) & set(wanted_countries):
+                return 100, text
+            if set(countries) & set(wanted_countries):
+                return 60, text
+            return 20, text
+    return 0, ""
+
+
+def _canonical_city(city: str) -> str:
+    # Astana was called Nur-Sultan in 2019-2022
+    return {"nur-sultan": "astana", "нур-султан": "астана"}.get(city, city)
+
+
+def _score_skill(skill: str, lines: List[_ResumeLine]) -> Tuple[int, str]:
+    best, evidence = 0, ""
+    for line in lines:
+        start = _term_position(line, skill)
+        if start is None:
+            continue
+        if _VAGUE.search(line.text[max(0, start - 30):start]):
+            score = 40
+        elif line.section in _USAGE_SECTIONS or _USAGE_VERBS.search(line.text):
+            score = 100
+        else:
+            score = 70
+        if score > best:
+            best, evidence = score, line.text
+        if best == 100:
+            break
+    return best, evidence
+
+
+def _score_skills(value: str, lines: List[_ResumeLine]) -> Tuple[int, str]:
+    groups = _topic_groups(value) or [[value.strip()]]
+    # Multiple tools are weighed separately; alternatives within a group take the best
+    scored = [max((_score_skill(term, lines) for term in group), key=lambda s: s[0]) for group in groups]
+    percent = round(sum(s for s, _ in scored) / len(scored))
+    evidence = "; ".join(dict.fromkeys(e for _, e in scored if e))
+    return percent, evidence
+
+
+def _field_of(text: str) -> Optional[str]:
+    lowered = text.lower()
+    for family in _FIELD_FAMILIES:
+        for field in family:
+            if field in lowered:
+                return field
+    return None
+
+
+def _score_education(value: str, lines: List[_ResumeLine]) -> Tuple[int, str]:
+    education = [l.text for l in lines if l.section in ("education", "certifications")]
+    if not education:
+        education = [l.text for l in lines if _DEGREE_WORDS.search(l.text)]
+    if not education:
+        return 0, ""
+
+    terms = _topic_terms(value)
+    for text in education:
+        # Exact degree field or certification name
+        if terms and all(_contains(text, t) for t in terms):
+            return 100, text
+    wanted = _field_of(value)
+    if wanted:
+        family = next(f for f in _FIELD_FAMILIES if wanted in f)
+        for text in education:
+            if wanted in text.lower():
+                return 100, text
+        for text in education:
+            if any(field in text.lower() for field in family):
+                return 70, text
+    for text in education:
+        if _DEGREE_WORDS.search(text):
+            return 30, text
+    return 0, ""
+
+
+def _score_soft(value: str, lines: List[_ResumeLine]) -> Tuple[int, str]:
+    for line in lines:
+        if _SOFT_EVIDENCE.search(line.text):
+            return 100, line.text
+    return 0, ""
+
+
+def _requirement_items(requirements: Any) -> List[Tuple[str, str]]:
+    if isinstance(requirements, dict):
+        return [(str(k), v if isinstance(v, str) else ", ".join(map(str, v)) if isinstance(v, list) else str(v))
+                for k, v in requirements.items() if v not in (None, "", [])]
+    if isinstance(requirements, str):
+        return [(line.split(":", 1)[0], line.split(":", 1)[-1]) for line in requirements.splitlines() if line.strip()]
+    return []
+
+
+def requirement_terms(requirements: Any) -> List[str]:
+    """Distinct skill/topic terms named across all requirements (location excluded)"""
+    terms: Dict[str, str] = {}
+    for key, value in _requirement_items(requirements):
+        if _classify(key, value) == "location":
+            continue
+        for term in _topic_terms(value):
+            terms.setdefault(term.lower(), term)
+    return list(terms.values())
+
+
+def keyword_overlap(requirements: Any, resume_text: str) -> float:
+    """Fraction (0-1) of requirement terms that appear in the resume"""
+    terms = requirement_terms(requirements)
+    if not terms:
+        return 0.0
+    return sum(1 for t in terms if _contains(resume_text, t)) / len(terms)
+
+
+def score_resume_locally(
+    requirements: Any,
+    resume_text: str,
+    reference_date: Optional[date] = None,
+    resume_hash: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Score a resume against vacancy requirements with the PART B rules.
+
+    ``requirements`` is the vacancy's requirements dict (or "key: value" lines).
+    ``resume_hash`` (the PDF SHA-256) lets the experience timeline come from cache.
+    Returns ``{"requirements": [...], "FIT_SCORE": int}`` like the LLM matcher.
+    """
+    reference = reference_date or settings.scoring_reference()
+    lines = _resume_lines(resume_text or "")
+    timeline = get_timeline(resume_text or "", resume_hash, reference)
+    scored = []
+    for key, value in _requirement_items(requirements):
+        kind = _classify(key, value)
+        if kind == "location":
+            percent, evidence = _score_location(value, lines)
+        elif kind == "experience":
+            percent, evidence = _score_experience(key, value, timeline)
+        elif kind == "education":
+            percent, evidence = _score_education(value, lines)
+        elif kind == "soft":
+            percent, evidence = _score_soft(value, lines)
+        else:
+            percent, evidence = _score_skills(value, lines)
+        scored.append({
+            "vacancy_req": f"{key}: {value}",
+            "user_req_data": evidence[:500],
+            "match_percent": max(0, min(100, int(percent))),
+        })
+
+    fit_score = round(sum(r["match_percent"] for r in scored) / len(scored)) if scored else 0
+    return {"requirements": scored, "FIT_SCORE": fit_score}
@@ -10,6 +10,6 @@ class PDFAnalyzerService:
     """Service for AI-powered PDF analysis using OpenAI GPT"""
     
     @staticmethod
-    async def analyze_with_openai(text: str) -> StructuredAnalysis:
+    async def analyze_with_openai(text: str, use_cache: bool = True) -> StructuredAnalysis:
         """Analyze resume text using OpenAI GPT and return structured JSON data"""
-        return await analyze_with_openai(text)
\ No newline at end of file
+        return await analyze_with_openai(text, use_cache=use_cache)
\ No newline at end of file
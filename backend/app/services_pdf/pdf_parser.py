@@ -2,13 +2,76 @@
 PDF parsing service for text extraction and metadata
 """
 
-from app.pdf_utils import extract_text_from_pdf
+import logging
+from typing import Optional
+
+from app.pdf_utils.cache import extraction_cache, pdf_sha256
+from app.pdf_utils.executor import extraction_executor
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_key(sha256: str, max_pages: Optional[int], max_chars: Optional[int]) -> str:
+    if max_pages or max_chars:
+        return f"{sha256}-p{max_pages or 0}-c{max_chars or 0}"
+    return sha256
 
 
 class PDFParserService:
     """Service for PDF text extraction and metadata parsing"""
     
     @staticmethod
-    def extract_text_from_pdf(pdf_content: bytes) -> tuple[str, dict]:
-        """Extract text and metadata from PDF using PyPDF"""
-        return extract_text_from_pdf(pdf_content)
\ No newline at end of file
+    async def extract_text_from_pdf(
+        pdf_content: bytes,
+        use_cache: bool = True,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        sha256: Optional[str] = None,
+    ) -> tuple[str, dict]:
+        """Extract text and metadata from PDF using PyPDF in the extraction process pool.
+
+        ``max_pages``/``max_chars`` stop extraction early once the budget is reached.
+        Results are cached by the SHA-256 of the PDF bytes (plus the budget); the hash
+        and the tier that served the result are reported as ``sha256`` and ``cache``
+        in the metadata. Pass ``sha256`` when the hash is already known (e.g. computed
+        while streaming the upload) to skip hashing the bytes again.
+        """
+        sha256 = sha256 or pdf_sha256(pdf_content)
+        key = _cache_key(sha256, max_pages, max_chars)
+
+        if use_cache:
+            cached = await extraction_cache.get(key)
+            if cached is not None:
+                text, metadata, tier = cached
+                logger.info(f"⚡ PDF extraction served from {tier} cache - {sha256[:12]}")
+                return text, {**metadata, "sha256": sha256, "cache": tier}
+
+        text, metadata = await extraction_executor.extract_text(
+            pdf_content, max_pages=max_pages or None, max_chars=max_chars or None
+        )
+        # Failures (timeouts, corrupt files) are not cached so they can be retried
+        if use_cache and "error" not in metadata:
+            await extraction_cache.set(key, text, metadata)
+        return text, {**metadata, "sha256": sha256, "cache": "miss"}
+
+    @classmethod
+    async def extract_resume_text(
+        cls, pdf_content: bytes, use_cache: bool = True, sha256: Optional[str] = None
+    ) -> tuple[str, dict]:
+        """Extract a whole resume.
+
+        The full text is what gets stored, indexed for search and given to the
+        chat; the RESUME_TEXT_MAX_* budget applies only when an LLM prompt is
+        built (``prompt_budget.limit_resume_text``).
+        """
+        return await cls.extract_text_from_pdf(pdf_content, use_cache=use_cache, sha256=sha256)
+
+    @staticmethod
+    async def cached_resume_text(sha256: str) -> Optional[tuple[str, dict]]:
+        """Cached ``extract_resume_text`` result for a PDF hash, without needing the bytes"""
+        cached = await extraction_cache.get(_cache_key(sha256, None, None))
+        if cached is None:
+            return None
+        text, metadata, tier = cached
+        logger.info(f"⚡ PDF extraction served from {tier} cache - {sha256[:12]}")
+        return text, {**metadata, "sha256": sha256, "cache": tier}
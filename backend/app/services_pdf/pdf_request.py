@@ -9,6 +9,7 @@ from fastapi import HTTPException
 from app.backend_models.response import PDFAnalysisResponse
 from app.services_pdf.pdf_parser import PDFParserService
 from app.services_pdf.pdf_analyzer import PDFAnalyzerService
+from app.services_pdf.prompt_budget import limit_resume_text
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,7 @@ class PDFRequestService:
         self.pdf_parser = PDFParserService()
         self.pdf_analyzer = PDFAnalyzerService()
     
-    async def process_analyze_request(self, file, include_raw_text: bool = False) -> PDFAnalysisResponse:
+    async def process_analyze_request(self, file, include_raw_text: bool = False, use_cache: bool = True) -> PDFAnalysisResponse:
         """Process PDF analysis request with AI"""
         request_start = time.time()
         logger.info(f"🚀 Starting analyze-pdf request - File: {file.filename}")
@@ -30,7 +31,7 @@ class PDFRequestService:
             pdf_content = await self._validate_and_read_file(file)
             
             # Extract text and metadata using PDF parser service
-            extracted_text, metadata = self.pdf_parser.extract_text_from_pdf(pdf_content)
+            extracted_text, metadata = await self.pdf_parser.extract_resume_text(pdf_content)
             
             if not extracted_text:
                 logger.warning("⚠️ No text extracted from PDF")
@@ -41,7 +42,7 @@ class PDFRequestService:
                 )
             
             # Analyze with OpenAI using PDF analyzer service
-            analysis = await self.pdf_analyzer.analyze_with_openai(extracted_text)
+            analysis = await self.pdf_analyzer.analyze_with_openai(limit_resume_text(extracted_text), use_cache=use_cache)
             
             total_time = time.time() - request_start
             logger.info(f"🏁 analyze-pdf request completed in {total_time:.2f}s total")
@@ -75,7 +76,7 @@ class PDFRequestService:
             pdf_content = await self._validate_and_read_file(file)
             
             # Extract text and metadata using PDF parser service
-            extracted_text, metadata = self.pdf_parser.extract_text_from_pdf(pdf_content)
+            extracted_text, metadata = await self.pdf_parser.extract_text_from_pdf(pdf_content)
             
             total_time = time.time() - request_start
             logger.info(f"🏁 parse-pdf request completed in {total_time:.2f}s total")
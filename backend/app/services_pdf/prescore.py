@@ -0,0 +1,86 @@
+"""
+Cheap local pre-score used by the cascade matching mode.
+
+Blends the rule-based score from local_scorer with the keyword overlap
+between requirements and resume and, when CASCADE_EMBEDDING_MODEL is set,
+the cosine similarity of sentence-transformers embeddings. The cascade only
+pays for an LLM call when this score lands inside the uncertainty band.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.config.settings import settings
+from app.services_pdf.local_scorer import keyword_overlap, requirement_terms, score_resume_locally
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=2)
+def _embedding_model(name: str) -> Optional[Any]:
+    """Loaded sentence-transformers model, or None when unavailable"""
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(name)
+    except Exception as e:  # not installed or the model cannot be downloaded
+        logger.warning(f"⚠️ Embedding model {name} unavailable ({e}); pre-score uses keywords only")
+        return None
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def embedding_similarity(requirements_text: str, resume_text: str) -> Optional[float]:
+    """Cosine similarity (0-1) of requirement and resume embeddings; None when disabled"""
+    name = settings.cascade_embedding_model
+    if not name or not requirements_text or not resume_text:
+        return None
+    model = _embedding_model(name)
+    if model is None:
+        return None
+    vectors = model.encode([requirements_text, resume_text[:4000]])
+    return max(0.0, _cosine(vectors[0], vectors[1]))
+
+
+async def prescore(
+    requirements: Any,
+    requirements_text: str,
+    resume_text: str,
+    resume_hash: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Local pre-score for a resume.
+
+    Returns the rule-based result (``requirements``/``FIT_SCORE`` shape) with
+    ``FIT_SCORE`` replaced by the blended score and the components under
+    ``components``.
+    """
+    local = score_resume_locally(requirements, resume_text, resume_hash=resume_hash)
+    overlap = keyword_overlap(requirements, resume_text)
+    # Embedding inference is CPU-bound; keep it off the event loop
+    similarity = await asyncio.to_thread(embedding_similarity, requirements_text, resume_text)
+
+    if similarity is None:
+        score = 0.75 * local["FIT_SCORE"] + 25 * overlap
+    else:
+        score = 0.6 * local["FIT_SCORE"] + 20 * overlap + 20 * similarity
+
+    return {
+        **local,
+        "FIT_SCORE": round(score),
+        "components": {
+            "rules": local["FIT_SCORE"],
+            "keyword_overlap": round(overlap, 3),
+            "embedding_similarity": round(similarity, 3) if similarity is not None else None,
+            "terms": len(requirement_terms(requirements)),
+        },
+    }
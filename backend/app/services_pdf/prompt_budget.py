@@ -0,0 +1,249 @@
+"""
+Token-aware prompt budgeting for LLM calls.
+
+Counts tokens locally (tiktoken when its encodings are available, otherwise
+an offline approximation) and trims large inputs to fit a per-model budget.
+Resumes are trimmed section by section, lowest-priority sections first, at
+sentence or line boundaries (mid-sentence only when a single long sentence
+would otherwise waste most of the budget).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Prompt (input) token budgets per model; unknown models use PROMPT_TOKEN_BUDGET
+MODEL_PROMPT_BUDGETS = {
+    "gpt-4o-mini": 12000,
+    "gpt-4o": 12000,
+    "gpt-3.5-turbo": 8000,
+}
+
+# Lower number = kept longer when the resume has to be trimmed
+SECTION_PRIORITIES = {
+    "header": 0,
+    "experience": 1,
+    "skills": 2,
+    "education": 3,
+    "projects": 4,
+    "certifications": 5,
+    "languages": 6,
+    "summary": 7,
+    "other": 8,
+    "interests": 9,
+}
+
+_SECTION_HEADINGS = {
+    "experience": r"(?:work |professional |employment )?experience|work history|employment|career|опыт работы|опыт|жұмыс тәжірибесі|тәжірибе",
+    "skills": r"(?:technical |key |core )?skills|technologies|tech stack|competencies|навыки|ключевые навыки|дағдылар",
+    "education": r"education|academic background|образование|білім",
+    "projects": r"(?:personal |key )?projects|проекты|жобалар",
+    "certifications": r"certifications?|certificates?|courses|achievements|awards|сертификаты|курсы|достижения|сертификаттар",
+    "languages": r"languages|языки|тілдер",
+    "summary": r"summary|profile|about me|objective|о себе|резюме|өзім туралы",
+    "interests": r"interests|hobbies|references|интересы|хобби",
+}
+_HEADING_RE = re.compile(
+    r"^\s*(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in _SECTION_HEADINGS.items()) + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+# "Page N:" headers written by the PDF parser (pdf_utils.parser.assemble_pages)
+_PAGE_MARKER = re.compile(r"^Page \d+:$", re.MULTILINE)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+
+@lru_cache(maxsize=8)
+def _encoder(model: str) -> Optional[Any]:
+    """tiktoken encoder for the model, or None when tiktoken/its data is unavailable"""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # not installed, or encodings cannot be downloaded offline
+        logger.info(f"tiktoken unavailable ({e}); using approximate token counts")
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens ``text`` occupies for ``model``"""
+    if not text:
+        return 0
+    encoder = _encoder(model or settings.openai_model)
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    # Offline approximation: ~4 characters per token for English, fewer for Cyrillic
+    cyrillic = sum(1 for ch in text if "Ѐ" <= ch <= "ӿ")
+    return math.ceil((len(text) - cyrillic) / 4 + cyrillic / 2.5)
+
+
+def count_message_tokens(messages: list[dict], model: Optional[str] = None) -> int:
+    """Tokens for a chat message list, including the per-message framing overhead"""
+    return sum(count_tokens(str(m.get("content") or ""), model) + 4 for m in messages) + 3
+
+
+def prompt_budget(model: Optional[str] = None) -> int:
+    """Input token budget for ``model``"""
+    name = model or settings.openai_model
+    return MODEL_PROMPT_BUDGETS.get(name, settings.prompt_token_budget)
+
+
+@dataclass
+class ResumeSection:
+    name: str
+    priority: int
+    lines: list[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def split_resume_sections(text: str) -> list[ResumeSection]:
+    """Split resume text into sections on recognised headings, keeping document order"""
+    sections = [ResumeSection("header", SECTION_PRIORITIES["header"])]
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line) if len(line) <= 60 else None
+        if match:
+            name = match.lastgroup or "other"
+            sections.append(ResumeSection(name, SECTION_PRIORITIES.get(name, SECTION_PRIORITIES["other"]), [line]))
+        else:
+            sections[-1].lines.append(line)
+    return [s for s in sections if any(l.strip() for l in s.lines)]
+
+
+def _truncate_tokens(text: str, max_tokens: int, model: Optional[str]) -> str:
+    """Longest prefix of ``text`` within ``max_tokens``, cut at a word boundary when possible"""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = text[:low]
+    if low < len(text) and not text[low].isspace():
+        word_start = prefix.rfind(" ")
+        if word_start > 0:
+            prefix = prefix[:word_start]
+    return prefix.rstrip()
+
+
+def _trim_to_tokens(text: str, max_tokens: int, model: Optional[str]) -> str:
+    """
+    Keep whole sentences/lines from the start of ``text`` within ``max_tokens``.
+
+    When the next sentence does not fit and whole sentences would leave more
+    than half the budget unused (a long run-on line, or a heading followed by
+    one), that sentence is cut at the token limit instead of dropped.
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    kept = []
+    used = 0
+    # Split while keeping separators so line structure survives
+    position = 0
+    for match in _SENTENCE_SPLIT.finditer(text):
+        piece = text[position:match.end()]
+        position = match.end()
+        cost = count_tokens(piece, model)
+        if used + cost > max_tokens:
+            if used * 2 < max_tokens:
+                kept.append(_truncate_tokens(piece, max_tokens - used, model))
+            break
+        kept.append(piece)
+        used += cost
+    else:
+        tail = text[position:]
+        if tail and used + count_tokens(tail, model) <= max_tokens:
+            kept.append(tail)
+        elif tail and used * 2 < max_tokens:
+            kept.append(_truncate_tokens(tail, max_tokens - used, model))
+    return "".join(kept).rstrip()
+
+
+def limit_resume_text(text: str, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    """
+    The part of an extracted resume that LLM prompts use.
+
+    Keeps at most RESUME_TEXT_MAX_PAGES pages and stops before the first page
+    that starts past RESUME_TEXT_MAX_CHARS characters (0 disables either
+    limit), the way extraction with a budget would. Text without page markers
+    is cut at the last line break within the character limit.
+    """
+    max_pages = settings.resume_text_max_pages if max_pages is None else max_pages
+    max_chars = settings.resume_text_max_chars if max_chars is None else max_chars
+    starts = [match.start() for match in _PAGE_MARKER.finditer(text)]
+    if not starts:
+        if not max_chars or len(text) <= max_chars:
+            return text
+        cut = text.rfind("\n", 0, max_chars)
+        return text[:cut if cut > 0 else max_chars].rstrip()
+
+    end = len(text)
+    chars = 0
+    for number, start in enumerate(starts):
+        if (max_pages and number >= max_pages) or (max_chars and chars >= max_chars):
+            end = start
+            break
+        stop = starts[number + 1] if number + 1 < len(starts) else len(text)
+        chars += stop - start
+    return text[:end].rstrip()
+
+
+def fit_text(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Trim free text to ``max_tokens`` at sentence/line boundaries (mid-sentence if it must)"""
+    return _trim_to_tokens(text, max_tokens, model)
+
+
+def fit_resume(text: str, max_tokens: int, model: Optional[str] = None) -> tuple[str, dict]:
+    """
+    Trim a resume to ``max_tokens``, shrinking the lowest-priority sections first.
+
+    Returns the trimmed text (sections in original order) and a summary with the
+    token counts and which sections were shortened or dropped.
+    """
+    original_tokens = count_tokens(text, model)
+    info = {"original_tokens": original_tokens, "tokens": original_tokens, "trimmed_sections": []}
+    if original_tokens <= max_tokens:
+        return text, info
+
+    sections = split_resume_sections(text)
+    costs = [count_tokens(s.text, model) for s in sections]
+
+    def joined() -> str:
+        return "\n".join(s.text for s in sections if s.lines)
+
+    # Measured on the joined text, so the separators between sections count too
+    overflow = count_tokens(joined(), model) - max_tokens
+    for index in sorted(range(len(sections)), key=lambda i: -sections[i].priority):
+        if overflow <= 0:
+            break
+        section = sections[index]
+        keep = max(0, costs[index] - overflow)
+        trimmed = _trim_to_tokens(section.text, keep, model)
+        if section.name != "header" and len([l for l in trimmed.splitlines() if l.strip()]) <= 1:
+            trimmed = ""  # only the heading would be left
+        costs[index] = count_tokens(trimmed, model)
+        section.lines = trimmed.splitlines() if trimmed else []
+        info["trimmed_sections"].append({"section": section.name, "dropped": not trimmed})
+        overflow = count_tokens(joined(), model) - max_tokens
+
+    result = joined()
+    if overflow > 0:
+        result = _truncate_tokens(result, max_tokens, model)
+    info["tokens"] = count_tokens(result, model)
+    return result, info
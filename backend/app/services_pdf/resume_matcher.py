@@ -11,21 +11,39 @@ from typing import Optional, Dict, Any
 from openai.types.chat import ChatCompletionMessageParam
 
 from app.config.settings import settings
+from app.core.metrics import metrics
+from app.services.llm_cache import llm_cache, make_cache_key
+from app.services.llm_scheduler import Priority, llm_scheduler
+from app.services_pdf.prompt_budget import (
+    count_message_tokens,
+    count_tokens,
+    fit_resume,
+    fit_text,
+    limit_resume_text,
+    prompt_budget,
+)
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt in _build_messages changes; cached results are keyed on it
+MATCHER_PROMPT_VERSION = "3"
 
-def _build_messages(job_requirements: str, resume_text: str) -> list[ChatCompletionMessageParam]:
+
+def _build_messages(job_requirements: str, resume_text: str, reference_month: str) -> list[ChatCompletionMessageParam]:
     resume_key_sections = (
         "Personal Information (Candidate Overview); Job Experience (Work History); "
         "Education;  Skills; Languages; Projects;Certifications and Achievements;"
     )
 
-    extractor_prompt = f"""
+    # The large inputs are sent once; the PART A and PART B instructions refer back to them
+    inputs_prompt = f"""
     Job Requirements: {job_requirements}
+
     Resume Content: {resume_text}
+    """
 
-    You are an expert resume analyzer. Follow PART A instructions below exactly.
+    extractor_prompt = f"""
+    You are an expert resume analyzer. Using the Job Requirements and Resume Content above, follow PART A instructions below exactly.
 
     PART A — EXTRACT MATCH (Required):
     - From the Resume Content, locate and extract only the parts that directly match or demonstrate the skills, experience, education, projects, certifications, or other qualifications listed in the Job Requirements.
@@ -35,16 +53,13 @@ def _build_messages(job_requirements: str, resume_text: str) -> list[ChatComplet
     """
 
     grader_prompt = f"""
-    Job Requirements: {job_requirements}
-    Resume Content: {resume_text}
-
     You are a precise evaluator. Your goal is to measure how accurately the resume satisfies each job requirement.
 
     PART B — SCORING RULES (STRICT):
 
     1. EXPERIENCE & DURATION:
     - Identify the start and end years of relevant positions.
-    - Compute duration as of October 2025.
+    - Compute duration as of {reference_month}.
     - If requirement says "3+ years" and resume shows only ~1 year, assign ≤ 40% match.
     - Partial matches (e.g. 2 out of 3 years) should get proportional scores (≈ 65%).
     - If no date or duration is mentioned, assume 0% for experience-based requirements.
@@ -102,7 +117,7 @@ def _build_messages(job_requirements: str, resume_text: str) -> list[ChatComplet
     STRICT INSTRUCTIONS:
     - Do NOT infer missing details.
     - If duration or skill usage is unclear, reduce score significantly (≤ 40%).
-    - Use October 2025 as current date when calculating experience.
+    - Use {reference_month} as current date when calculating experience.
     - Output valid JSON only — no comments, no text outside the JSON.
     """
 
@@ -112,6 +127,7 @@ def _build_messages(job_requirements: str, resume_text: str) -> list[ChatComplet
             "role": "system",
             "content": "You are an expert resume analyzer. Follow instructions precisely."
         },
+        {"role": "user", "content": inputs_prompt},
         {"role": "user", "content": extractor_prompt},
         {"role": "user", "content": grader_prompt},
         {
@@ -122,6 +138,67 @@ def _build_messages(job_requirements: str, resume_text: str) -> list[ChatComplet
     return messages
 
 
+def _reference_month() -> str:
+    return settings.scoring_reference().strftime("%B %Y")
+
+
+def _fit_inputs(job_requirements: str, resume_text: str, model_name: str) -> tuple[str, str, dict]:
+    """Trim requirements and resume so the whole prompt fits the model's token budget"""
+    budget = prompt_budget(model_name)
+    fixed_tokens = count_message_tokens(_build_messages("", "", _reference_month()), model_name)
+    available = max(0, budget - fixed_tokens)
+
+    # Requirements are short and must survive; cap them at a quarter of the inputs
+    jr_trimmed = fit_text(job_requirements, available // 4, model_name)
+    jr_tokens = count_tokens(jr_trimmed, model_name)
+    rt_trimmed, resume_info = fit_resume(limit_resume_text(resume_text), available - jr_tokens, model_name)
+
+    info = {
+        "budget": budget,
+        "prompt_tokens": fixed_tokens + jr_tokens + resume_info["tokens"],
+        "requirements_tokens": jr_tokens,
+        "resume_tokens": resume_info["tokens"],
+        "resume_original_tokens": resume_info["original_tokens"],
+        "trimmed_sections": resume_info["trimmed_sections"],
+    }
+    logger.info(
+        f"🔢 Matcher prompt budget ({model_name}): {info['prompt_tokens']}/{budget} tokens - "
+        f"requirements {jr_tokens}, resume {resume_info['tokens']}/{resume_info['original_tokens']}"
+        + (f", trimmed {[t['section'] for t in info['trimmed_sections']]}" if info["trimmed_sections"] else "")
+    )
+    return jr_trimmed, rt_trimmed, info
+
+
+def _parse_response(assistant_text: str) -> Dict[str, Any]:
+    """Validate the model's JSON; returns the parsed object or an error dict"""
+    try:
+        parsed = json.loads(assistant_text)
+    except json.JSONDecodeError:
+        logger.warning(f"Invalid JSON from model: {assistant_text[:200]}...")
+        return {"error": "Invalid JSON returned by model", "raw": assistant_text}
+
+    # Validate structure: must have "requirements" array and "FIT_SCORE"
+    if not isinstance(parsed, dict):
+        return {"error": "Response is not a JSON object", "raw": assistant_text}
+    
+    if "requirements" not in parsed or "FIT_SCORE" not in parsed:
+        return {"error": "JSON missing 'requirements' or 'FIT_SCORE'", "raw": assistant_text}
+    
+    if not isinstance(parsed["requirements"], list):
+        return {"error": "'requirements' must be an array", "raw": assistant_text}
+    
+    # Validate FIT_SCORE is numeric
+    try:
+        fit_score = float(parsed["FIT_SCORE"])
+        if not (0 <= fit_score <= 100):
+            logger.warning(f"FIT_SCORE out of range: {fit_score}")
+    except (ValueError, TypeError):
+        return {"error": "FIT_SCORE must be a number 0-100", "raw": assistant_text}
+
+    # Valid response - return the full parsed object
+    return parsed
+
+
 async def match_resume_to_requirements(
     job_requirements: str,
     resume_text: str,
@@ -129,14 +206,17 @@ async def match_resume_to_requirements(
     model: Optional[str] = None,
     temperature: float = 0.0,
     max_tokens: int = 2000,
+    use_cache: bool = True,
 ) -> Dict[str, Any] | Dict[str, str]:
     """
     Match resume against job requirements using OpenAI.
     
     Returns a dict with:
-    - On success: {"requirements": [...], "FIT_SCORE": int}
+    - On success: {"requirements": [...], "FIT_SCORE": int, "cache_hit": bool}
     - On error: {"error": str, "raw": str (optional)}
     
+    Successful results are cached by model, MATCHER_PROMPT_VERSION and the inputs;
+    pass ``use_cache=False`` to force a fresh model call.
     The full successful response is meant to be stored in Application.matching_sections (JSON field).
     """
     if not settings.openai_client or not settings.openai_api_key:
@@ -145,53 +225,52 @@ async def match_resume_to_requirements(
     client = settings.openai_client
     model_name = model or getattr(settings, "openai_model", "gpt-4o-mini")
 
-    # Simple truncation to avoid overly long inputs. Adjust as needed.
-    # This is a character-based proxy; you can make this token-aware later.
-    def truncate(s: str, max_len: int) -> str:
-        return s if len(s) <= max_len else s[:max_len]
-
-    jr_trimmed = truncate(job_requirements, 6000)
-    rt_trimmed = truncate(resume_text, 12000)
-
-    messages = _build_messages(jr_trimmed, rt_trimmed)
-    try:
-        resp = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        content = resp.choices[0].message.content if resp.choices else None
-        assistant_text = content.strip() if isinstance(content, str) else ""
-        if not assistant_text:
-            return {"error": "OpenAI returned empty response"}
+    jr_trimmed, rt_trimmed, budget_info = _fit_inputs(job_requirements, resume_text, model_name)
+    reference_month = _reference_month()
 
+    async def call_model() -> tuple[Dict[str, Any], int]:
+        messages = _build_messages(jr_trimmed, rt_trimmed, reference_month)
+        estimated_tokens = budget_info["prompt_tokens"] + max_tokens
         try:
-            parsed = json.loads(assistant_text)
-        except json.JSONDecodeError:
-            logger.warning(f"Invalid JSON from model: {assistant_text[:200]}...")
-            return {"error": "Invalid JSON returned by model", "raw": assistant_text}
-
-        # Validate structure: must have "requirements" array and "FIT_SCORE"
-        if not isinstance(parsed, dict):
-            return {"error": "Response is not a JSON object", "raw": assistant_text}
-        
-        if "requirements" not in parsed or "FIT_SCORE" not in parsed:
-            return {"error": "JSON missing 'requirements' or 'FIT_SCORE'", "raw": assistant_text}
-        
-        if not isinstance(parsed["requirements"], list):
-            return {"error": "'requirements' must be an array", "raw": assistant_text}
-        
-        # Validate FIT_SCORE is numeric
-        try:
-            fit_score = float(parsed["FIT_SCORE"])
-            if not (0 <= fit_score <= 100):
-                logger.warning(f"FIT_SCORE out of range: {fit_score}")
-        except (ValueError, TypeError):
-            return {"error": "FIT_SCORE must be a number 0-100", "raw": assistant_text}
-
-        # Valid response - return the full parsed object
-        return parsed
-    except Exception as e:
-        logger.exception("OpenAI API call failed")
-        return {"error": f"OpenAI API call failed: {e}"}
+            resp = await llm_scheduler.run(
+                Priority.BACKGROUND,
+                lambda: client.chat.completions.create(
+                    model=model_name,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                ),
+                estimated_tokens=estimated_tokens,
+                name="match",
+            )
+            total_tokens = resp.usage.total_tokens if resp.usage else 0
+            llm_scheduler.record_usage(estimated_tokens, total_tokens if resp.usage else None)
+            if resp.usage:
+                logger.info(
+                    f"🔢 Matcher tokens ({model_name}): prompt={resp.usage.prompt_tokens} "
+                    f"(estimated {budget_info['prompt_tokens']}), completion={resp.usage.completion_tokens}"
+                )
+                metrics.incr("llm.match.prompt_tokens", resp.usage.prompt_tokens)
+                metrics.incr("llm.match.completion_tokens", resp.usage.completion_tokens)
+            content = resp.choices[0].message.content if resp.choices else None
+            assistant_text = content.strip() if isinstance(content, str) else ""
+            if not assistant_text:
+                return {"error": "OpenAI returned empty response"}, total_tokens
+            return _parse_response(assistant_text), total_tokens
+        except Exception as e:
+            logger.exception("OpenAI API call failed")
+            return {"error": f"OpenAI API call failed: {e}"}, 0
+
+    cache_key = make_cache_key(
+        "match", model_name, MATCHER_PROMPT_VERSION, jr_trimmed, rt_trimmed,
+        temperature=temperature, max_tokens=max_tokens, reference=reference_month,
+    )
+    result, cache_hit = await llm_cache.get_or_call(
+        cache_key,
+        call_model,
+        bypass=not use_cache,
+        should_store=lambda r: not r.get("error"),
+    )
+    if result.get("error"):
+        return result
+    return {**result, "cache_hit": cache_hit}
@@ -0,0 +1,311 @@
+"""
+Local skill and technology extraction.
+
+A taxonomy of canonical skill names with their aliases (e.g. "k8s" ->
+Kubernetes), grouped into the ``TechnicalSkills`` categories, is compiled
+once into an Aho-Corasick automaton. ``extract_skills`` scans text in a
+single pass and returns canonical names per category, with no LLM call.
+Names that are also everyday words ("Swift", "Spring") only match with
+their capitalisation, and "Spring" not before a year or "semester".
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# category (TechnicalSkills field) -> canonical name -> aliases (matched case-insensitively).
+# Only the aliases are matched, so ambiguous canonical names ("Go", "R", "C") need a distinct alias;
+# two-letter abbreviations ("js", "ts") match too many unrelated words and are left out.
+SKILL_TAXONOMY: Dict[str, Dict[str, List[str]]] = {
+    "programming_languages": {
+        "Python": ["python", "python3", "питон"],
+        "Java": ["java"],
+        "JavaScript": ["javascript", "ecmascript", "es6"],
+        "TypeScript": ["typescript"],
+        "C": ["c language", "ansi c"],
+        "C++": ["c++", "cpp"],
+        "C#": ["c#", "csharp", "c sharp"],
+        "Go": ["golang", "go lang"],
+        "Rust": ["rust"],
+        "Kotlin": ["kotlin"],
+        "Swift": ["swift language", "swift programming"],
+        "Objective-C": ["objective-c", "objective c"],
+        "PHP": ["php"],
+        "Ruby": ["ruby"],
+        "Scala": ["scala"],
+        "R": ["r language", "r programming"],
+        "MATLAB": ["matlab"],
+        "Dart": ["dart"],
+        "SQL": ["sql"],
+        "Bash": ["bash", "shell scripting", "shell script"],
+        "PowerShell": ["powershell"],
+        "HTML": ["html", "html5"],
+        "CSS": ["css", "css3"],
+        "Solidity": ["solidity"],
+        "1C": ["1c:enterprise", "1с:предприятие", "1c:предприятие", "1с:бухгалтерия", "1c developer",
+               "1с разработчик", "программист 1с", "1с программист"],
+    },
+    "frameworks": {
+        "React": ["react", "react.js", "reactjs"],
+        "React Native": ["react native"],
+        "Next.js": ["next.js", "nextjs"],
+        "Vue.js": ["vue", "vue.js", "vuejs"],
+        "Nuxt": ["nuxt", "nuxt.js"],
+        "Angular": ["angular", "angularjs"],
+        "Svelte": ["svelte"],
+        "Node.js": ["node.js", "nodejs", "node js"],
+        "Express": ["express.js", "expressjs", "express framework"],
+        "NestJS": ["nestjs", "nest.js"],
+        "Django": ["django"],
+        "Django REST Framework": ["django rest framework", "drf"],
+        "Flask": ["flask"],
+        "FastAPI": ["fastapi"],
+        "Spring": ["spring framework", "spring mvc", "spring cloud", "spring data", "spring security"],
+        "Spring Boot": ["spring boot"],
+        "Hibernate": ["hibernate"],
+        ".NET": [".net", "dotnet", ".net core"],
+        "ASP.NET": ["asp.net", "asp.net core"],
+        "Ruby on Rails": ["ruby on rails", "rails"],
+        "Laravel": ["laravel"],
+        "Symfony": ["symfony"],
+        "Flutter": ["flutter"],
+        "SwiftUI": ["swiftui"],
+        "Jetpack Compose": ["jetpack compose"],
+        "Redux": ["redux"],
+        "Tailwind CSS": ["tailwind", "tailwindcss", "tailwind css"],
+        "Bootstrap": ["bootstrap"],
+        "jQuery": ["jquery"],
+        "GraphQL": ["graphql"],
+        "gRPC": ["grpc"],
+        "TensorFlow": ["tensorflow"],
+        "PyTorch": ["pytorch"],
+        "Keras": ["keras"],
+        "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+        "Pandas": ["pandas"],
+        "NumPy": ["numpy"],
+        "LangChain": ["langchain"],
+        "Hugging Face Transformers": ["hugging face", "huggingface"],
+        "OpenCV": ["opencv"],
+        "Apache Spark": ["spark", "apache spark", "pyspark"],
+        "Celery": ["celery"],
+        "SQLAlchemy": ["sqlalchemy"],
+        "Pydantic": ["pydantic"],
+        "Jest": ["jest"],
+        "Pytest": ["pytest"],
+        "Selenium": ["selenium"],
+        "Cypress": ["cypress"],
+        "Playwright": ["playwright"],
+    },
+    "databases": {
+        "PostgreSQL": ["postgresql", "postgres", "psql"],
+        "MySQL": ["mysql"],
+        "MariaDB": ["mariadb"],
+        "SQLite": ["sqlite"],
+        "Microsoft SQL Server": ["sql server", "mssql", "ms sql", "t-sql"],
+        "Oracle Database": ["oracle", "oracle db", "pl/sql"],
+        "MongoDB": ["mongodb", "mongo"],
+        "Redis": ["redis"],
+        "Cassandra": ["cassandra"],
+        "Elasticsearch": ["elasticsearch", "elastic search", "opensearch"],
+        "ClickHouse": ["clickhouse"],
+        "DynamoDB": ["dynamodb"],
+        "Firebase": ["firebase", "firestore"],
+        "Neo4j": ["neo4j"],
+        "Snowflake": ["snowflake"],
+        "BigQuery": ["bigquery", "big query"],
+        "Supabase": ["supabase"],
+        "ChromaDB": ["chromadb"],
+        "Pinecone": ["pinecone"],
+    },
+    "cloud_platforms": {
+        "AWS": ["aws", "amazon web services"],
+        "Amazon S3": ["amazon s3", "aws s3", "s3 bucket", "s3 buckets"],
+        "AWS Lambda": ["aws lambda", "lambda functions"],
+        "Amazon EC2": ["ec2", "amazon ec2"],
+        "Google Cloud": ["gcp", "google cloud", "google cloud platform"],
+        "Microsoft Azure": ["azure", "microsoft azure"],
+        "Heroku": ["heroku"],
+        "Vercel": ["vercel"],
+        "Netlify": ["netlify"],
+        "DigitalOcean": ["digitalocean", "digital ocean"],
+        "Yandex Cloud": ["yandex cloud", "яндекс облако"],
+        "Cloudflare": ["cloudflare"],
+    },
+    "tools": {
+        "Docker": ["docker", "docker compose", "docker-compose"],
+        "Kubernetes": ["kubernetes", "k8s"],
+        "Helm": ["helm"],
+        "Terraform": ["terraform"],
+        "Ansible": ["ansible"],
+        "Git": ["git"],
+        "GitHub": ["github"],
+        "GitLab": ["gitlab"],
+        "GitHub Actions": ["github actions"],
+        "GitLab CI": ["gitlab ci", "gitlab ci/cd"],
+        "Jenkins": ["jenkins"],
+        "CI/CD": ["ci/cd", "continuous integration"],
+        "Linux": ["linux", "ubuntu", "debian", "centos"],
+        "Nginx": ["nginx"],
+        "Kafka": ["kafka", "apache kafka"],
+        "RabbitMQ": ["rabbitmq", "rabbit mq"],
+        "Airflow": ["airflow", "apache airflow"],
+        "Prometheus": ["prometheus"],
+        "Grafana": ["grafana"],
+        "Jira": ["jira"],
+        "Confluence": ["confluence"],
+        "Figma": ["figma"],
+        "Postman": ["postman"],
+        "Webpack": ["webpack"],
+        "Vite": ["vite"],
+        "Jupyter": ["jupyter", "jupyter notebook"],
+        "Tableau": ["tableau"],
+        "Power BI": ["power bi", "powerbi"],
+        "Excel": ["excel", "ms excel"],
+        "REST API": ["rest api", "restful"],
+        "Microservices": ["microservices", "microservice architecture"],
+        "OpenAI API": ["openai", "openai api"],
+    },
+}
+
+# canonical name -> aliases matched only with exactly this capitalisation
+CASE_SENSITIVE_ALIASES: Dict[str, List[str]] = {
+    "Swift": ["Swift"],
+    "Spring": ["Spring"],
+}
+
+# canonical name -> pattern that, right after a case-sensitive alias, means the everyday word
+_EVERYDAY_CONTEXT: Dict[str, re.Pattern] = {
+    "Spring": re.compile(r"\s*(?:[-–'’]?\s*(?:19|20)\d{2}\b|semester|term|break|season|intern)", re.IGNORECASE),
+}
+
+# Characters that may not touch a match on either side (keeps "Java" out of "JavaScript")
+_WORD_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789_+#")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in _WORD_CHARS
+
+
+def _fold(text: str) -> str:
+    """Lowercase without changing string length, so match offsets stay valid"""
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over all aliases; one pass over the text finds every alias"""
+
+    def __init__(
+        self,
+        taxonomy: Dict[str, Dict[str, List[str]]],
+        case_sensitive: Optional[Dict[str, List[str]]] = None,
+    ):
+        case_sensitive = case_sensitive or {}
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # node -> [(alias length, canonical name, category, exact spelling or None)]
+        self.output: List[List[Tuple[int, str, str, Optional[str]]]] = [[]]
+        self.categories: Dict[str, str] = {}
+
+        for category, skills in taxonomy.items():
+            for canonical, aliases in skills.items():
+                self.categories[canonical] = category
+                for alias in aliases:
+                    self._add(_fold(alias), canonical, category)
+                for alias in case_sensitive.get(canonical, ()):
+                    self._add(_fold(alias), canonical, category, exact=alias)
+        self._build()
+
+    def _add(self, alias: str, canonical: str, category: str, exact: Optional[str] = None) -> None:
+        node = 0
+        for ch in alias:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append((len(alias), canonical, category, exact))
+
+    def _build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """Non-overlapping ``(start, end, canonical, category)`` matches, longest alias wins"""
+        folded = _fold(text)
+        candidates = []
+        node = 0
+        for index, ch in enumerate(folded):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, canonical, category, exact in self.output[node]:
+                start, end = index - length + 1, index + 1
+                if start > 0 and _is_word_char(folded[start - 1]) and _is_word_char(folded[start]):
+                    continue
+                if end < len(folded) and _is_word_char(folded[end]) and _is_word_char(folded[end - 1]):
+                    continue
+                if exact is not None:
+                    if text[start:end] != exact:
+                        continue
+                    everyday = _EVERYDAY_CONTEXT.get(canonical)
+                    if everyday is not None and everyday.match(text, end):
+                        continue
+                candidates.append((start, end, canonical, category))
+
+        # Prefer the longest match at each position ("spring boot" over "spring")
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        matches = []
+        covered = -1
+        for match in candidates:
+            if match[0] >= covered:
+                matches.append(match)
+                covered = match[1]
+        return matches
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> SkillMatcher:
+    return SkillMatcher(SKILL_TAXONOMY, CASE_SENSITIVE_ALIASES)
+
+
+def extract_skills(text: Optional[str]) -> Dict[str, List[str]]:
+    """Canonical skills found in ``text``, grouped by TechnicalSkills category"""
+    found: Dict[str, Dict[str, None]] = {category: {} for category in SKILL_TAXONOMY}
+    if text:
+        for _, _, canonical, category in get_matcher().find(text):
+            found[category][canonical] = None
+    return {category: list(names) for category, names in found.items()}
+
+
+def flatten_skills(skills: Dict[str, Iterable[str]]) -> List[str]:
+    """All skill names from a category mapping, in order, without duplicates"""
+    return list(dict.fromkeys(name for names in skills.values() for name in names))
+
+
+def canonical_skill(name: str) -> str:
+    """Canonical name for a skill or alias (any capitalisation); unknown names are returned unchanged"""
+    stripped = name.strip()
+    matches = get_matcher().find(stripped)
+    if len(matches) == 1 and matches[0][0] == 0 and matches[0][1] == len(stripped):
+        return matches[0][2]
+    return _canonical_names().get(stripped.lower(), stripped)
+
+
+@lru_cache(maxsize=1)
+def _canonical_names() -> Dict[str, str]:
+    """Lower-cased canonical name -> canonical name ("spring" -> "Spring")"""
+    return {canonical.lower(): canonical for skills in SKILL_TAXONOMY.values() for canonical in skills}
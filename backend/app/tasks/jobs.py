@@ -1,13 +1,182 @@
-from taskiq import TaskiqScheduler
+"""
+Background jobs executed by the taskiq worker.
+
+Run the worker against the configured Redis with:
+    taskiq worker app.tasks.jobs:broker
+
+Periodic jobs (resume storage GC, vacancy stats reconciliation) are sent by the scheduler:
+    taskiq scheduler app.tasks.jobs:scheduler
+"""
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from redis.asyncio import Redis
+from taskiq import (
+    Context,
+    SimpleRetryMiddleware,
+    TaskiqDepends,
+    TaskiqEvents,
+    TaskiqMessage,
+    TaskiqMiddleware,
+    TaskiqResult,
+    TaskiqScheduler,
+    TaskiqState,
+)
+from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_redis import ListQueueBroker
+from app.config.settings import settings
 from app.core.config import REDIS_URL
+from app.core.metrics import metrics
+from app.db.session import async_session, init_db
+from app.pdf_utils.executor import extraction_executor
+from app.services.application_processing import (
+    mark_application_failed,
+    process_application,
+)
+from app.services.llm_cache import llm_cache
+from app.services.vacancy_stats import reconcile_all
+from app.utils.resume_storage import collect_garbage
 
 if not REDIS_URL:
     raise ValueError("REDIS_URL environment variable is not set")
 
-broker = ListQueueBroker(REDIS_URL)
-scheduler = TaskiqScheduler(broker=broker, sources=[])
+logger = logging.getLogger(__name__)
+
+
+def is_final_attempt(labels: dict) -> bool:
+    """True when SimpleRetryMiddleware will not re-queue this message again"""
+    retries = int(labels.get("_retries", 0)) + 1
+    max_retries = int(labels.get("max_retries", settings.task_max_retries))
+    return retries >= max_retries
+
+
+class DeadLetterMiddleware(TaskiqMiddleware):
+    """Push messages that exhausted their retries onto a Redis list for inspection"""
+
+    def __init__(self, redis_url: str, queue_name: str):
+        super().__init__()
+        self.redis_url = redis_url
+        self.queue_name = queue_name
+        self._redis: Optional[Redis] = None
+
+    async def startup(self) -> None:
+        self._redis = Redis.from_url(self.redis_url)
+
+    async def shutdown(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def on_error(
+        self,
+        message: TaskiqMessage,
+        result: TaskiqResult[Any],
+        exception: BaseException,
+    ) -> None:
+        if not is_final_attempt(message.labels):
+            metrics.incr(f"tasks.{message.task_name}.retried")
+            return
+        metrics.incr(f"tasks.{message.task_name}.dead_lettered")
+        entry = {
+            "task_id": message.task_id,
+            "task_name": message.task_name,
+            "args": message.args,
+            "kwargs": message.kwargs,
+            "labels": message.labels,
+            "error": repr(exception),
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        logger.error(f"☠️ Task {message.task_name} ({message.task_id}) dead-lettered: {exception!r}")
+        try:
+            if self._redis is None:
+                await self.startup()
+            await self._redis.lpush(self.queue_name, json.dumps(entry, default=str))
+        except Exception as e:
+            logger.error(f"Failed to write dead-letter entry: {e}")
+
+
+broker = ListQueueBroker(REDIS_URL).with_middlewares(
+    SimpleRetryMiddleware(default_retry_count=settings.task_max_retries),
+    DeadLetterMiddleware(REDIS_URL, settings.dead_letter_queue),
+)
+scheduler = TaskiqScheduler(broker=broker, sources=[LabelScheduleSource(broker)])
+
+
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def worker_startup(state: TaskiqState) -> None:
+    await init_db()
+    settings.open_clients()
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def worker_shutdown(state: TaskiqState) -> None:
+    extraction_executor.shutdown()
+    await llm_cache.close()
+    await settings.close_clients()
+
+
+@broker.task(retry_on_error=True, max_retries=settings.task_max_retries)
+async def process_candidate(
+    candidate_id: str,
+    sha256: Optional[str] = None,
+    context: Context = TaskiqDepends(),
+) -> dict:
+    """Parse and score a submitted application, then notify the applicant"""
+    try:
+        with metrics.timer("tasks.process_candidate.duration"):
+            summary = await process_application(candidate_id, sha256=sha256)
+    except Exception as e:
+        if is_final_attempt(context.message.labels):
+            await mark_application_failed(candidate_id, str(e))
+        raise
+
+    # Invite applicants below the threshold to the clarification chat
+    score = summary.get("score")
+    if score is not None and score < settings.clarification_score_threshold:
+        await send_chat_notification.kiq(
+            candidate_id,
+            summary["email"],
+            summary["first_name"],
+            summary["vacancy_title"],
+        )
+        logger.info(f"🤖 Chat notification queued for application {candidate_id}")
+    return summary
+
+
+@broker.task(retry_on_error=True, max_retries=settings.task_max_retries)
+async def send_chat_notification(
+    application_id: str,
+    email: str,
+    first_name: str,
+    vacancy_title: str
+) -> None:
+    """Send notification to applicant with chat link"""
+    chat_url = f"http://localhost:5173/chat/{application_id}"  # Update with your frontend URL
+
+    logger.info(f"📧 Chat notification for {first_name} ({email})")
+    logger.info(f"🔗 Chat URL: {chat_url}")
+    logger.info(f"💼 Vacancy: {vacancy_title}")
+
+    # TODO: Implement actual email sending here
+    # For now, just log the notification
+
+
+@broker.task(schedule=[{"cron": settings.resume_gc_cron}])
+async def collect_resume_garbage() -> dict:
+    """Recount resume file references and delete unreferenced or orphaned files"""
+    async with async_session() as session:
+        with metrics.timer("tasks.collect_resume_garbage.duration"):
+            stats = await collect_garbage(session, settings.resume_gc_grace_hours)
+    for key, value in stats.items():
+        metrics.incr(f"resume_storage.gc.{key}", value)
+    return stats
+
 
-@broker.task
-async def process_candidate(candidate_id: str):
-    print(f"Processing candidate {candidate_id}")
+@broker.task(schedule=[{"cron": settings.vacancy_stats_cron}])
+async def reconcile_vacancy_stats() -> dict:
+    """Recompute the incrementally maintained vacancy statistics from the applications"""
+    async with async_session() as session:
+        with metrics.timer("tasks.reconcile_vacancy_stats.duration"):
+            return await reconcile_all(session)
@@ -1,17 +1,19 @@
 """
-Script to check and update application resume_parsed data
+Script to check and update application resume text
+(stored compressed in ResumeText, see app.services.resume_text)
 """
 import asyncio
 import json
-from pathlib import Path
 from app.db.session import async_session
 from app.models.application import Application
+from app.services.resume_text import load_resume_data, store_resume_text
 from app.services_pdf.pdf_parser import PDFParserService
+from app.utils.blob_storage import get_blob_storage
+from app.utils.resume_storage import storage_key
 from sqlmodel import select
-import aiofiles
 
 async def check_and_update_applications():
-    """Check applications and populate resume_parsed if missing"""
+    """Check applications and extract the resume text if missing"""
     async with async_session() as session:
         result = await session.execute(select(Application))
         applications = result.scalars().all()
@@ -24,36 +26,29 @@ async def check_and_update_applications():
             print(f"[{i}] {application.first_name} {application.last_name}")
             print(f"    ID: {application.id}")
             print(f"    Resume PDF: {application.resume_pdf}")
-            print(f"    Has resume_parsed: {bool(application.resume_parsed)}")
+            resume_data = await load_resume_data(session, application)
+            print(f"    Has resume text: {bool(resume_data and resume_data.get('raw_text'))}")
 
-            if application.resume_parsed:
-                if isinstance(application.resume_parsed, dict) and "raw_text" in application.resume_parsed:
-                    text_length = len(application.resume_parsed["raw_text"])
-                    print(f"    Resume text length: {text_length} chars")
-                else:
-                    print(f"    Resume parsed type: {type(application.resume_parsed)}")
+            if resume_data and resume_data.get("raw_text"):
+                print(f"    Resume text length: {len(resume_data['raw_text'])} chars")
             else:
                 # Try to parse the resume if PDF exists
                 if application.resume_pdf:
-                    file_path = Path(application.resume_pdf)
-                    if not file_path.exists():
-                        # Try relative to current directory
-                        alt_path = Path.cwd() / application.resume_pdf
-                        if alt_path.exists():
-                            file_path = alt_path
+                    # Local or S3, whichever STORAGE_BACKEND holds the resumes
+                    pdf_bytes = await get_blob_storage().read(storage_key(application.resume_pdf))
 
-                    if file_path.exists():
-                        print(f"    📄 Parsing resume PDF: {file_path}")
+                    if pdf_bytes:
+                        print(f"    📄 Parsing resume PDF: {application.resume_pdf}")
                         try:
-                            async with aiofiles.open(file_path, 'rb') as f:
-                                pdf_bytes = await f.read()
-
                             parser = PDFParserService()
-                            extracted_text, metadata = parser.extract_text_from_pdf(pdf_bytes)
+                            extracted_text, metadata = await parser.extract_text_from_pdf(pdf_bytes)
 
                             if extracted_text:
+                                application.resume_text_sha256 = await store_resume_text(
+                                    session, extracted_text, metadata.get("sha256")
+                                )
                                 application.resume_parsed = {
-                                    "raw_text": extracted_text,
+                                    **(application.resume_parsed or {}),
                                     "metadata": metadata
                                 }
                                 session.add(application)
@@ -0,0 +1,337 @@
+"""
+Blob storage backends for uploaded files.
+
+``LocalBlobStorage`` keeps blobs under a directory on this machine;
+``S3BlobStorage`` uses any S3-compatible service (AWS S3, MinIO) so API
+replicas share no disk. Both stream reads in chunks, support byte ranges and
+report ETag/Last-Modified for conditional GETs; S3 can also hand out
+presigned URLs so downloads bypass the API entirely. Keys are relative,
+``/``-separated paths such as ``ab/cd/<sha256>.pdf``.
+
+Select the backend with STORAGE_BACKEND ("local" or "s3"); boto3 is only
+imported when the S3 backend is used.
+"""
+import asyncio
+import logging
+import mimetypes
+import os
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+import aiofiles
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+LOCAL_STORAGE_ROOT = Path("uploads/resumes")
+CHUNK_SIZE = 256 * 1024
+
+_CONTENT_KEY = re.compile(r"(?:^|/)([0-9a-f]{64})\.[^/]*$")
+
+
+@dataclass
+class BlobInfo:
+    key: str
+    size: int
+    etag: str  # Quoted, as sent in the ETag header
+    last_modified: datetime
+    content_type: str
+
+
+def content_type_for(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+def content_etag(key: str) -> Optional[str]:
+    """ETag for a content-addressed key: the SHA-256 in its name, stable across re-uploads"""
+    match = _CONTENT_KEY.search(key)
+    return f'"{match.group(1)}"' if match else None
+
+
+def attachment_disposition(filename: str) -> str:
+    """Content-Disposition for a download, RFC 5987-encoded when not plain ASCII"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+class BlobStorage(ABC):
+    """Interface shared by the storage backends"""
+
+    name = "base"
+
+    @abstractmethod
+    async def put_file(self, source: Path, key: str) -> bool:
+        """
+        Store a local file under ``key`` and remove the source.
+
+        Returns False when the key already existed (content-addressed keys make
+        that a duplicate upload). The existing blob's content is kept and its
+        modification time refreshed, so the GC grace period covers the new
+        reference; the ETag of content-addressed keys does not change.
+        """
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        """Size, ETag and Last-Modified of a blob, or None when it does not exist"""
+
+    @abstractmethod
+    async def read(self, key: str) -> Optional[bytes]:
+        """Whole blob, or None when it does not exist"""
+
+    @abstractmethod
+    def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Stream bytes ``start``..``end`` (inclusive) in CHUNK_SIZE pieces"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Remove a blob; True when it was deleted"""
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> AsyncIterator[BlobInfo]:
+        """Every blob whose key starts with ``prefix``"""
+
+    async def presigned_url(self, key: str, expires: int, filename: Optional[str] = None) -> Optional[str]:
+        """Time-limited direct download URL, or None when the backend cannot issue one"""
+        return None
+
+
+class LocalBlobStorage(BlobStorage):
+    """Blobs as files under a root directory"""
+
+    name = "local"
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Optional[Path]:
+        path = self.root / key
+        root = self.root.resolve()
+        # Keys come from URLs; never leave the storage root
+        if root not in path.resolve().parents:
+            return None
+        return path
+
+    async def put_file(self, source: Path, key: str) -> bool:
+        target = self._path(key)
+        if target is None:
+            raise ValueError(f"Invalid storage key: {key}")
+        if target.exists():
+            source.unlink(missing_ok=True)
+            # Refresh the mtime for the GC grace period; the ETag comes from the key
+            os.utime(target)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+        return True
+
+    def _info(self, key: str, path: Path) -> BlobInfo:
+        st = path.stat()
+        return BlobInfo(
+            key=key,
+            size=st.st_size,
+            etag=content_etag(key) or f'"{st.st_mtime_ns:x}-{st.st_size:x}"',
+            last_modified=datetime.fromtimestamp(st.st_mtime, timezone.utc),
+            content_type=content_type_for(key),
+        )
+
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        path = self._path(key)
+        if path is None or not path.is_file():
+            return None
+        return self._info(key, path)
+
+    async def read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        if path is None or not path.is_file():
+            return None
+        async with aiofiles.open(path, 'rb') as f:
+            return await f.read()
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        async with aiofiles.open(path, 'rb') as f:
+            await f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def delete(self, key: str) -> bool:
+        path = self._path(key)
+        if path is None or not path.is_file():
+            return False
+        path.unlink()
+        return True
+
+    async def list(self, prefix: str = "") -> AsyncIterator[BlobInfo]:
+        for path in sorted(self.root.rglob("*")):
+            key = path.relative_to(self.root).as_posix()
+            # Dotfiles are in-progress writes, not blobs
+            if path.is_file() and not path.name.startswith(".") and key.startswith(prefix):
+                yield self._info(key, path)
+
+
+class S3BlobStorage(BlobStorage):
+    """Blobs in an S3-compatible bucket; boto3 calls run in a thread"""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+    ):
+        import boto3
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # Path-style addressing works with MinIO and custom endpoints
+            config=Config(s3={"addressing_style": "path"}, signature_version="s3v4"),
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _missing(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    async def _head(self, key: str) -> Optional[dict]:
+        try:
+            return await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if self._missing(e):
+                return None
+            raise
+
+    async def put_file(self, source: Path, key: str) -> bool:
+        content_type = content_type_for(key)
+        try:
+            if await self._head(key) is not None:
+                # Refresh LastModified so the GC grace period covers the new reference
+                await asyncio.to_thread(
+                    self.client.copy_object,
+                    Bucket=self.bucket,
+                    Key=self._key(key),
+                    CopySource={"Bucket": self.bucket, "Key": self._key(key)},
+                    MetadataDirective="REPLACE",
+                    ContentType=content_type,
+                )
+                return False
+            # upload_file streams from disk and switches to multipart for large files
+            await asyncio.to_thread(
+                self.client.upload_file,
+                str(source),
+                self.bucket,
+                self._key(key),
+                ExtraArgs={"ContentType": content_type},
+            )
+            return True
+        finally:
+            source.unlink(missing_ok=True)
+
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        head = await self._head(key)
+        if head is None:
+            return None
+        return BlobInfo(
+            key=key,
+            size=head["ContentLength"],
+            etag=content_etag(key) or head["ETag"],
+            last_modified=head["LastModified"],
+            content_type=head.get("ContentType") or content_type_for(key),
+        )
+
+    async def read(self, key: str) -> Optional[bytes]:
+        try:
+            response = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if self._missing(e):
+                return None
+            raise
+        body = response["Body"]
+        try:
+            return await asyncio.to_thread(body.read)
+        finally:
+            body.close()
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        response = await asyncio.to_thread(
+            self.client.get_object, Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}"
+        )
+        body = response["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> bool:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=self._key(key))
+        return True
+
+    async def list(self, prefix: str = "") -> AsyncIterator[BlobInfo]:
+        pages = iter(self.client.get_paginator("list_objects_v2").paginate(
+            Bucket=self.bucket, Prefix=self._key(prefix)
+        ))
+        while page := await asyncio.to_thread(next, pages, None):
+            for item in page.get("Contents", []):
+                key = item["Key"][len(self.prefix):]
+                yield BlobInfo(
+                    key=key,
+                    size=item["Size"],
+                    etag=content_etag(key) or item["ETag"],
+                    last_modified=item["LastModified"],
+                    content_type=content_type_for(key),
+                )
+
+    async def presigned_url(self, key: str, expires: int, filename: Optional[str] = None) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": self._key(key), "ResponseContentType": content_type_for(key)}
+        if filename:
+            params["ResponseContentDisposition"] = attachment_disposition(filename)
+        return await asyncio.to_thread(
+            self.client.generate_presigned_url, "get_object", Params=params, ExpiresIn=expires
+        )
+
+
+@lru_cache(maxsize=1)
+def get_blob_storage() -> BlobStorage:
+    """The configured storage backend (one per process)"""
+    if settings.storage_backend == "s3":
+        logger.info(f"🪣 Resume storage: s3://{settings.s3_bucket}/{settings.s3_prefix}")
+        return S3BlobStorage(
+            bucket=settings.s3_bucket,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+        )
+    if settings.storage_backend != "local":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {settings.storage_backend}")
+    return LocalBlobStorage(LOCAL_STORAGE_ROOT)
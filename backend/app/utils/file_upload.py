@@ -1,27 +1,46 @@
-import os
-import uuid
+import hashlib
+from dataclasses import dataclass
 from pathlib import Path
 from fastapi import UploadFile, HTTPException
 from typing import Optional
 import aiofiles
 
-# Configure upload directory
-UPLOAD_DIR = Path("uploads/resumes")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+from app.utils.blob_storage import get_blob_storage
+from app.utils.resume_storage import RESUME_ROOT, commit_file, storage_key, temp_path
+
+# Configure upload directory (content-addressed, see app.utils.resume_storage)
+UPLOAD_DIR = RESUME_ROOT
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+@dataclass
+class SavedUpload:
+    """A stored upload with the bytes and hash computed while streaming it to storage"""
+    path: str  # Relative path to saved file (see resume_storage.storage_key)
+    sha256: str
+    size: int
+    content: bytes
 
-async def save_uploaded_file(file: UploadFile) -> str:
+async def save_uploaded_file(file: UploadFile) -> SavedUpload:
     """
-    Save uploaded file and return the file path
+    Stream uploaded file to disk and return its path, hash and content
+    
+    The upload is read in UPLOAD_CHUNK_SIZE chunks: the size limit is enforced
+    as the chunks arrive, SHA-256 is computed on the fly and the data goes to a
+    temporary file that is then stored under its content address
+    (``ab/cd/<sha256><ext>``): an atomic rename with the local backend, an
+    upload with S3. An identical resume already stored is reused.
+    The returned content can be handed to the parser without reading the
+    file back.
     
     Args:
         file: UploadFile object from FastAPI
         
     Returns:
-        str: Relative path to saved file
+        SavedUpload: Path, SHA-256, size and bytes of the saved file
         
     Raises:
         HTTPException: If file validation fails
@@ -41,26 +60,37 @@ async def save_uploaded_file(file: UploadFile) -> str:
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Validate file size
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
-        )
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = UPLOAD_DIR / unique_filename
+    too_large = HTTPException(
+        status_code=400,
+        detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
+    )
+    # Reject early when the multipart part declares its size
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise too_large
     
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(content)
+    tmp_path = temp_path(file_ext)
+    digest = hashlib.sha256()
+    content = bytearray()
+    try:
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if len(content) + len(chunk) > MAX_FILE_SIZE:
+                    raise too_large
+                digest.update(chunk)
+                content += chunk
+                await f.write(chunk)
+        # Readers never see a partially written resume
+        file_path = await commit_file(tmp_path, digest.hexdigest(), file_ext)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
     
-    # Return relative path
-    return str(file_path)
+    return SavedUpload(
+        path=str(file_path),
+        sha256=digest.hexdigest(),
+        size=len(content),
+        content=bytes(content),
+    )
 
 async def delete_file(file_path: str) -> bool:
     """
@@ -73,11 +103,7 @@ async def delete_file(file_path: str) -> bool:
         bool: True if deleted successfully, False otherwise
     """
     try:
-        path = Path(file_path)
-        if path.exists() and path.is_file():
-            path.unlink()
-            return True
-        return False
+        return await get_blob_storage().delete(storage_key(file_path))
     except Exception as e:
         print(f"Error deleting file {file_path}: {e}")
         return False
@@ -95,6 +121,5 @@ def get_file_url(file_path: Optional[str]) -> Optional[str]:
     if not file_path:
         return None
     
-    # In production, this would be a cloud storage URL
-    # For now, return relative path
-    return f"/files/{Path(file_path).name}"
+    # Served by app.routers.files from the configured blob storage
+    return f"/files/{storage_key(file_path)}"
@@ -0,0 +1,80 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque base64url token holding the sort key of the last row of
+a page and its id, e.g. ``(created_at, id)`` or ``(matching_score, id)``.
+The next page starts strictly after that pair, so deep pages cost an index
+seek instead of an OFFSET scan. Rows are ordered by the sort column, then id,
+both descending; NULL sort values (unscored applications) come last.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+CURSOR_PAGE_SIZE = 50
+
+
+def encode_cursor(sort: str, value: Any, row_id: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, timestamp: bool = False) -> Tuple[Any, str]:
+    """Sort value and id from a cursor; 400 when it is malformed or from another sort order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or not isinstance(row_id, str):
+            raise ValueError("cursor belongs to a different sort order")
+        if timestamp and value is not None:
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    return value, row_id
+
+
+def keyset(
+    query,
+    sort: str,
+    column,
+    id_column,
+    cursor: Optional[str],
+    nullable: bool = False,
+    timestamp: bool = False,
+):
+    """
+    Order ``query`` by ``(column, id)`` descending and start after ``cursor``.
+
+    An empty cursor means the first page. ``timestamp`` marks datetime sort
+    columns, whose cursor values are ISO strings.
+    """
+    query = query.order_by(column.desc().nulls_last() if nullable else column.desc(), id_column.desc())
+    if not cursor:
+        return query
+
+    value, last_id = decode_cursor(cursor, sort, timestamp=timestamp)
+    if value is None:
+        # Already inside the trailing NULL block
+        return query.where(and_(column.is_(None), id_column < last_id))
+    after = tuple_(column, id_column) < tuple_(value, last_id)
+    return query.where(or_(after, column.is_(None)) if nullable else after)
+
+
+def page_rows(rows: Sequence[Any], limit: int, sort: str, sort_attr: str) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim rows fetched with ``limit + 1`` to the page and build ``next_cursor``.
+
+    ``next_cursor`` is None on the last page.
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(sort, getattr(last, sort_attr), last.id)
@@ -0,0 +1,182 @@
+"""
+Content-addressed resume storage.
+
+Resumes are stored once per distinct content under a two-level shard layout,
+``uploads/resumes/ab/cd/<sha256>.pdf``, so duplicate uploads share a file and
+no directory grows past a few hundred entries. ``ResumeFile`` rows, one per
+path (the same bytes uploaded as .pdf and .docx are two files), count the
+applications referencing each file; the count is incremented in the
+submission transaction and recomputed by ``collect_garbage``, which also
+removes files whose DB commit never happened.
+
+Bytes live in the configured blob storage (app.utils.blob_storage) under the
+key ``ab/cd/<sha256>.pdf``; ``Application.resume_pdf`` keeps the path form
+above and ``storage_key`` maps it (and legacy flat paths) to the key.
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import dialect_insert
+from app.models.application import Application, ResumeFile
+from app.services.resume_text import delete_unreferenced_texts
+from app.utils.blob_storage import LOCAL_STORAGE_ROOT, get_blob_storage
+
+logger = logging.getLogger(__name__)
+
+# Local scratch space for uploads in progress (and the local backend's root)
+RESUME_ROOT = LOCAL_STORAGE_ROOT
+RESUME_ROOT.mkdir(parents=True, exist_ok=True)
+
+# Suffix of files being written; stored under their key once complete
+PARTIAL_SUFFIX = ".part"
+
+
+def content_key(sha256: str, ext: str) -> str:
+    """Sharded storage key of a resume with the given hash, e.g. ab/cd/abcd....pdf"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def content_path(sha256: str, ext: str) -> Path:
+    """Path stored in Application.resume_pdf, e.g. uploads/resumes/ab/cd/abcd....pdf"""
+    return RESUME_ROOT / content_key(sha256, ext)
+
+
+def storage_key(resume_pdf: str) -> str:
+    """Blob storage key for a stored ``resume_pdf`` path (legacy flat paths included)"""
+    path = Path(resume_pdf)
+    try:
+        return path.relative_to(RESUME_ROOT).as_posix()
+    except ValueError:
+        return path.name
+
+
+def is_content_addressed(resume_path: str) -> bool:
+    path = Path(resume_path)
+    parts = path.parts
+    return (
+        len(parts) >= 3
+        and len(path.stem) == 64
+        and parts[-3] == path.stem[:2]
+        and parts[-2] == path.stem[2:4]
+    )
+
+
+def temp_path(ext: str) -> Path:
+    """Unique temporary path inside the local root (same filesystem, so local stores are atomic renames)"""
+    return RESUME_ROOT / f".{os.urandom(16).hex()}{ext}{PARTIAL_SUFFIX}"
+
+
+async def commit_file(tmp: Path, sha256: str, ext: str) -> Path:
+    """
+    Store a fully written temporary file at its content address.
+
+    When the content is already stored the temporary file is discarded and the
+    existing blob's modification time refreshed, so the GC grace period
+    covers the new reference until its transaction commits.
+    """
+    await get_blob_storage().put_file(tmp, content_key(sha256, ext))
+    return content_path(sha256, ext)
+
+
+async def add_reference(session: AsyncSession, sha256: str, path: str, size: int) -> None:
+    """
+    Count one more application referencing a stored resume.
+
+    Runs in the caller's transaction so the count commits (or rolls back)
+    with the application row.
+    """
+    now = datetime.now(timezone.utc)
+    insert = dialect_insert(session)
+    if insert is not None:
+        stmt = insert(ResumeFile).values(
+            sha256=sha256, path=path, size=size, ref_count=1, created_at=now, updated_at=now
+        )
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[ResumeFile.path],
+            set_={"ref_count": ResumeFile.ref_count + 1, "updated_at": now},
+        ))
+        return
+
+    resume_file = await session.get(ResumeFile, path)
+    if resume_file is None:
+        session.add(ResumeFile(sha256=sha256, path=path, size=size, ref_count=1))
+    else:
+        resume_file.ref_count += 1
+        resume_file.updated_at = now
+    await session.flush()
+
+
+async def recount_references(session: AsyncSession) -> int:
+    """Set every ``ref_count`` from the applications referencing the file; returns rows changed"""
+    refs = (
+        select(func.count(Application.id))
+        .where(Application.resume_pdf == ResumeFile.path)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(ResumeFile)
+        .where(ResumeFile.ref_count != refs)
+        .values(ref_count=refs)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+async def collect_garbage(session: AsyncSession, grace_hours: float) -> Dict[str, int]:
+    """
+    Recount references and delete unreferenced resume files.
+
+    - ``ref_count`` is recomputed from ``Application.resume_pdf``, which also
+      covers applications removed by the vacancy ON DELETE CASCADE.
+    - Files with no references are deleted once both the row and the file are
+      older than the grace period.
+    - Files (and leftover partial writes) with no ``ResumeFile`` row, e.g. when
+      the submission commit failed after the file was written, are deleted
+      once older than the grace period.
+    - Extracted texts (ResumeText) no application references are deleted
+      once last stored before the grace period.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    storage = get_blob_storage()
+    stats = {"recounted": 0, "deleted": 0, "orphans": 0, "texts_deleted": 0, "bytes_freed": 0}
+
+    stats["recounted"] = await recount_references(session)
+
+    unreferenced = (await session.execute(
+        select(ResumeFile).where(ResumeFile.ref_count == 0, ResumeFile.updated_at < cutoff)
+    )).scalars().all()
+    for resume_file in unreferenced:
+        key = storage_key(resume_file.path)
+        info = await storage.stat(key)
+        if info is not None:
+            if info.last_modified >= cutoff:
+                continue  # re-uploaded recently; a new reference may be committing
+            stats["bytes_freed"] += info.size
+            await storage.delete(key)
+        await session.delete(resume_file)
+        stats["deleted"] += 1
+    stats["texts_deleted"] = await delete_unreferenced_texts(session, cutoff)
+    await session.commit()
+
+    known = {storage_key(path) for path in (await session.execute(select(ResumeFile.path))).scalars().all()}
+    async for info in storage.list():
+        # Legacy flat files are left to app.migrate_resume_storage
+        if info.key in known or not is_content_addressed(info.key) or info.last_modified >= cutoff:
+            continue
+        stats["bytes_freed"] += info.size
+        await storage.delete(info.key)
+        stats["orphans"] += 1
+    for path in RESUME_ROOT.glob(f".*{PARTIAL_SUFFIX}"):
+        if datetime.fromtimestamp(path.stat().st_mtime, timezone.utc) < cutoff:
+            path.unlink(missing_ok=True)
+            stats["orphans"] += 1
+
+    logger.info(f"🧹 Resume storage GC: {stats}")
+    return stats
+
@@ -0,0 +1,242 @@
+"""
+Local OpenAI-compatible stub server for load testing and offline development.
+
+Serves /v1/chat/completions (including SSE streaming), /v1/embeddings and
+/v1/models with configurable latency, token throughput and error injection.
+Responses are deterministic for a given request body.
+
+Point the backend at it with:
+    OPENAI_BASE_URL=http://localhost:8010/v1 OPENAI_API_KEY=sk-fake
+
+Configuration (environment):
+    FAKE_LLM_PORT               port to listen on (8010)
+    FAKE_LLM_LATENCY            time to first token: fixed:S | uniform:A,B |
+                                normal:MEAN,STD | lognormal:MU,SIGMA (fixed:0.3)
+    FAKE_LLM_TOKENS_PER_SECOND  completion token throughput, 0 = instant (60)
+    FAKE_LLM_ERROR_RATE         fraction of requests answered with an error (0)
+    FAKE_LLM_ERROR_CODES        status codes to inject, comma-separated (429,500,503)
+    FAKE_LLM_RETRY_AFTER        Retry-After seconds sent with injected 429s (1)
+    FAKE_LLM_EMBEDDING_DIM      embedding vector size (1536)
+    FAKE_LLM_SEED               seed for latency/error sampling (unset = random)
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from typing import Any, List
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+load_dotenv()
+
+PORT = int(os.getenv("FAKE_LLM_PORT", "8010"))
+LATENCY = os.getenv("FAKE_LLM_LATENCY", "fixed:0.3")
+TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "60"))
+ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+ERROR_CODES = [int(c) for c in os.getenv("FAKE_LLM_ERROR_CODES", "429,500,503").split(",") if c.strip()]
+RETRY_AFTER = os.getenv("FAKE_LLM_RETRY_AFTER", "1")
+EMBEDDING_DIM = int(os.getenv("FAKE_LLM_EMBEDDING_DIM", "1536"))
+
+rng = random.Random(os.getenv("FAKE_LLM_SEED"))
+
+app = FastAPI(title="Fake LLM server")
+
+stats = {"requests": 0, "streams": 0, "embeddings": 0, "errors_injected": 0}
+
+
+def sample_latency(spec: str = LATENCY) -> float:
+    """Seconds of latency drawn from a ``kind:params`` distribution spec"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()]
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return rng.lognormvariate(values[0], values[1])
+    return values[0] if values else 0.0
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into stream-sized pieces that concatenate back to the original"""
+    return re.findall(r"\s*\S+|\s+", text)
+
+
+def injected_error() -> JSONResponse | None:
+    if ERROR_RATE <= 0 or rng.random() >= ERROR_RATE or not ERROR_CODES:
+        return None
+    stats["errors_injected"] += 1
+    status = rng.choice(ERROR_CODES)
+    headers = {"retry-after": RETRY_AFTER} if status == 429 else {}
+    error_type = "rate_limit_exceeded" if status == 429 else "server_error"
+    return JSONResponse(
+        status_code=status,
+        headers=headers,
+        content={"error": {"message": f"Injected {status} error", "type": error_type, "code": error_type}},
+    )
+
+
+def fake_completion(messages: List[dict], max_tokens: int) -> str:
+    """Plausible, deterministic output shaped like what each backend prompt expects"""
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+    digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+
+    if "FIT_SCORE" in prompt:
+        score = 40 + digest % 56
+        return json.dumps({
+            "requirements": [
+                {"vacancy_req": "experience", "user_req_data": "Developed services using Python (2021–2024)", "match_percent": score},
+                {"vacancy_req": "skills", "user_req_data": "Python, FastAPI, PostgreSQL", "match_percent": min(100, score + 10)},
+            ],
+            "FIT_SCORE": score,
+        })
+    if '"personal_information"' in prompt:
+        return json.dumps({
+            "personal_information": {"full_name": "Test Candidate", "email": "candidate@example.com"},
+            "professional_summary": {"career_level": "Mid", "years_of_experience": 3 + digest % 5},
+            "technical_skills": {"programming_languages": ["Python"], "frameworks": ["FastAPI"]},
+            "soft_skills": ["Communication"],
+        })
+
+    words = ["Could", "you", "tell", "me", "more", "about", "your", "experience", "with", "this",
+             "requirement", "and", "the", "projects", "where", "you", "applied", "it?"]
+    length = min(max_tokens, 12 + digest % 40)
+    return " ".join(words[i % len(words)] for i in range(length))
+
+
+def fake_embedding(text: Any) -> List[float]:
+    """Unit vector derived from the input hash (same input -> same vector)"""
+    seed = hashlib.sha256(json.dumps(text, sort_keys=True).encode("utf-8")).digest()
+    local = random.Random(seed)
+    vector = [local.gauss(0, 1) for _ in range(EMBEDDING_DIM)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+@app.get("/v1/models")
+async def list_models():
+    models = ["gpt-4o-mini", "gpt-4o", "gpt-3.5-turbo", "text-embedding-ada-002", "text-embedding-3-small"]
+    return {"object": "list", "data": [{"id": m, "object": "model", "owned_by": "fake"} for m in models]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    await asyncio.sleep(sample_latency())
+    error = injected_error()
+    if error is not None:
+        return error
+
+    messages = body.get("messages", [])
+    model = body.get("model", "gpt-4o-mini")
+    max_tokens = int(body.get("max_tokens") or body.get("max_completion_tokens") or 512)
+    content = fake_completion(messages, max_tokens)
+    pieces = tokenize(content)
+    prompt_tokens = sum(count_tokens(str(m.get("content") or "")) + 4 for m in messages) + 3
+    completion_tokens = len(pieces)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    delay = 1.0 / TOKENS_PER_SECOND if TOKENS_PER_SECOND > 0 else 0.0
+
+    if body.get("stream"):
+        stats["streams"] += 1
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict, finish_reason=None, usage=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if usage is None else [],
+            }
+            if usage is not None:
+                payload["usage"] = usage
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk({}, usage={
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                })
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(delay * completion_tokens)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    stats["embeddings"] += 1
+    await asyncio.sleep(sample_latency())
+    error = injected_error()
+    if error is not None:
+        return error
+
+    inputs = body.get("input", [])
+    # A single string, a list of strings, or (LangChain) lists of token ids
+    if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+        inputs = [inputs]
+    prompt_tokens = sum(len(i) if isinstance(i, list) else count_tokens(i) for i in inputs)
+    return {
+        "object": "list",
+        "model": body.get("model", "text-embedding-ada-002"),
+        "data": [
+            {"object": "embedding", "index": index, "embedding": fake_embedding(item)}
+            for index, item in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+if __name__ == "__main__":
+    print("🚀 Starting fake LLM server...")
+    print(f"   Latency: {LATENCY}, {TOKENS_PER_SECOND:g} tokens/s")
+    print(f"   Error rate: {ERROR_RATE:g} ({','.join(map(str, ERROR_CODES))})")
+    print(f"   Base URL: http://localhost:{PORT}/v1")
+    uvicorn.run(app, host="0.0.0.0", port=PORT)
@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# Run from anywhere: `python -m pytest backend/tests` or `cd backend && python -m pytest`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/15")
@@ -0,0 +1,65 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.models.application import Application, ApplicationSkill, ApplicationStatus
+from app.models.vacancy import Vacancy
+from app.services.application_processing import insert_application, load_application, store_application_result
+from app.services.vacancy_stats import recompute
+
+SKILLS = {"programming_languages": ["Python"], "databases": ["PostgreSQL"]}
+
+
+def run(tmp_path, steps):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/apps.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessionmaker() as session:
+            vacancy = Vacancy(title="Backend", description="Python", company="HireVibe", salary_min=1, salary_max=2)
+            session.add(vacancy)
+            await session.commit()
+            application = await insert_application(session, Application(
+                vacancy_id=vacancy.id, first_name="A", last_name="B", email="a@example.com",
+                status=ApplicationStatus.PROCESSING,
+            ))
+            await session.commit()
+        await steps(sessionmaker, application.id)
+        async with sessionmaker() as session:
+            skills = (await session.execute(
+                select(ApplicationSkill.skill).where(ApplicationSkill.application_id == application.id)
+            )).scalars().all()
+            drifted = await recompute(session, vacancy.id)
+        await engine.dispose()
+        return sorted(skills), drifted
+
+    return asyncio.run(main())
+
+
+def completed(score):
+    return {"status": ApplicationStatus.COMPLETED, "matching_score": score, "skills": SKILLS}
+
+
+def test_reprocessing_replaces_skill_rows(tmp_path):
+    async def steps(sessionmaker, application_id):
+        for score in (40.0, 75.0):
+            async with sessionmaker() as session:
+                application, _vacancy = await load_application(session, application_id)
+                await store_application_result(session, application_id, completed(score), SKILLS, loaded=application)
+
+    assert run(tmp_path, steps) == (["PostgreSQL", "Python"], False)
+
+
+def test_row_changed_after_loading_falls_back_to_locking(tmp_path):
+    async def steps(sessionmaker, application_id):
+        async with sessionmaker() as session:
+            application, _vacancy = await load_application(session, application_id)
+            await session.commit()
+            # Another run completes the application while this one is scoring
+            async with sessionmaker() as other:
+                await store_application_result(other, application_id, completed(30.0), SKILLS)
+            await store_application_result(session, application_id, completed(90.0), SKILLS, loaded=application)
+
+    assert run(tmp_path, steps) == (["PostgreSQL", "Python"], False)
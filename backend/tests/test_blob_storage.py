@@ -0,0 +1,37 @@
+import asyncio
+import os
+import time
+
+from app.utils.blob_storage import LocalBlobStorage
+
+KEY = "ab/cd/" + "abcd" + "0" * 60 + ".pdf"
+
+
+def test_duplicate_upload_keeps_the_etag_but_refreshes_last_modified(tmp_path):
+    storage = LocalBlobStorage(tmp_path / "blobs")
+
+    async def upload():
+        source = tmp_path / "upload.pdf"
+        source.write_bytes(b"%PDF-1.4 resume")
+        return await storage.put_file(source, KEY)
+
+    async def main():
+        assert await upload() is True
+        path = tmp_path / "blobs" / KEY
+        old = time.time() - 3600
+        os.utime(path, (old, old))
+        before = await storage.stat(KEY)
+        assert await upload() is False
+        return before, await storage.stat(KEY)
+
+    before, after = asyncio.run(main())
+    assert after.etag == before.etag
+    assert after.last_modified > before.last_modified
+    assert (tmp_path / "blobs" / KEY).read_bytes() == b"%PDF-1.4 resume"
+
+
+def test_other_keys_fall_back_to_mtime_and_size(tmp_path):
+    storage = LocalBlobStorage(tmp_path)
+    (tmp_path / "legacy.pdf").write_bytes(b"x")
+    info = asyncio.run(storage.stat("legacy.pdf"))
+    assert info.etag.startswith('"') and info.etag.endswith('-1"')
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from app.seed_data import sample_vacancies
+from app.services_pdf.experience_timeline import extract_timeline, required_years
+
+REFERENCE = date(2026, 10, 1)
+
+
+def entries(text):
+    return [(e["start"], e["end"]) for e in extract_timeline(text, REFERENCE).to_dict()["entries"]]
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("Backend Developer, Kaspi.kz Jan 2020 – Mar 2022", ("2020-01", "2022-03")),
+    ("Разработчик, сентябрь 2018 г. – н.в.", ("2018-09", "present")),
+    ("Разработчик, с мая 2019 по декабрь 2020", ("2019-05", "2020-12")),
+    ("Әзірлеуші, қаңтар 2020 – қазір", ("2020-01", "present")),
+    ("Engineer 03.2019 - 11.2021", ("2019-03", "2021-11")),
+    ("Sept. 2021 – Feb 2022", ("2021-09", "2022-02")),
+])
+def test_month_names(line, expected):
+    assert entries(f"Experience\n{line}") == [expected]
+
+
+@pytest.mark.parametrize("line", [
+    "Junior 2019 – 2021",
+    "Marketing 2019 – 2021",
+    "Decision Analyst 2019 – 2021",
+    "Senior 2019 – 2021",
+])
+def test_words_starting_like_a_month_are_not_months(line):
+    assert entries(f"Experience\n{line}") == [("2019-01", "2021-12")]
+
+
+def test_bare_year_range_runs_through_december():
+    timeline = extract_timeline("Experience\nDeveloper, Kolesa 2015 – 2017", REFERENCE)
+    assert timeline.total_months == 36
+
+
+def test_bare_end_year_is_capped_at_the_reference_date():
+    assert entries("Experience\nDeveloper 2024 – 2026") == [("2024-01", "2026-10")]
+
+
+def test_seed_vacancy_requirements():
+    wanted = [required_years(v["requirements"]["experience"]) for v in sample_vacancies]
+    assert wanted == [5, 3, 4, None, 3]
@@ -0,0 +1,88 @@
+"""init_db's in-place migration of tables created by an older version of the models"""
+import asyncio
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.db.session import _add_missing_columns, _create_missing_indexes, _rekey_resume_files
+from app.models.application import ResumeFile
+from app.utils.resume_storage import add_reference
+from app.models.vacancy import Vacancy
+
+# Tables as earlier releases created them
+LEGACY_SCHEMA = [
+    """CREATE TABLE vacancy (
+        id VARCHAR PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR NOT NULL,
+        company VARCHAR NOT NULL, salary_min INTEGER NOT NULL, salary_max INTEGER NOT NULL,
+        employment_type VARCHAR NOT NULL, requirements JSON,
+        created_at TIMESTAMP, updated_at TIMESTAMP
+    )""",
+    """CREATE TABLE application (
+        id VARCHAR PRIMARY KEY, vacancy_id VARCHAR REFERENCES vacancy (id) ON DELETE CASCADE,
+        first_name VARCHAR NOT NULL, last_name VARCHAR NOT NULL, email VARCHAR NOT NULL,
+        resume_pdf VARCHAR, resume_parsed JSON, matching_score FLOAT, matching_sections JSON,
+        created_at TIMESTAMP, updated_at TIMESTAMP
+    )""",
+    """CREATE TABLE resumefile (
+        sha256 VARCHAR PRIMARY KEY, path VARCHAR NOT NULL UNIQUE, size INTEGER NOT NULL,
+        ref_count INTEGER NOT NULL, created_at TIMESTAMP, updated_at TIMESTAMP
+    )""",
+    "INSERT INTO resumefile VALUES ('abcd', 'uploads/resumes/ab/cd/abcd.pdf', 10, 1, NULL, NULL)",
+    "INSERT INTO vacancy VALUES ('v1', 'Backend', 'Python', 'HireVibe', 1, 2, 'Full-time', NULL, NULL, NULL)",
+    "INSERT INTO application (id, vacancy_id, first_name, last_name, email, matching_score)"
+    " VALUES ('a1', 'v1', 'Aigerim', 'Sarsenova', 'a@example.com', 80)",
+]
+
+
+def migrate(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/legacy.db")
+        async with engine.begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                await conn.execute(text(statement))
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(_rekey_resume_files)
+            await conn.run_sync(_add_missing_columns)
+            await conn.run_sync(_create_missing_indexes)
+        async with engine.connect() as conn:
+            columns = await conn.run_sync(
+                lambda sync: {c["name"]: c for c in inspect(sync).get_columns("application")}
+            )
+            indexes = await conn.run_sync(lambda sync: {i["name"] for i in inspect(sync).get_indexes("application")})
+            status = (await conn.execute(text("SELECT status FROM application WHERE id = 'a1'"))).scalar_one()
+            full_scoring = (await conn.execute(select(Vacancy.full_scoring))).scalar_one()
+        async with AsyncSession(engine) as session:
+            # The same bytes uploaded again as .docx get their own file and count
+            await add_reference(session, "abcd", "uploads/resumes/ab/cd/abcd.docx", 10)
+            await add_reference(session, "abcd", "uploads/resumes/ab/cd/abcd.pdf", 10)
+            await session.commit()
+            files = {f.path: f.ref_count for f in (await session.execute(select(ResumeFile))).scalars()}
+        await engine.dispose()
+        return columns, indexes, status, full_scoring, files
+
+    return asyncio.run(main())
+
+
+def test_not_null_column_with_server_default_is_added(tmp_path):
+    columns, indexes, status, _, _ = migrate(tmp_path)
+    assert columns["status"]["nullable"] is False
+    # Applications from before the pipeline was asynchronous had already been scored
+    assert status == "completed"
+    assert "ix_application_status" in indexes
+
+
+def test_nullable_columns_are_added(tmp_path):
+    columns, _, _, _, _ = migrate(tmp_path)
+    assert {"resume_text_sha256", "processing_error", "skills"} <= set(columns)
+
+
+def test_vacancy_full_scoring_defaults_to_false(tmp_path):
+    _, _, _, full_scoring, _ = migrate(tmp_path)
+    assert full_scoring is False
+
+
+def test_resume_files_are_rekeyed_by_path(tmp_path):
+    *_, files = migrate(tmp_path)
+    assert files == {"uploads/resumes/ab/cd/abcd.pdf": 2, "uploads/resumes/ab/cd/abcd.docx": 1}
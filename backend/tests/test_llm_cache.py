@@ -0,0 +1,26 @@
+import asyncio
+
+from app.services.llm_cache import SQLiteLLMCache
+
+
+def test_sqlite_cache_reuses_one_connection(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.db"), ttl=60, max_entries=10)
+
+    async def main():
+        await cache.set("a", {"value": 1})
+        conn = cache._conn
+        results = await asyncio.gather(*(cache.get("a") for _ in range(20)), cache.get("missing"))
+        assert cache._conn is conn
+        await cache.close()
+        return results
+
+    results = asyncio.run(main())
+    assert results[:20] == [{"value": 1}] * 20
+    assert results[-1] is None
+    assert cache._conn is None
+
+
+def test_sqlite_cache_survives_a_new_event_loop(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.db"), ttl=60, max_entries=10)
+    asyncio.run(cache.set("a", {"value": 1}))
+    assert asyncio.run(cache.get("a")) == {"value": 1}
@@ -0,0 +1,189 @@
+"""
+LLMScheduler against a local OpenAI-compatible stub.
+
+The stub is an httpx.MockTransport behind a real AsyncOpenAI client, so the
+scheduler sees the SDK's own RateLimitError/APIStatusError exceptions and
+Retry-After headers, as it would with fake_llm_server.py or the real API.
+"""
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from app.core.metrics import metrics
+from app.services.llm_scheduler import LLMScheduler, Priority
+
+COMPLETION = {
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+}
+
+
+class StubLLM:
+    """Answers chat completions from a script of responses (the last one repeats)"""
+
+    def __init__(self, *responses: httpx.Response):
+        self.responses = list(responses) or [httpx.Response(200, json=COMPLETION)]
+        self.calls = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(time.monotonic())
+        index = min(len(self.calls) - 1, len(self.responses) - 1)
+        return self.responses[index]
+
+    def client(self) -> openai.AsyncOpenAI:
+        return openai.AsyncOpenAI(
+            api_key="sk-fake",
+            base_url="http://stub.local/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handler)),
+            max_retries=0,
+        )
+
+
+def scheduler(**overrides) -> LLMScheduler:
+    options = {
+        "requests_per_minute": 6000,
+        "tokens_per_minute": 1_000_000,
+        "class_concurrency": {p: 8 for p in Priority},
+        "max_concurrency": 0,
+        "max_retries": 3,
+        "backoff_base": 0.01,
+        "backoff_max": 0.05,
+    }
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+
+def chat(client: openai.AsyncOpenAI):
+    return lambda: client.chat.completions.create(
+        model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}]
+    )
+
+
+def test_429_is_retried_after_retry_after():
+    stub = StubLLM(
+        httpx.Response(429, headers={"retry-after": "0.3"}, json={"error": {"message": "slow down"}}),
+        httpx.Response(200, json=COMPLETION),
+    )
+    rate_limited = metrics.snapshot()["counters"].get("llm_scheduler.rate_limited", 0)
+
+    async def main():
+        return await scheduler().run(Priority.BACKGROUND, chat(stub.client()))
+
+    result = asyncio.run(main())
+    assert result.choices[0].message.content == "ok"
+    assert len(stub.calls) == 2
+    # Retry-After (0.3s) wins over the much shorter exponential backoff
+    assert stub.calls[1] - stub.calls[0] >= 0.3
+    assert metrics.snapshot()["counters"]["llm_scheduler.rate_limited"] == rate_limited + 1
+
+
+def test_429_pauses_admission_for_other_calls():
+    stub = StubLLM(
+        httpx.Response(429, headers={"retry-after": "0.3"}, json={"error": {"message": "slow down"}}),
+        httpx.Response(200, json=COMPLETION),
+    )
+
+    async def main():
+        sched = scheduler()
+        client = stub.client()
+        first = asyncio.create_task(sched.run(Priority.BACKGROUND, chat(client)))
+        await asyncio.sleep(0.05)  # the 429 has been received; admission is paused
+        started = time.monotonic()
+        await sched.run(Priority.INTERACTIVE, chat(client))
+        waited = time.monotonic() - started
+        await first
+        return waited
+
+    assert asyncio.run(main()) >= 0.2
+
+
+def test_5xx_backs_off_exponentially_and_gives_up():
+    stub = StubLLM(httpx.Response(503, json={"error": {"message": "unavailable"}}))
+
+    async def main():
+        await scheduler(max_retries=2, backoff_base=0.05, backoff_max=1).run(Priority.BACKGROUND, chat(stub.client()))
+
+    with pytest.raises(openai.InternalServerError):
+        asyncio.run(main())
+    assert len(stub.calls) == 3
+    gaps = [b - a for a, b in zip(stub.calls, stub.calls[1:])]
+    # base * 2**(attempt-1), jittered by 0.5-1.5x
+    assert 0.025 <= gaps[0] <= 0.1
+    assert 0.05 <= gaps[1] <= 0.2
+
+
+def test_client_errors_are_not_retried():
+    stub = StubLLM(httpx.Response(400, json={"error": {"message": "bad request"}}))
+
+    async def main():
+        await scheduler().run(Priority.INTERACTIVE, chat(stub.client()))
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(main())
+    assert len(stub.calls) == 1
+
+
+def test_tokens_per_minute_bucket_delays_admission():
+    stub = StubLLM()
+
+    async def main():
+        # 600 TPM refills 10 tokens/s: the first call drains the bucket, the second needs 5 tokens
+        sched = scheduler(tokens_per_minute=600)
+        client = stub.client()
+        await sched.run(Priority.BACKGROUND, chat(client), estimated_tokens=600)
+        started = time.monotonic()
+        await sched.run(Priority.BACKGROUND, chat(client), estimated_tokens=5)
+        return time.monotonic() - started
+
+    assert 0.4 <= asyncio.run(main()) < 1.5
+
+
+def test_requests_per_minute_bucket_delays_admission():
+    stub = StubLLM()
+
+    async def main():
+        # 120 RPM refills 2 requests/s; start from a spent bucket
+        sched = scheduler(requests_per_minute=120)
+        client = stub.client()
+        sched.requests.take(sched.requests.capacity)
+        started = time.monotonic()
+        await sched.run(Priority.BACKGROUND, chat(client))
+        return time.monotonic() - started
+
+    assert 0.4 <= asyncio.run(main()) < 1.5
+
+
+def test_interactive_is_admitted_before_queued_background_calls():
+    async def main():
+        sched = scheduler(max_concurrency=1)
+        order = []
+        release = asyncio.Event()
+
+        async def call(label, hold=None):
+            order.append(label)
+            if hold is not None:
+                await hold.wait()
+            return label
+
+        blocker = asyncio.create_task(sched.run(Priority.BACKGROUND, lambda: call("blocker", release)))
+        await asyncio.sleep(0.01)
+        queued = [
+            asyncio.create_task(sched.run(Priority.BACKGROUND, lambda: call("background-1"))),
+            asyncio.create_task(sched.run(Priority.BACKGROUND, lambda: call("background-2"))),
+        ]
+        await asyncio.sleep(0.01)
+        queued.append(asyncio.create_task(sched.run(Priority.INTERACTIVE, lambda: call("interactive"))))
+        await asyncio.sleep(0.01)
+        assert order == ["blocker"]  # the single slot is taken
+        release.set()
+        await asyncio.gather(blocker, *queued)
+        return order
+
+    assert asyncio.run(main()) == ["blocker", "interactive", "background-1", "background-2"]
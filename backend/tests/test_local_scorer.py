@@ -0,0 +1,59 @@
+from datetime import date
+
+from app.services_pdf.local_scorer import _topic_groups, _topic_terms, score_resume_locally
+
+REFERENCE = date(2026, 10, 1)
+
+RESUME = """Aigerim Sarsenova
+Almaty, Kazakhstan
+Experience
+Senior Backend Engineer, Kaspi.kz Jan 2018 – Present
+Built payment services in Python and Java, deployed on Kubernetes in AWS.
+Marketing Assistant, GrowthLab 2016 – 2017
+Ran social media campaigns.
+Education
+Bachelor of Computer Science, KBTU 2011 – 2015
+Skills
+Python, Java, JavaScript, PostgreSQL, Docker
+"""
+
+# Seed vacancy #1 (app.seed_data)
+SENIOR_SOFTWARE_ENGINEER = {
+    "experience": "5+ years of experience in software development",
+    "skills": ["Python", "JavaScript", "Java", "Cloud platforms (AWS, GCP, Azure)"],
+    "education": "Bachelor's degree in Computer Science or related field",
+}
+
+
+def scores(requirements):
+    result = score_resume_locally(requirements, RESUME, REFERENCE)
+    return {r["vacancy_req"].split(":", 1)[0]: r["match_percent"] for r in result["requirements"]}
+
+
+def test_parenthesised_enumeration_is_one_group_of_alternatives():
+    assert _topic_groups("Python, Cloud platforms (AWS, GCP, Azure)") == [
+        ["Python"], ["Cloud platforms", "AWS", "GCP", "Azure"],
+    ]
+    assert _topic_terms("Cloud platforms (AWS, GCP, Azure)") == ["Cloud platforms", "AWS", "GCP", "Azure"]
+
+
+def test_generic_experience_counts_engineering_roles():
+    # The backend role is software development even without those words in its title
+    assert scores(SENIOR_SOFTWARE_ENGINEER)["experience"] == 100
+
+
+def test_generic_experience_skips_unrelated_roles():
+    # Jan 2018 – Sep 2026 is 8.75 years; the marketing job does not add to it
+    assert scores({"experience": "10+ years in software development"})["experience"] == 88
+
+
+def test_experience_with_a_technology_counts_only_positions_using_it():
+    assert scores({"experience": "3+ years of experience with Kubernetes"})["experience"] == 100
+    assert scores({"experience": "3+ years of experience with React or Vue.js"})["experience"] == 0
+
+
+def test_skills_match_through_aliases():
+    assert scores({"skills": "k8s"}) == {"skills": 100}  # Kubernetes, used in the experience section
+    assert scores({"skills": "Postgres"}) == {"skills": 70}  # PostgreSQL, only listed
+    # Any of the enumerated cloud platforms satisfies the requirement
+    assert scores({"skills": "Cloud platforms (AWS, GCP, Azure)"}) == {"skills": 100}
@@ -0,0 +1,43 @@
+import threading
+
+from app.pdf_utils.cache import ExtractionCache
+
+KEY = "ab" * 32
+
+
+def test_concurrent_writes_of_one_key_leave_a_single_entry(tmp_path):
+    cache = ExtractionCache(disk_dir=str(tmp_path))
+
+    def write(i):
+        for _ in range(25):
+            cache._disk_put(KEY, f"text {i}", {"pages": 1})
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    files = [p.name for p in tmp_path.rglob("*") if p.is_file() and p.name != ".lock"]
+    assert files == [f"{KEY}.json"]
+    text, metadata = ExtractionCache(disk_dir=str(tmp_path))._disk_get(KEY)
+    assert text.startswith("text ") and metadata == {"pages": 1}
+
+
+def test_entries_written_by_another_process_are_found(tmp_path):
+    writer = ExtractionCache(disk_dir=str(tmp_path))
+    reader = ExtractionCache(disk_dir=str(tmp_path))
+    assert reader._disk_get(KEY) is None  # a miss must not hide later writes
+    writer._disk_put(KEY, "text", {"pages": 2})
+    assert reader._disk_get(KEY) == ("text", {"pages": 2})
+
+
+def test_disk_bound_is_shared_between_writers(tmp_path):
+    first = ExtractionCache(disk_dir=str(tmp_path), disk_max_bytes=2000)
+    second = ExtractionCache(disk_dir=str(tmp_path), disk_max_bytes=2000)
+    for i in range(10):
+        cache = first if i % 2 else second
+        cache._disk_put(f"{i:02d}" * 32, "x" * 400, {})
+    sizes = [p.stat().st_size for p in tmp_path.glob("*/*.json")]
+    assert sum(sizes) <= 2000
+    assert first._disk_get("09" * 32) is not None  # newest entries survive
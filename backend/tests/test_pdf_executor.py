@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.pdf_utils.executor import PDFExtractionExecutor
+
+
+def run(executor, coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            executor.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_timed_out_job_does_not_hold_its_worker():
+    executor = PDFExtractionExecutor(max_workers=1, timeout=30)
+
+    async def main():
+        await executor.submit(abs, 0)  # let the worker start
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.submit(time.sleep, 30, timeout=0.5)
+        started = time.monotonic()
+        # The only worker was hung; without recycling this waits for the sleep
+        assert await executor.submit(abs, -3) == 3
+        return time.monotonic() - started
+
+    assert run(executor, main()) < 15
+    assert executor.stats()["generation"] == 1
+
+
+def test_dead_worker_restarts_the_pool_and_resubmits_bystanders():
+    executor = PDFExtractionExecutor(max_workers=2, timeout=30)
+
+    async def main():
+        await asyncio.gather(executor.submit(abs, 0), executor.submit(abs, 0))
+        crash = executor.submit(os._exit, 1)
+        bystander = executor.submit(time.sleep, 1)
+        results = await asyncio.gather(crash, bystander, return_exceptions=True)
+        # Later jobs run in the new pool
+        assert await executor.submit(abs, -2) == 2
+        return results
+
+    crashed, slept = run(executor, main())
+    assert type(crashed).__name__ == "BrokenProcessPool"
+    assert slept is None
+    # Only the bystander is retried, so the new pool survives
+    assert executor.stats()["generation"] == 1
+
+
+def test_time_spent_waiting_for_a_worker_does_not_count():
+    executor = PDFExtractionExecutor(max_workers=1, timeout=2)
+
+    async def main():
+        await executor.submit(abs, 0)
+        # Three 1.2s jobs on one worker: the last waits 2.4s, longer than its timeout
+        return await asyncio.gather(*(executor.submit(time.sleep, 1.2) for _ in range(3)))
+
+    assert run(executor, main()) == [None, None, None]
+    assert executor.stats()["generation"] == 0
+
+
+def test_abandoned_running_job_is_still_held_to_its_timeout():
+    executor = PDFExtractionExecutor(max_workers=1, timeout=30)
+
+    async def main():
+        await executor.submit(abs, 0)
+        hung = asyncio.ensure_future(executor.submit(time.sleep, 30, timeout=0.5))
+        await asyncio.sleep(0.3)
+        hung.cancel()
+        queued = asyncio.ensure_future(executor.submit(abs, -1))
+        await asyncio.sleep(0)
+        queued.cancel()
+        await asyncio.sleep(1.5)
+        return executor.stats()["generation"]
+
+    assert run(executor, main()) == 1
+
+
+class FakeChunkExecutor(PDFExtractionExecutor):
+    """Runs page ranges as coroutines so chunk scheduling can be tested without PDFs"""
+
+    def __init__(self, delays, fail=None, **kwargs):
+        super().__init__(max_workers=len(delays), parallel_threshold=1, **kwargs)
+        self.min_pages_per_chunk = 1
+        self.delays = delays
+        self.fail = fail
+        self.finished = []
+
+    async def submit(self, fn, pdf_content, start, stop, timeout=None):
+        await asyncio.sleep(self.delays[start])
+        if start == self.fail:
+            raise ValueError("bad page")
+        self.finished.append(start)
+        return [(start + 1, "x" * 100, 0.0)], {}
+
+
+def test_parallel_chunks_share_one_deadline():
+    executor = FakeChunkExecutor([0.4, 0.4, 0.4, 5], timeout=1)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(executor._extract_parallel(b"", 4, None, None, None))
+    assert executor.finished == [0, 1, 2]
+
+
+def test_failed_chunk_cancels_the_others():
+    executor = FakeChunkExecutor([0.1, 0.5, 0.5], fail=0, timeout=30)
+
+    async def main():
+        with pytest.raises(ValueError):
+            await executor._extract_parallel(b"", 3, None, None, None)
+        await asyncio.sleep(0.6)
+
+    asyncio.run(main())
+    assert executor.finished == []
+
+
+def test_parallel_extraction_stops_once_the_leading_pages_meet_max_chars():
+    executor = FakeChunkExecutor([0.1, 0.1, 5, 5], timeout=30)
+    started = time.monotonic()
+    text, _metadata = asyncio.run(executor._extract_parallel(b"", 4, None, 150, None))
+    assert time.monotonic() - started < 2
+    assert text.count("Page ") == 2
@@ -0,0 +1,48 @@
+from app.services_pdf.prompt_budget import count_tokens, fit_resume, fit_text, limit_resume_text
+
+
+def test_fit_text_keeps_whole_sentences():
+    text = "Built payment APIs. " * 20
+    trimmed = fit_text(text, 30)
+    assert trimmed.endswith("APIs.")
+    assert 0 < count_tokens(trimmed) <= 30
+
+
+def test_fit_text_truncates_a_sentence_longer_than_the_budget():
+    text = " ".join(f"skill{i}" for i in range(500)) + "."
+    trimmed = fit_text(text, 40)
+    assert trimmed
+    assert text.startswith(trimmed)
+    assert count_tokens(trimmed) <= 40
+    assert trimmed.split()[-1] in text.split()  # cut between words
+
+
+def test_fit_resume_keeps_part_of_a_single_line_section():
+    skills = "Skills\n" + ", ".join(f"Tool{i}" for i in range(400))
+    text = "Aigerim Sarsenova\nBackend developer\n\n" + skills
+    trimmed, info = fit_resume(text, 120)
+    assert "Skills\nTool0, Tool1" in trimmed
+    assert count_tokens(trimmed) <= 120
+    assert info["trimmed_sections"] == [{"section": "skills", "dropped": False}]
+
+
+def test_limit_resume_text_applies_the_page_and_char_budget():
+    text = "\n\n".join(f"Page {n}:\n" + "x" * 100 for n in range(1, 6))
+    assert limit_resume_text(text, max_pages=2, max_chars=0).count("Page ") == 2
+    assert limit_resume_text(text, max_pages=0, max_chars=250).count("Page ") == 3
+    assert limit_resume_text(text, max_pages=0, max_chars=0) == text
+
+
+def test_limit_resume_text_without_page_markers_cuts_at_a_line():
+    text = "Summary line\n" * 10
+    assert limit_resume_text(text, max_pages=0, max_chars=40) == "Summary line\nSummary line\nSummary line"
+
+
+def test_fit_resume_counts_the_separators_between_sections():
+    headings = ("Experience", "Education", "Skills", "Projects", "Languages", "Certifications", "Interests")
+    for items in range(1, 8):
+        text = "\n".join(f"{h}\n" + "\n".join(f"- {h} {n}" for n in range(items)) for h in headings)
+        for budget in range(5, count_tokens(text)):
+            trimmed, info = fit_resume(text, budget)
+            assert count_tokens(trimmed) <= budget
+            assert info["tokens"] == count_tokens(trimmed)
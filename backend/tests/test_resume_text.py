@@ -0,0 +1,35 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.services.resume_search import FTS_TABLE, create_search_index
+from app.services.resume_text import load_resume_text, store_resume_text
+
+KEY = "cd" * 32
+
+
+def test_changed_text_under_the_same_pdf_hash_replaces_the_old_one(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/texts.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(create_search_index)
+        sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessionmaker() as session:
+            await store_resume_text(session, "Python developer, first pages only", KEY)
+            await session.commit()
+            # Re-processed after a parser or budget change
+            await store_resume_text(session, "Python developer, whole resume with Kubernetes", KEY)
+            await session.commit()
+            await store_resume_text(session, "Python developer, whole resume with Kubernetes", KEY)
+            await session.commit()
+            stored = await load_resume_text(session, KEY)
+            indexed = (await session.execute(text(f"SELECT body FROM {FTS_TABLE} WHERE sha256 = :key"), {"key": KEY})).scalars().all()
+        await engine.dispose()
+        return stored, indexed
+
+    stored, indexed = asyncio.run(main())
+    assert stored == "Python developer, whole resume with Kubernetes"
+    assert indexed == [stored]
@@ -0,0 +1,38 @@
+import pytest
+
+from app.services_pdf.skill_extractor import canonical_skill, extract_skills, flatten_skills
+
+
+def skills(text):
+    return flatten_skills(extract_skills(text))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Java, Spring, Hibernate", ["Java", "Spring", "Hibernate"]),
+    ("Spring Boot microservices", ["Spring Boot", "Microservices"]),
+    ("iOS apps in Swift and SwiftUI", ["Swift", "SwiftUI"]),
+    ("REST APIs on Node.js and Express.js", ["Node.js", "Express"]),
+    ("K8s, Postgres", ["PostgreSQL", "Kubernetes"]),
+])
+def test_skills_are_found(text, expected):
+    assert sorted(skills(text)) == sorted(expected)
+
+
+@pytest.mark.parametrize("text", [
+    "Spring 2021 intern at Kaspi",
+    "Exchange student, spring semester",
+    "A swift learner; integrated SWIFT payments",
+    "Express delivery of parcels",
+    "JS/TS",
+    "Grade 1C",
+    "Passed the S3 exam",
+])
+def test_everyday_words_are_not_skills(text):
+    assert skills(text) == []
+
+
+def test_canonical_skill_ignores_case():
+    assert canonical_skill("spring") == "Spring"
+    assert canonical_skill("swift") == "Swift"
+    assert canonical_skill("k8s") == "Kubernetes"
+    assert canonical_skill("ts") == "ts"
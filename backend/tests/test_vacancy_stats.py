@@ -0,0 +1,35 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.models.application import Application, ApplicationStatus
+from app.models.vacancy import Vacancy
+from app.services.vacancy_stats import apply_change, read_stats, recompute
+
+
+def test_recompute_agrees_with_incremental_buckets(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/stats.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessionmaker() as session:
+            vacancy = Vacancy(title="Backend", description="Python", company="HireVibe", salary_min=1, salary_max=2)
+            session.add(vacancy)
+            for score in (84.6, 84.2, 99.9, 12.5):
+                session.add(Application(
+                    vacancy_id=vacancy.id, first_name="A", last_name="B", email="a@example.com",
+                    matching_score=score, status=ApplicationStatus.COMPLETED,
+                ))
+                await apply_change(session, vacancy.id, None, (ApplicationStatus.COMPLETED, score))
+            await session.commit()
+            drifted = await recompute(session, vacancy.id)
+            stats = await read_stats(session, vacancy.id)
+        await engine.dispose()
+        return drifted, stats
+
+    drifted, stats = asyncio.run(main())
+    assert drifted is False
+    assert stats.scored == 4
+    assert stats.median_score == 84
@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import json
 import os
-from openai import OpenAI
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from typing import Optional
 from datetime import datetime
@@ -16,15 +16,21 @@ sys.path.append(str(Path(__file__).parent))
 # Import database session from your app
 from app.db.session import async_session
 from app.models.application import Application
+from app.config.settings import settings
+from app.services.llm_scheduler import Priority, estimate_tokens, llm_scheduler
 from sqlmodel import select
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared async OpenAI client (pooled httpx connections)
+    settings.open_clients()
+    yield
+    await settings.close_clients()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -157,11 +163,16 @@ Rules:
 4. Don't mention percentages
 """
         messages = [{"role": "system", "content": system_message}]
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            temperature=0.5,
-            max_tokens=100
+        response = await llm_scheduler.run(
+            Priority.CLARIFICATION,
+            lambda: settings.openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.5,
+                max_tokens=100
+            ),
+            estimated_tokens=estimate_tokens(messages, 100, "gpt-4o-mini"),
+            name="clarification",
         )
         first_question = response.choices[0].message.content
         await websocket.send_text(first_question)
@@ -272,11 +283,16 @@ Clarifications collected: {len(session_data['clarifications'])}
                     })
                 
                 # Call OpenAI API
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=messages,
-                    temperature=0.5,
-                    max_tokens=100
+                response = await llm_scheduler.run(
+                    Priority.CLARIFICATION,
+                    lambda: settings.openai_client.chat.completions.create(
+                        model="gpt-4o-mini",
+                        messages=messages,
+                        temperature=0.5,
+                        max_tokens=100
+                    ),
+                    estimated_tokens=estimate_tokens(messages, 100, "gpt-4o-mini"),
+                    name="clarification",
                 )
                 
                 # Get the response text
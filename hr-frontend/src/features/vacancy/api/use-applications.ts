@@ -1,5 +1,5 @@
 import { useQuery } from "@tanstack/react-query";
-import { getApplicationsByVacancy } from "./vacancies-api";
+import { getApplicationById, getApplicationsByVacancy } from "./vacancies-api";
 
 export const useApplications = (vacancyId?: string) => {
   return useQuery({
@@ -8,3 +8,11 @@ export const useApplications = (vacancyId?: string) => {
     enabled: !!vacancyId,
   });
 };
+
+export const useApplication = (id?: string) => {
+  return useQuery({
+    queryKey: ["application", id],
+    queryFn: () => getApplicationById(id!),
+    enabled: !!id,
+  });
+};
@@ -47,8 +47,9 @@ export const getApplicationsByVacancy = async (
   vacancy_id: string
 ): Promise<Application[]> => {
   try {
+    // Summary rows omit resume_parsed/matching_sections; see getApplicationById
     const response = await axiosClient.get(`/applications`, {
-      params: { vacancy_id },
+      params: { vacancy_id, view: "summary" },
     });
 
     return response.data;
@@ -63,6 +64,22 @@ export const getApplicationsByVacancy = async (
   }
 };
 
+export const getApplicationById = async (id: string): Promise<Application> => {
+  try {
+    const response = await axiosClient.get(`/applications/${id}`);
+
+    return response.data;
+  } catch (error) {
+    if (isAxiosError(error)) {
+      console.error(
+        "Axios error fetching application:",
+        error.response?.data || error.message
+      );
+    } else console.error("Error fetching application:", error);
+    throw error;
+  }
+};
+
 export const createVacancy = async (
   vacancyData: Omit<Job, "id" | "created_at" | "updated_at">
 ): Promise<Job> => {
@@ -7,6 +7,7 @@ export interface Job {
   salary_max: string;
   employment_type: string;
   requirements: string;
+  full_scoring?: boolean;
   created_at: string;
   updated_at: string;
 }
@@ -21,6 +22,9 @@ export interface Application {
   resume_parsed?: Record<string, any> | null;
   matching_score?: number | null;
   matching_sections?: Record<string, any> | null;
+  status?: "processing" | "completed" | "failed";
+  processing_error?: string | null;
+  skills?: Record<string, string[]> | null;
   created_at: string;
   updated_at: string;
 }
@@ -2,6 +2,7 @@ import { Modal, Stack, Text, Divider, Badge, Button } from "@mantine/core";
 import { apiConfig } from "../../../config/api";
 import React from "react";
 import type { Application } from "../model/types";
+import { useApplication } from "../api/use-applications";
 
 interface Props {
   opened: boolean;
@@ -9,7 +10,10 @@ interface Props {
   application?: Application | null;
 }
 
-export const ApplicantDetailsModal: React.FC<Props> = ({ opened, onClose, application }) => {
+export const ApplicantDetailsModal: React.FC<Props> = ({ opened, onClose, application: summary }) => {
+  // The list holds summary rows; matching details come from the single-application endpoint
+  const { data: details } = useApplication(opened ? summary?.id : undefined);
+  const application = details ?? summary;
   if (!application) return null;
 
   const requirements = application.matching_sections?.requirements ?? [];